@@ -0,0 +1,71 @@
+"""
+Сравнение двух прогонов run.py: время каждого этапа было/стало по
+совпадающим случаям (версия, число зубьев, допуск).
+
+    python benchmarks/compare.py [-p ПРОЦЕНТ] БЫЛО.json СТАЛО.json
+
+Замедление больше порога (по умолчанию 10%) помечается "!", и тогда
+код выхода 1 - сравнение можно ставить проверкой перед слиянием.
+"""
+import getopt
+import json
+import sys
+
+STAGES = ("placement", "conjugate", "profile", "export", "total")
+
+
+def load(filename):
+    with open(filename) as f:
+        data = json.load(f)
+    cases = {}
+    for r in data["results"]:
+        if "error" not in r:
+            stages = dict(r["stages"], total=r["total"])
+            cases[(r["version"], r["teeth"], r["tolerance"])] = stages
+    return data, cases
+
+
+def main():
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hp:")
+    except getopt.GetoptError:
+        args, opts = [], [("-h", "")]
+    threshold = 0.10
+    for o, a in opts:
+        if o == "-h":
+            print(__doc__)
+            sys.exit()
+        elif o == "-p":
+            threshold = float(a)/100.0
+    if len(args) != 2:
+        print(__doc__)
+        sys.exit(1)
+
+    (old, before), (new, after) = load(args[0]), load(args[1])
+    print("было:  %s (%s)" % (old.get("commit"), old.get("created")))
+    print("стало: %s (%s)" % (new.get("commit"), new.get("created")))
+
+    regressions = 0
+    for key in sorted(set(before) & set(after), key=lambda k: (k[0], k[1], str(k[2]))):
+        version, teeth, tolerance = key
+        cells = []
+        for stage in STAGES:
+            if stage not in before[key] or stage not in after[key]:
+                continue
+            t0, t1 = before[key][stage], after[key][stage]
+            ratio = t1/t0 if t0 > 0 else 1.0
+            slow = ratio > 1.0 + threshold
+            regressions += slow
+            cells.append("%s %7.2f->%7.2f мс x%.2f%s" % (stage, 1e3*t0, 1e3*t1, ratio, "!" if slow else " "))
+        print("%s %4d зубьев, допуск %-7s %s" % (version, teeth, tolerance, "  ".join(cells)))
+
+    missing = sorted(set(before) ^ set(after), key=str)
+    if missing:
+        print("нет в одном из прогонов: %d случаев" % len(missing))
+    if regressions:
+        print("замедлений больше %.0f%%: %d" % (100*threshold, regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Время холодного импорта пакета gearsgen и проверка, что он не тянет
+лишнего: каждый замер - новый процесс интерпретатора.
+
+    python benchmarks/import_time.py [-n ПОВТОРОВ] [-b БЮДЖЕТ_МС]
+
+Замеряются "import gearsgen" (то, что платит любой потребитель пакета)
+и первый доступ к gearsgen.build (numpy и модули расчёта). После
+построения circle, oval и conj-oval проверяется, что в stdout ничего не
+выведено и не загружены tkinter, matplotlib, shapely и ezdxf. Код выхода 1,
+если import gearsgen дольше бюджета (по умолчанию 100 мс) или проверка
+не прошла.
+"""
+import getopt
+import json
+import os
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+HEAVY = ("tkinter", "matplotlib", "shapely", "ezdxf")
+
+# Выполняется в отдельном процессе; результаты - последней строкой JSON в stderr
+PROBE = r"""
+import sys, time, json
+t0 = time.perf_counter()
+import gearsgen
+t1 = time.perf_counter()
+gearsgen.build
+t2 = time.perf_counter()
+for kind in ("circle", "oval", "conj-oval"):
+    gearsgen.build(kind)
+heavy = sorted({m.split(".")[0] for m in sys.modules} & set(%r))
+sys.stderr.write(json.dumps({"import": t1 - t0, "api": t2 - t1, "heavy": heavy}) + "\n")
+""" % (HEAVY,)
+
+
+def probe():
+    proc = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip())
+    result = json.loads(proc.stderr.strip().splitlines()[-1])
+    result["stdout"] = proc.stdout
+    return result
+
+
+def main():
+    try:
+        opts, _ = getopt.getopt(sys.argv[1:], "hn:b:")
+    except getopt.GetoptError:
+        opts = [("-h", "")]
+    repeats = 10
+    budget = 100.0
+    for o, a in opts:
+        if o == "-h":
+            print(__doc__)
+            sys.exit()
+        elif o == "-n":
+            repeats = int(a)
+        elif o == "-b":
+            budget = float(a)
+
+    results = [probe() for _ in range(repeats)]
+    t_import = 1e3*min(r["import"] for r in results)
+    t_api = 1e3*min(r["api"] for r in results)
+    print("import gearsgen:       %8.2f мс (минимум по %d процессам, бюджет %.0f мс)"
+          % (t_import, repeats, budget))
+    print("первый gearsgen.build: %8.2f мс (numpy и модули расчёта)" % t_api)
+
+    failed = t_import > budget
+    printed = [r["stdout"] for r in results if r["stdout"]]
+    if printed:
+        print("вывод в stdout: %r" % printed[0][:200])
+        failed = True
+    heavy = sorted({m for r in results for m in r["heavy"]})
+    if heavy:
+        print("загружены лишние модули: " + ", ".join(heavy))
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("stdout пуст, %s не загружались" % ", ".join(HEAVY))
+
+
+if __name__ == "__main__":
+    main()
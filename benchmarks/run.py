@@ -0,0 +1,280 @@
+"""
+Замеры генераторов всех версий по этапам: расстановка зубьев, подбор
+сопряжения, профили зубьев и экспорт DXF - на сетке чисел зубьев и допусков.
+
+    python benchmarks/run.py [опции]
+
+Каждая версия замеряется в отдельном процессе: модули версий называются
+одинаково (transmission.py, pitch_curves.py, ...) и импортируются из своего
+каталога, как при обычном запуске. Время этапа - минимум по повторам,
+каждый повтор строит пару заново. Результаты пишутся в JSON
+(по умолчанию benchmarks/results/<коммит>.json); два прогона сравнивает
+compare.py.
+"""
+import contextlib
+import getopt
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+TEETH = [10, 20, 50, 100, 200, 500]
+# Допуски в единицах версии: v0.0/v3.0 - ошибка длины дуги при расстановке
+# зубьев (пара с a = 1), v4.0 - допуск хорды контуров в мм (None - фиксированное
+# число точек на зуб)
+TOLERANCES = {
+    "v0.0": [1e-3, 1e-4],
+    "v3.0": [1e-3, 1e-4],
+    "v4.0": [None, 0.01],
+}
+STAGES = ("placement", "conjugate", "profile", "export")
+
+
+def print_help():
+    print("")
+    print(f"Использование: python {sys.argv[0]} [опции]")
+    print("")
+    print("Опции:")
+    print("  -V СПИСОК  Версии через запятую (по умолчанию %s)" % ",".join(TOLERANCES))
+    print("  -n СПИСОК  Числа зубьев через запятую (по умолчанию %s)" % ",".join(map(str, TEETH)))
+    print("  -t СПИСОК  Допуски через запятую для всех версий, none - без допуска")
+    print("             (по умолчанию свои для каждой версии, см. TOLERANCES)")
+    print("  -r N       Повторов каждого замера (по умолчанию 3)")
+    print("  -o ФАЙЛ    Файл результатов (по умолчанию benchmarks/results/<коммит>.json)")
+    print("  -h         Показать эту справку")
+    print("")
+    print("Этапы: " + ", ".join(STAGES))
+    print("")
+
+
+# --- Конвейеры версий (выполняются в процессе-исполнителе) ---
+
+def pipeline_v00(teeth, tolerance, path):
+    """Сопряжённая овальная пара v0.0 (conj_oval_gear.oval)."""
+    from conj_oval_gear import oval
+    from slfmaker import streamWrite
+
+    gear = oval(teeth, 10, 1.0, 0.15, 2, 2, 3.0, 0.0625, 0.25, tolerance)
+    state = {}
+
+    def profile():
+        state["segments"] = list(gear.segments())
+        return {"segments": len(state["segments"])}
+
+    def export():
+        streamWrite(path, state["segments"])
+        return {"bytes": os.path.getsize(path)}
+
+    return "conj-oval", [("placement", gear.calcPoints),
+                         ("conjugate", gear.calcConjugatePoints),
+                         ("profile", profile),
+                         ("export", export)]
+
+
+def pipeline_v30(teeth, tolerance, path):
+    """Сопряжённая овальная пара v3.0 (ConjugateOvalGearFull без кэша), этапы как в _solve."""
+    import numpy as np
+    from gears.conjugate_oval_gear import ConjugateOvalGearFull, oval
+
+    gear = ConjugateOvalGearFull(teeth, 10, 1.0, 0.15, 2, 2, 3.0, 0.0625, 0.25, tolerance)
+
+    def profile():
+        segments = list(gear.shapeSegments(gear.teethLoc))
+        segments += gear.shapeSegments(gear.conjugateTeethLoc)
+        gear.segments = np.array(segments, dtype=float).reshape(-1, 2, 2)
+        return {"segments": len(gear.segments)}
+
+    def export():
+        gear.write(path)
+        return {"bytes": os.path.getsize(path)}
+
+    return "ConjugateOvalGearFull", [("placement", lambda: oval.calcPoints(gear)),
+                                     ("conjugate", gear.calcConjugatePoints),
+                                     ("profile", profile),
+                                     ("export", export)]
+
+
+def pipeline_v40(teeth, tolerance, path):
+    """
+    Эллиптическая пара v4.0 (EllipticalPairBuilder без кэша). Зубья стоят
+    через равные углы, отдельного этапа расстановки нет. Модуль 40/teeth -
+    размер пары не зависит от числа зубьев.
+    """
+    from dxf_export import DXFExport
+    from elliptical_gears import EllipticalPairBuilder
+    from geometry_utils import segment_arrays, unify_rings
+
+    builder = EllipticalPairBuilder(teeth, 50, 40, teeth, 50, 40, 40.0/teeth, 20, 0.25, tolerance=tolerance)
+    state = {}
+
+    def profile():
+        state["polygons"] = builder.build_pair_polygons()
+        return {"segments": sum(len(segment_arrays(p)) for p in state["polygons"])}
+
+    def export():
+        dxf = DXFExport(path, streaming=True)
+        for poly in state["polygons"]:
+            dxf.add_polylines(unify_rings(poly))
+        dxf.save()
+        return {"bytes": os.path.getsize(path)}
+
+    return "EllipticalPairBuilder", [("conjugate", builder.solve_contact),
+                                     ("profile", profile),
+                                     ("export", export)]
+
+
+PIPELINES = {
+    "v0.0": pipeline_v00,
+    "v3.0": pipeline_v30,
+    "v4.0": pipeline_v40,
+}
+
+
+def measure(version, teeth, tolerance, repeats, path):
+    """Один случай сетки: минимум времени каждого этапа по repeats прогонам."""
+    best = {}
+    metrics = {}
+    for _ in range(repeats):
+        generator, stages = PIPELINES[version](teeth, tolerance, path)
+        for stage, fn in stages:
+            t0 = time.perf_counter()
+            result = fn()
+            dt = time.perf_counter() - t0
+            best[stage] = min(dt, best.get(stage, dt))
+            if isinstance(result, dict):
+                metrics.update(result)
+    return dict(version=version, generator=generator, teeth=teeth, tolerance=tolerance,
+                stages=best, total=sum(best.values()), **metrics)
+
+
+def worker(version, cases, repeats):
+    """Процесс-исполнитель: замеры одной версии, результаты - JSON в stdout."""
+    sys.path.insert(0, os.path.join(ROOT, version))
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.dxf")
+        for teeth, tolerance in cases:
+            # Конструкторы v0.0/v3.0 печатают ход расчёта - в stdout идёт только JSON
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                try:
+                    result = measure(version, teeth, tolerance, repeats, path)
+                except Exception as e:
+                    result = dict(version=version, teeth=teeth, tolerance=tolerance,
+                                  error=f"{type(e).__name__}: {e}")
+            results.append(result)
+    json.dump(results, sys.stdout)
+
+
+# --- Главный процесс ---
+
+def parse_list(text, conv):
+    return [None if item.strip().lower() == "none" else conv(item) for item in text.split(",")]
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out + ("-dirty" if dirty else "")
+
+
+def library_versions():
+    versions = {}
+    for name in ("numpy", "shapely", "ezdxf"):
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = None
+    return versions
+
+
+def parse_args():
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hV:n:t:r:o:")
+    except getopt.GetoptError:
+        print_help()
+        sys.exit(1)
+
+    params = {"versions": list(TOLERANCES), "teeth": TEETH, "tolerances": None, "repeats": 3, "output": None}
+    for o, a in opts:
+        if o == "-h":
+            print_help()
+            sys.exit()
+        elif o == "-V":
+            params["versions"] = [v.strip() for v in a.split(",")]
+        elif o == "-n":
+            params["teeth"] = parse_list(a, int)
+        elif o == "-t":
+            params["tolerances"] = parse_list(a, float)
+        elif o == "-r":
+            params["repeats"] = int(a)
+        elif o == "-o":
+            params["output"] = a
+
+    unknown = set(params["versions"]) - set(PIPELINES)
+    if unknown or args:
+        print("Ошибка: неизвестные версии или аргументы: " + ", ".join(sorted(unknown) + args))
+        print_help()
+        sys.exit(1)
+    return params
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], json.loads(sys.argv[3]), int(sys.argv[4]))
+        return
+
+    params = parse_args()
+    commit = git_commit()
+    results = []
+    for version in params["versions"]:
+        tolerances = params["tolerances"] or TOLERANCES[version]
+        cases = [(teeth, tol) for teeth in params["teeth"] for tol in tolerances]
+        t0 = time.perf_counter()
+        proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", version,
+                               json.dumps(cases), str(params["repeats"])],
+                              cwd=os.path.join(ROOT, version), capture_output=True, text=True)
+        if proc.returncode != 0:
+            print("%s: ошибка исполнителя\n%s" % (version, proc.stderr.strip()))
+            results += [dict(version=version, teeth=teeth, tolerance=tol, error="worker failed")
+                        for teeth, tol in cases]
+            continue
+        version_results = json.loads(proc.stdout)
+        results += version_results
+        print("%s: %d замеров за %.1f с" % (version, len(cases), time.perf_counter() - t0))
+        for r in version_results:
+            if "error" in r:
+                print("  %4d зубьев, допуск %-7s ошибка: %s" % (r["teeth"], r["tolerance"], r["error"]))
+                continue
+            stages = "  ".join("%s %8.2f мс" % (s, 1e3*r["stages"][s]) for s in STAGES if s in r["stages"])
+            print("  %4d зубьев, допуск %-7s %s  всего %8.2f мс"
+                  % (r["teeth"], r["tolerance"], stages, 1e3*r["total"]))
+
+    output = params["output"] or os.path.join(HERE, "results", "%s.json" % (commit or "local"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "libraries": library_versions(),
+            "repeats": params["repeats"],
+            "results": results,
+        }, f, indent=1)
+    print("Результаты: " + output)
+
+
+if __name__ == "__main__":
+    main()
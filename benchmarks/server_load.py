@@ -0,0 +1,81 @@
+"""
+Нагрузка на запущенный сервис gearsgen.server: параллельные запросы
+со смесью типов, форматов и повторов, затем его /stats (глубина очереди,
+слитые запросы, процентили задержек).
+
+    python -m gearsgen.server -j 4 &
+    python benchmarks/server_load.py [-u АДРЕС] [-c КЛИЕНТОВ] [-n ЗАПРОСОВ]
+
+Повторы (одинаковые параметры у разных клиентов) проверяют слияние
+одинаковых запросов: computed в /stats должно быть меньше requests.
+"""
+import getopt
+import json
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+QUERIES = [
+    "circle.dxf?teeth=%d",
+    "oval.svg?teeth=%d&e=0.2",
+    "conj-oval.dxf?teeth=%d",
+    "conj-oval.json?teeth=%d&period=1",
+    "pair.svg?t1=%d&t2=60",
+]
+
+
+def fetch(url):
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url) as response:
+            size = len(response.read())
+            status = response.status
+    except urllib.error.HTTPError as e:
+        size, status = 0, e.code
+    return status, size, time.perf_counter() - t0
+
+
+def main():
+    try:
+        opts, _ = getopt.getopt(sys.argv[1:], "hu:c:n:")
+    except getopt.GetoptError:
+        opts = [("-h", "")]
+    base = "http://127.0.0.1:8765"
+    clients = 16
+    count = 200
+    for o, a in opts:
+        if o == "-h":
+            print(__doc__)
+            sys.exit()
+        elif o == "-u":
+            base = a.rstrip("/")
+        elif o == "-c":
+            clients = int(a)
+        elif o == "-n":
+            count = int(a)
+
+    # Небольшой набор чисел зубьев - много одинаковых запросов подряд
+    rng = random.Random(0)
+    urls = ["%s/gear/%s" % (base, rng.choice(QUERIES) % rng.choice((10, 20, 30, 40)))
+            for _ in range(count)]
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        results = list(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - t0
+
+    ok = [r for r in results if r[0] == 200]
+    latencies = sorted(r[2] for r in results)
+    print("запросов: %d за %.2f с (%.1f в секунду), успешных: %d, получено %.1f МБ"
+          % (count, elapsed, count/elapsed, len(ok), sum(r[1] for r in ok)/1e6))
+    print("задержка у клиента: p50 %.1f мс, p99 %.1f мс"
+          % (1e3*latencies[len(latencies)//2], 1e3*latencies[min(len(latencies) - 1, int(0.99*len(latencies)))]))
+    with urllib.request.urlopen(base + "/stats") as response:
+        print(json.dumps(json.load(response), indent=1))
+
+
+if __name__ == "__main__":
+    main()
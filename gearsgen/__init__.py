@@ -0,0 +1,47 @@
+"""
+gearsgen - построение шестерён без GUI и без вывода в stdout.
+
+    import gearsgen
+
+    geometry = gearsgen.build("oval", teeth=30, e=0.2)
+    gearsgen.write_dxf(geometry, "oval.dxf")
+    svg = gearsgen.to_svg(geometry)
+
+Типы: circle, oval, conj-oval (сопряжённая овальная пара, как v0.0/v3.0)
+и pair (эллиптическая пара v4.0, нужен shapely). Параметры по умолчанию -
+gearsgen.DEFAULTS.
+
+Сам пакет при импорте ничего не загружает: numpy и модули расчёта
+подтягиваются при первом обращении к имени ниже, shapely - при построении
+pair, ezdxf - при выводе DXF контурами (polylines=True). Замеры этапов -
+gearsgen.instrument.
+"""
+import importlib
+
+# Имя -> модуль пакета, в котором оно определено
+_EXPORTS = {
+    "build": "api",
+    "Geometry": "api",
+    "DEFAULTS": "api",
+    "KINDS": "api",
+    "write_dxf": "export",
+    "to_dxf": "export",
+    "to_svg": "export",
+    "to_dict": "export",
+    "to_json": "export",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
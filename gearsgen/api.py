@@ -0,0 +1,203 @@
+"""
+Построение шестерни по типу и параметрам - одна точка входа для
+пакетной генерации, сервисов и скриптов:
+
+    geometry = build("conj-oval", teeth=40, e=0.2)
+    geometry.gears      # [(M,2,2), ...] - отрезки каждой шестерни
+    geometry.info       # шаг, межосевое расстояние и т.п.
+
+Эллиптическая пара v4.0 (pair) требует shapely; он импортируется только
+при её построении.
+"""
+import math
+
+import numpy as np
+
+from . import instrument
+from .gears import CircleGear, OvalGear, ConjugateOvalPair, ramanujan_perimeter
+
+# Параметры по умолчанию - как в v0.0/gearsbatch.py
+DEFAULTS = {
+    "circle": dict(teeth=20, ts=10, oradius=1.0, iradius=0.125, depth=0.2, tolerance=0.001,
+                   chord_tolerance=None),
+    "oval": dict(teeth=30, ts=10, a=1.0, e=0.15, nodes=2, iradius=0.0625, depth=0.25, tolerance=0.001,
+                 chord_tolerance=None),
+    "conj-oval": dict(teeth=40, ts=10, a=1.0, e=0.15, nodes=2, period=2, holedistance=3.0,
+                      iradius=0.0625, depth=0.25, tolerance=0.001, chord_tolerance=None),
+    "pair": dict(t1=20, a1=50.0, b1=40.0, t2=20, a2=50.0, b2=40.0, module=2.0,
+                 pressure_angle=20.0, clearance=0.25, tolerance=None),
+}
+
+KINDS = tuple(DEFAULTS)
+
+# Верхняя граница числа зубьев: время расчёта и размер ответа растут линейно
+MAX_TEETH = 1000
+
+# Целые параметры: (минимум, максимум)
+INT_RANGES = {
+    "teeth": (1, MAX_TEETH), "t1": (1, MAX_TEETH), "t2": (1, MAX_TEETH),
+    "ts": (2, 100), "nodes": (1, 16), "period": (1, 16),
+}
+
+# Вещественные параметры, которые должны быть > 0 и >= 0
+POSITIVE = {"oradius", "a", "a1", "b1", "a2", "b2", "module", "depth", "holedistance",
+            "tolerance", "chord_tolerance"}
+NON_NEGATIVE = {"iradius", "clearance"}
+
+# Нижние границы допусков: мельче - только секунды расчёта (занятый процесс
+# пула сервиса) без видимой разницы в контуре. tolerance - ошибка длины
+# дуги; chord_tolerance (и tolerance пары) - доля модуля зацепления
+MIN_TOLERANCE = 1e-6
+MIN_CHORD_TOLERANCE = 1e-5
+
+
+class Geometry:
+    """
+    Результат build():
+    kind, params - тип и полный набор параметров (с умолчаниями)
+    gears        - список массивов отрезков (M,2,2), по одному на шестерню
+    info         - итоги расчёта (числа), зависят от типа
+    """
+    __slots__ = ("kind", "params", "gears", "info")
+
+    def __init__(self, kind, params, gears, info):
+        self.kind = kind
+        self.params = params
+        self.gears = gears
+        self.info = info
+
+    @property
+    def segments(self):
+        """Все отрезки одним массивом (M,2,2)."""
+        return np.concatenate(self.gears) if self.gears else np.empty((0, 2, 2))
+
+    def bounds(self):
+        """(minx, miny, maxx, maxy) всех отрезков; None, если их нет."""
+        pts = self.segments.reshape(-1, 2)
+        if not len(pts):
+            return None
+        (mnx, mny), (mxx, mxy) = pts.min(axis=0), pts.max(axis=0)
+        return float(mnx), float(mny), float(mxx), float(mxy)
+
+
+def resolve_params(kind, params):
+    """
+    Параметры задания с умолчаниями; ValueError - неизвестный тип или
+    параметр, значение вне допустимого диапазона.
+    """
+    if kind not in DEFAULTS:
+        raise ValueError(f"Тип шестерёнки '{kind}' не поддерживается.")
+    unknown = set(params) - set(DEFAULTS[kind])
+    if unknown:
+        raise ValueError("Неизвестные параметры: " + ", ".join(sorted(unknown)))
+    params = dict(DEFAULTS[kind], **params)
+    check_params(kind, params)
+    return params
+
+
+def check_params(kind, params):
+    """ValueError, если значение параметра недопустимо."""
+    for key, value in params.items():
+        if value is None and DEFAULTS[kind][key] is None:
+            continue
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{key}: ожидается число, получено {value!r}")
+        if not math.isfinite(number):
+            raise ValueError(f"{key}: значение должно быть конечным")
+        if key in INT_RANGES:
+            lo, hi = INT_RANGES[key]
+            if number != int(number) or not lo <= number <= hi:
+                raise ValueError(f"{key}: ожидается целое от {lo} до {hi}, получено {value!r}")
+        elif key in POSITIVE and number <= 0:
+            raise ValueError(f"{key}: значение должно быть > 0, получено {value!r}")
+        elif key in NON_NEGATIVE and number < 0:
+            raise ValueError(f"{key}: значение должно быть >= 0, получено {value!r}")
+    if "e" in params and not 0 <= params["e"] < 1:
+        raise ValueError("e: эксцентриситет должен быть в диапазоне [0, 1)")
+    if "pressure_angle" in params and not 0 < params["pressure_angle"] < 45:
+        raise ValueError("pressure_angle: угол зацепления должен быть в диапазоне (0, 45) градусов")
+    for a, b in (("a1", "b1"), ("a2", "b2")):
+        if a in params and params[a] < params[b]:
+            raise ValueError(f"{a} - большая полуось: нужно {a} >= {b}")
+    check_geometry(kind, params)
+
+
+def estimated_module(kind, params):
+    """
+    Модуль зацепления до расчёта. Шаг по кривой впадин: cpitch*teeth =
+    P - 2*pi*dedendum, dedendum = 1.25*cpitch/pi, откуда cpitch = P/(teeth + 2.5)
+    (для окружности точно, для овала - оценка).
+    """
+    if kind == "pair":
+        return params["module"]
+    if kind == "circle":
+        perimeter = 2.0*math.pi*params["oradius"]
+    else:
+        a, e = params["a"], params["e"]
+        perimeter = ramanujan_perimeter(a, a*math.sqrt(1.0 - e*e))
+    return perimeter/(params["teeth"] + 2.5)/math.pi
+
+
+def check_geometry(kind, params):
+    """ValueError, если из параметров не получается шестерня (или расчёт слишком долгий)."""
+    module = estimated_module(kind, params)
+    chord_key = "tolerance" if kind == "pair" else "chord_tolerance"
+    if params[chord_key] is not None and params[chord_key] < MIN_CHORD_TOLERANCE*module:
+        raise ValueError(f"{chord_key}: не меньше {MIN_CHORD_TOLERANCE:g} модуля "
+                         f"({MIN_CHORD_TOLERANCE*module:.3g}), получено {params[chord_key]!r}")
+    if kind == "pair":
+        dedendum = module*(1.0 + params["clearance"])
+        if params["b1"] <= dedendum:
+            raise ValueError(f"b1 = {params['b1']!r} не больше ножки зуба module*(1 + clearance) = "
+                             f"{dedendum:.4g}: впадины заходят за центр")
+        return
+
+    if params["tolerance"] < MIN_TOLERANCE:
+        raise ValueError(f"tolerance: не меньше {MIN_TOLERANCE:g}, получено {params['tolerance']!r}")
+    # Наименьший и наибольший радиус делительной кривой
+    if kind == "circle":
+        r_min = r_max = params["oradius"]
+    else:
+        r_min, r_max = params["a"]*(1.0 - params["e"]), params["a"]*(1.0 + params["e"])
+    root = r_min - 1.25*module
+    if root <= params["iradius"]:
+        raise ValueError(f"Радиус впадин (~{root:.4g}) должен быть больше iradius = {params['iradius']!r}: "
+                         "уменьшите iradius или e, или увеличьте число зубьев")
+    if kind == "conj-oval" and params["holedistance"] <= r_max:
+        raise ValueError(f"holedistance (начальное межосевое расстояние) должно быть больше "
+                         f"наибольшего радиуса a*(1 + e) = {r_max:.4g}")
+
+
+def build(kind, **params):
+    """Строит шестерню (или пару) kind и возвращает Geometry."""
+    params = resolve_params(kind, params)
+    if kind == "pair":
+        return _build_pair(params)
+
+    cls = {"circle": CircleGear, "oval": OvalGear, "conj-oval": ConjugateOvalPair}[kind]
+    with instrument.span("build"):
+        gear = cls(**params)
+        gears = gear.gear_segments()
+    info = dict(cpitch=gear.cpitch, dedendum=gear.dedendumd, addendum=gear.adendumd,
+                refinements=gear.refinements)
+    if kind == "conj-oval":
+        info.update(holedistance=gear.holedistance, conjugate_iterations=gear.conjugate_iterations,
+                    conjugate_residual=gear.conjugate_residual)
+    return Geometry(kind, params, gears, info)
+
+
+def _build_pair(params):
+    # shapely - только для пары
+    from .elliptical_gears import EllipticalPairBuilder
+
+    builder = EllipticalPairBuilder(params["t1"], params["a1"], params["b1"],
+                                    params["t2"], params["a2"], params["b2"],
+                                    params["module"], params["pressure_angle"], params["clearance"],
+                                    tolerance=params["tolerance"])
+    with instrument.span("build"):
+        gears = list(builder.build_pair_arrays())
+    info = dict(center_distance=builder.center_distance, closure_error=builder.closure_error,
+                radius_gap=builder.radius_gap, solve_time=builder.solve_time)
+    return Geometry("pair", params, gears, info)
@@ -0,0 +1,344 @@
+import math
+import numpy as np
+from shapely.ops import unary_union
+import shapely.affinity
+from shapely import wkb
+
+from .geometry_utils import (polar_ellipse_radius, unify_segments, segment_arrays,
+                             tooth_polygon, radial_outline, refine_parameters)
+from .rolling_contact import RollingContact
+from . import instrument
+
+# Начальная сетка зуба для адаптивной дискретизации (tolerance задан)
+ADAPTIVE_SEED_POINTS = 3
+
+# Интервалов таблицы обкатки на зуб ведомой шестерни
+CONTACT_SAMPLES_PER_TOOTH = 64
+
+# Допуски замыкания пары: невязка по углу (рад) и разрыв радиуса ведомой
+# (доля межосевого расстояния); больше - вторая шестерня не замыкается
+CLOSURE_TOLERANCE = 1e-6
+RADIUS_GAP_TOLERANCE = 1e-6
+
+
+def profile_thetas(theta0, theta1, n_points, radii, tolerance=None):
+    """
+    Углы точек профиля зуба на [theta0, theta1].
+    tolerance=None - n_points равномерно (как раньше); иначе сетка
+    сгущается, пока хорды кривых вершин и впадин radii(thetas) -> (r_out, r_in)
+    отходят от них больше чем на tolerance (refine_parameters).
+    """
+    if tolerance is None:
+        return np.linspace(theta0, theta1, n_points)
+
+    def curves(thetas):
+        r_out, r_in = radii(thetas)
+        c, s = np.cos(thetas), np.sin(thetas)
+        return np.stack((np.column_stack((r_out*c, r_out*s)),
+                         np.column_stack((r_in*c, r_in*s))), axis=1)
+
+    seed = np.linspace(theta0, theta1, ADAPTIVE_SEED_POINTS)
+    return refine_parameters(curves, seed, tolerance)
+
+
+def gear_outline(profiles):
+    """
+    Полигон шестерни по профилям зубьев [(thetas, r_out, r_in), ...],
+    идущих подряд по углу. Обычно контур собирается напрямую (radial_outline):
+    последняя точка зуба совпадает с первой точкой следующего и отбрасывается.
+    Вырожденные случаи (r_in обнуляется, кривые пересекаются) - как раньше,
+    одним unary_union полигонов зубьев.
+    """
+    thetas = np.concatenate([t[:-1] for t, _, _ in profiles])
+    r_out = np.concatenate([ro[:-1] for _, ro, _ in profiles])
+    r_in = np.concatenate([ri[:-1] for _, _, ri in profiles])
+    poly = radial_outline(thetas, r_out, r_in)
+    if poly is None:
+        poly = unary_union([tooth_polygon(*p) for p in profiles])
+    return poly
+
+class EllipticalGear:
+    """
+    Представляет ОДНУ эллиптическую шестерню.
+    - teeth (int)
+    - a, b (float): полуоси
+    - module, pressure_angle, clearance
+    - Использует 'rolling' для генерации зубьев, 
+      т.е. для каждого зуба вычисляем локальный радиус, base_radius, строим инволютный контур.
+    """
+
+    def __init__(self, teeth, a, b, module, pressure_angle_deg, clearance, tolerance=None):
+        self.teeth = teeth
+        self.a = a
+        self.b = b
+        self.module = module
+        self.pressure_angle = math.radians(pressure_angle_deg)
+        self.clearance = clearance
+
+        self.addendum = module
+        self.dedendum = module*(1+clearance)
+
+        # Количество точек для каждого зуба
+        self.n_profile_points = 40
+        # Допуск хорды: если задан, точки расставляются по кривизне (profile_thetas)
+        self.tolerance = tolerance
+        # Количество зубьев = teeth => шаг по углу = 2*pi/teeth
+        self.dtheta = 2*math.pi / teeth
+
+    def build_gear_polygon(self, progress=None):
+        """
+        Генерирует полигон (shapely) всей шестерни по профилям зубьев
+        (см. gear_outline). (Упрощённо, без сопряжения со второй шестернёй)
+        progress(fraction) - вызывается перед каждым зубом.
+        """
+        profiles = []
+        for i in range(self.teeth):
+            if progress is not None:
+                progress(i / self.teeth)
+            theta_mid = i*self.dtheta
+            profiles.append(self._tooth_profile(theta_mid))
+
+        if instrument.enabled():
+            instrument.count("theta steps", sum(len(thetas) for thetas, _, _ in profiles))
+        return gear_outline(profiles)
+
+    def build_gear_segments(self):
+        """
+        Возвращает список отрезков (x1,y1)->(x2,y2),
+        преобразуя результат build_gear_polygon() в ломаную.
+        """
+        poly = self.build_gear_polygon()
+        return unify_segments(poly)
+
+    def _build_tooth_polygon(self, theta_mid):
+        """
+        Строим полигон одного зуба в окрестности [theta_mid - dtheta/2, theta_mid + dtheta/2].
+        Без учёта реального взаимодействия со второй шестернёй.
+        """
+        return tooth_polygon(*self._tooth_profile(theta_mid))
+
+    def _tooth_profile(self, theta_mid):
+        """
+        (thetas, r_out, r_in) одного зуба: эллиптический радиус + addendum/dedendum.
+        """
+        half = self.dtheta*0.5
+        thetas = profile_thetas(theta_mid - half, theta_mid + half,
+                                self.n_profile_points, self._radii, self.tolerance)
+        return (thetas, *self._radii(thetas))
+
+    def pitch_radius(self, thetas):
+        """Делительная кривая - эллипс с центром на оси вращения."""
+        return polar_ellipse_radius(self.a, self.b, thetas)
+
+    def _radii(self, thetas):
+        r_ell = self.pitch_radius(thetas)
+        r_out = np.maximum(r_ell + self.addendum, 0)
+        r_in = np.maximum(r_ell - self.dedendum, 0)
+        return r_out, r_in
+
+
+class EllipticalPairBuilder:
+    """
+    Создаёт ПАРУ шестерён: первая - эллиптическая (a1, b1), вторая обкатывается
+    по ней без проскальзывания (RollingContact). Межосевое расстояние и
+    делительная кривая второй находятся из передаточного отношения t1:t2.
+    a2, b2 задают только начальное приближение межосевого расстояния.
+    После построения известны center_distance, closure_error, radius_gap
+    и solve_time (см. RollingContact). Если пара не замыкается (например,
+    t1=30, t2=20 у эллипса) или впадины второй заходят за центр - ValueError.
+    """
+
+    def __init__(self, t1, a1, b1, t2, a2, b2, module, pressure_angle_deg, clearance, cache=None,
+                 progress=None, tolerance=None):
+        self.t1 = t1
+        self.a1 = a1
+        self.b1 = b1
+        self.t2 = t2
+        self.a2 = a2
+        self.b2 = b2
+        self.module = module
+        self.pressure_angle = pressure_angle_deg
+        self.clearance = clearance
+        # Допуск хорды контуров (None - фиксированное число точек на зуб)
+        self.tolerance = tolerance
+
+        # Создаём объекты
+        self.gear1 = EllipticalGear(t1, a1, b1, module, pressure_angle_deg, clearance, tolerance)
+        self.gear2 = EllipticalGear(t2, a2, b2, module, pressure_angle_deg, clearance, tolerance)
+
+        # Кэш с get_or_compute (GeometryCache v4.0): пара с теми же параметрами берётся с диска
+        self.cache = cache
+        self.cache_hit = False
+
+        # progress(fraction, text) - ход построения
+        self.progress = progress
+
+        # Таблица обкатки (solve_contact) и её итоги - межосевое расстояние,
+        # невязка замыкания по углу (рад) и по радиусу, время решения (с);
+        # при попадании в кэш итоги берутся из записи
+        self.contact = None
+        self.center_distance = None
+        self.closure_error = None
+        self.radius_gap = None
+        self.solve_time = None
+
+    def build_pair(self):
+        """
+        Генерирует (lines1, lines2):
+         - lines1: отрезки первой шестерни
+         - lines2: отрезки второй, которая "обкатает" первую (сопряжение).
+        """
+
+        if self.cache is not None:
+            arrays = self._cached_arrays()
+            return ([(tuple(p1), tuple(p2)) for p1, p2 in arrays['lines1'].tolist()],
+                    [(tuple(p1), tuple(p2)) for p1, p2 in arrays['lines2'].tolist()])
+
+        poly1, poly2 = self.build_pair_polygons()
+
+        # Превращаем в набор отрезков
+        lines1 = unify_segments(poly1)
+        lines2 = unify_segments(poly2)
+
+        return lines1, lines2
+
+    def build_pair_arrays(self):
+        """
+        (segs1, segs2) - отрезки пары массивами (M,2,2), для LineCollection и т.п.
+        """
+        if self.cache is not None:
+            arrays = self._cached_arrays()
+            return arrays['lines1'], arrays['lines2']
+        poly1, poly2 = self.build_pair_polygons()
+        return segment_arrays(poly1), segment_arrays(poly2)
+
+    def build_pair_polygons(self):
+        """
+        Генерирует (poly1, poly2) - shapely-полигоны пары
+        (для вывода контурами, см. unify_rings).
+        """
+        if self.cache is not None:
+            arrays = self._cached_arrays()
+            return wkb.loads(arrays['poly1'].tobytes()), wkb.loads(arrays['poly2'].tobytes())
+        return self._solve_pair_polygons()
+
+    def _cached_arrays(self):
+        params = dict(t1=self.t1, a1=self.a1, b1=self.b1, t2=self.t2, a2=self.a2, b2=self.b2,
+                      module=self.module, pressure_angle=self.pressure_angle, clearance=self.clearance,
+                      tolerance=self.tolerance)
+        arrays, self.cache_hit = self.cache.get_or_compute(type(self), params, self._pair_arrays)
+        instrument.count("cache hits" if self.cache_hit else "cache misses")
+        self.center_distance = float(arrays['center_distance'])
+        self.closure_error = float(arrays['closure_error'])
+        self.radius_gap = float(arrays['radius_gap'])
+        self.solve_time = float(arrays['solve_time'])
+        # Записи, сделанные до проверки замыкания
+        self._check_closure()
+        return arrays
+
+    def _pair_arrays(self):
+        # Полигоны - в WKB, отрезки - массивы (M,2,2)
+        poly1, poly2 = self._solve_pair_polygons()
+        return {
+            'poly1': np.frombuffer(wkb.dumps(poly1), dtype=np.uint8),
+            'poly2': np.frombuffer(wkb.dumps(poly2), dtype=np.uint8),
+            'lines1': segment_arrays(poly1),
+            'lines2': segment_arrays(poly2),
+            'center_distance': np.array(self.center_distance),
+            'closure_error': np.array(self.closure_error),
+            'radius_gap': np.array(self.radius_gap),
+            'solve_time': np.array(self.solve_time),
+        }
+
+    def _solve_pair_polygons(self):
+        with instrument.span("gear1"):
+            poly1 = self.gear1.build_gear_polygon(self._stage(0.0, 0.5, "шестерня 1"))
+        with instrument.span("contact"):
+            self.solve_contact()
+        with instrument.span("gear2"):
+            poly2 = self._build_son_gear_polygon(poly1, self._stage(0.5, 0.5, "шестерня 2"))
+        return poly1, poly2
+
+    def solve_contact(self):
+        """
+        Таблица обкатки (RollingContact) второй шестерни по первой; считается
+        один раз. Начальное приближение межосевого расстояния - прежняя оценка
+        (max(a1,b1) + max(a2,b2))*0.9.
+        """
+        if self.contact is None:
+            guess = (max(self.a1, self.b1) + max(self.a2, self.b2))*0.9
+            self.contact = RollingContact(self.gear1.pitch_radius, self.t2/self.t1,
+                                          self.t2*CONTACT_SAMPLES_PER_TOOTH, guess)
+            instrument.count("contact iterations", self.contact.iterations)
+            self.center_distance = self.contact.center_distance
+            self.closure_error = self.contact.closure_error
+            self.radius_gap = self.contact.radius_gap
+            self.solve_time = self.contact.solve_time
+            self._check_closure()
+            if self.contact.r2.min() <= self.gear2.dedendum:
+                raise ValueError("Впадины второй шестерни заходят за центр: наименьший радиус %.4g, "
+                                 "ножка зуба %.4g" % (self.contact.r2.min(), self.gear2.dedendum))
+        return self.contact
+
+    def _check_closure(self):
+        # ValueError, если ведомая не замыкается за оборот
+        if (self.closure_error > CLOSURE_TOLERANCE
+                or self.radius_gap > RADIUS_GAP_TOLERANCE*self.center_distance):
+            raise ValueError("Пара t1=%d, t2=%d не замыкается: невязка %.3g рад, разрыв радиуса %.4g "
+                             "(подберите отношение t2/t1)" % (self.t1, self.t2, self.closure_error,
+                                                             self.radius_gap))
+
+    def _stage(self, start, span, text):
+        # Доля этапа [0,1] -> общая доля [start, start+span]
+        if self.progress is None:
+            return None
+        return lambda fraction: self.progress(start + span*fraction, text)
+
+    def transmission(self):
+        """
+        Закон движения пары (TransmissionTable): theta2(theta1), передаточное
+        отношение и скорость ведомой - векторные запросы по таблице обкатки.
+        """
+        return self.solve_contact().transmission()
+
+    def _build_son_gear_polygon(self, poly1, progress=None):
+        """
+        Полигон второй шестерни по таблице обкатки, в положении зацепления:
+        центр сдвинут на межосевое расстояние по оси x.
+        """
+        contact = self.solve_contact()
+        # Зуб k второй шестерни - участок, который касается первой, пока та
+        # поворачивается на [k, k+1] своих зубьев (узлы сетки обкатки).
+        # По своему углу beta ведомая идёт навстречу - зубья от последнего к первому.
+        bounds = contact.beta[::CONTACT_SAMPLES_PER_TOOTH]
+        profiles = []
+        for i, k in enumerate(range(self.t2 - 1, -1, -1)):
+            if progress is not None:
+                progress(i / self.t2)
+            profiles.append(self._son_tooth_profile(bounds[k + 1], bounds[k]))
+
+        if instrument.enabled():
+            instrument.count("theta steps", sum(len(thetas) for thetas, _, _ in profiles))
+        gear2_poly = gear_outline(profiles)
+        return shapely.affinity.translate(gear2_poly, xoff=contact.center_distance)
+
+    def _build_one_tooth_son(self, k):
+        """
+        Cтроим k-й зуб второй шестерни (без сдвига на межосевое расстояние).
+        """
+        bounds = self.solve_contact().beta[::CONTACT_SAMPLES_PER_TOOTH]
+        return tooth_polygon(*self._son_tooth_profile(bounds[k + 1], bounds[k]))
+
+    def _son_tooth_profile(self, beta0, beta1):
+        """
+        (thetas, r_out, r_in) зуба второй шестерни на [beta0, beta1]:
+        делительная кривая из таблицы обкатки + addendum/dedendum.
+        """
+        thetas = profile_thetas(beta0, beta1, self.gear2.n_profile_points, self._son_radii, self.tolerance)
+        return (thetas, *self._son_radii(thetas))
+
+    def _son_radii(self, thetas):
+        r_pitch = self.contact.follower_radius(thetas)
+        r_out = r_pitch + self.gear2.addendum
+        r_in = np.maximum(r_pitch - self.gear2.dedendum, 0)
+        return r_out, r_in
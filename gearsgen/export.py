@@ -0,0 +1,95 @@
+"""
+Вывод Geometry (api.py) в DXF, SVG и JSON - строкой или в файл.
+
+DXF пишет DXFStreamWriter: R12 LINE или, при polylines=True, замкнутые
+контуры LWPOLYLINE (R2010, нужен ezdxf - импортируется только тогда).
+"""
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from . import instrument
+from .dxf_stream import DXFStreamWriter
+
+DXF_COMMENT = "DXF created from gearsgen.py phill baker"
+
+# Цвета шестерён в SVG - как sBlu/sRed в doShape v0.0
+SVG_COLORS = ("#1f4fbf", "#bf1f1f")
+
+
+def write_dxf(geometry, filename, polylines=False, precision=6):
+    """Записывает отрезки всех шестерён в DXF filename."""
+    dxfversion = "R2010" if polylines else "R12"
+    with instrument.span("export"), \
+            DXFStreamWriter(filename, dxfversion=dxfversion, precision=precision, comment=DXF_COMMENT) as w:
+        for segments in geometry.gears:
+            if polylines:
+                w.write_outlines(segments)
+            else:
+                w.write_segments(segments)
+
+
+def to_dxf(geometry, polylines=False, precision=6):
+    """Текст DXF (через временный файл: DXFStreamWriter пишет в файл)."""
+    fd, path = tempfile.mkstemp(suffix=".dxf")
+    os.close(fd)
+    try:
+        write_dxf(geometry, path, polylines, precision)
+        with open(path) as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def _path_data(segments, precision):
+    # "M x1 y1 L x2 y2" на отрезок, числа форматируются одним проходом по массиву
+    flat = np.asarray(segments, dtype=float).reshape(-1, 4)
+    # Отрезки нулевой длины (начала боков зубьев) в SVG не нужны
+    flat = flat[(flat[:, 0] != flat[:, 2]) | (flat[:, 1] != flat[:, 3])]
+    if not len(flat):
+        return ""
+    num = "%%.%df" % precision
+    template = "M%s %s L%s %s" % (num, num, num, num)
+    return " ".join(template % tuple(row) for row in flat.tolist())
+
+
+def to_svg(geometry, precision=4, stroke_width=None):
+    """
+    Текст SVG: по path на шестерню, ось y вверх (как в DXF).
+    stroke_width по умолчанию - 1/500 размера рисунка.
+    """
+    with instrument.span("export"):
+        bounds = geometry.bounds() or (0.0, 0.0, 1.0, 1.0)
+        minx, miny, maxx, maxy = bounds
+        width, height = max(maxx - minx, 1e-9), max(maxy - miny, 1e-9)
+        pad = 0.02*max(width, height)
+        if stroke_width is None:
+            stroke_width = max(width, height)/500.0
+        view = (minx - pad, -maxy - pad, width + 2*pad, height + 2*pad)
+        lines = ['<svg xmlns="http://www.w3.org/2000/svg" viewBox="%g %g %g %g">' % view,
+                 '<g transform="scale(1,-1)" fill="none" stroke-width="%g" stroke-linecap="round">'
+                 % stroke_width]
+        for i, segments in enumerate(geometry.gears):
+            lines.append('<path stroke="%s" d="%s"/>'
+                         % (SVG_COLORS[i % len(SVG_COLORS)], _path_data(segments, precision)))
+        lines.append('</g>')
+        lines.append('</svg>')
+        return "\n".join(lines) + "\n"
+
+
+def to_dict(geometry):
+    """Словарь для JSON: параметры, итоги, границы и отрезки каждой шестерни."""
+    return {
+        "kind": geometry.kind,
+        "params": geometry.params,
+        "info": geometry.info,
+        "bounds": geometry.bounds(),
+        "gears": [np.asarray(s, dtype=float).tolist() for s in geometry.gears],
+    }
+
+
+def to_json(geometry):
+    with instrument.span("export"):
+        return json.dumps(to_dict(geometry))
@@ -0,0 +1,336 @@
+"""
+Шестерни по делительной кривой: расстановка зубьев по длине дуги
+(pitch_placement.py), инволютные профили и сопряжённая пара.
+
+Логика - ConjugateSLFMaker/oval из v3.0/gears/conjugate_oval_gear.py, но
+без print(): ход расчёта виден только через instrument, итоги - в атрибутах
+(cpitch, refinements, holedistance, conjugate_iterations, ...). Отрезки
+возвращаются массивом (M,2,2), по массиву на шестерню.
+"""
+import math
+from math import sin, cos, pi, sqrt, atan
+
+import numpy as np
+
+from . import instrument
+from .involute_table import t_closest_y, t_below_x
+from .pitch_curves import CircleCurve, OvalCurve, curvature_radius
+from .pitch_placement import pitch_points
+from .sampling import flank_parameters
+from .tooth_locations import ToothLocations
+from .transmission import TransmissionTable
+
+
+def involute(a, t):
+    return [a * (sin(t) - t * cos(t)), a * (cos(t) + t * sin(t)) - a]
+
+
+def normalize(x, y):
+    if x == 0.0 and y == 0.0:
+        return (0.0, 0.0)
+    l = sqrt(x*x + y*y)
+    return (x/l, y/l)
+
+
+def solve_bracketed(f, x0, lower, ftol, max_iterations=100):
+    # Корень монотонно убывающей f на (lower, inf): поиск интервала со сменой
+    # знака от x0, затем метод Иллинойса. Возвращает (x, вычислений f, |f(x)|).
+    iterations = 1
+    a, fa = x0, f(x0)
+    if fa == 0.0:
+        return a, iterations, 0.0
+    step = max(abs(x0 - lower), 1e-6)
+    while True:
+        if fa > 0:
+            b = a + step
+            step *= 2.0
+        else:
+            b = lower + (a - lower)/2.0
+        fb = f(b)
+        iterations += 1
+        if fa*fb <= 0.0:
+            break
+        a, fa = b, fb
+        if iterations >= max_iterations:
+            raise ValueError("Не удалось найти интервал со сменой знака")
+
+    x, fx = b, fb
+    while abs(fx) > ftol and iterations < max_iterations:
+        x = (a*fb - b*fa)/(fb - fa)
+        fx = f(x)
+        iterations += 1
+        if fx*fb < 0.0:
+            a, fa = b, fb
+        else:
+            fa /= 2.0
+        b, fb = x, fx
+        if abs(b - a) <= 1e-15*abs(b):
+            break
+    return x, iterations, abs(fx)
+
+
+def segment_array(segments):
+    """Отрезки ((x1,y1),(x2,y2)) -> массив (M,2,2)."""
+    return np.array(list(segments), dtype=float).reshape(-1, 2, 2)
+
+
+def ramanujan_perimeter(a, b):
+    h = ((a - b)/(a + b))**2.0
+    return pi * (a + b) * (1.0 + (3.0*h)/(10.0 + sqrt(4.0 - 3.0*h)))
+
+
+class PitchGear:
+    """
+    Одна шестерня; делительную кривую self.curve и perimeter() задаёт потомок.
+    tolerance - ошибка длины дуги при расстановке зубьев, chord_tolerance -
+    допуск хорды боков зубьев (None - ts точек на бок, как в v0.0).
+    """
+
+    def __init__(self, teeth, ts=10, iradius=0.0625, depth=0.25, tolerance=0.001, chord_tolerance=None):
+        if teeth < 1:
+            raise ValueError("Число зубьев должно быть положительным")
+        if ts < 2 and chord_tolerance is None:
+            raise ValueError("На бок зуба нужно не меньше двух точек (ts >= 2)")
+        self.teeth = teeth
+        self.tooth_slices = ts
+        self.iradius = iradius
+        self.depth = depth
+        self.tolerance = tolerance
+        self.chord_tolerance = chord_tolerance
+        self.teeth_loc = ToothLocations()
+        self.gap_loc = ToothLocations()
+        self.refinements = None
+
+    def perimeter(self):
+        raise NotImplementedError
+
+    def inner_radius(self, theta):
+        return self.iradius
+
+    @instrument.stage("placement")
+    def calc_points(self):
+        # Зубья и впадины чередуются, первый - зуб в theta = 0; кривая и
+        # производные во всех позициях - одним вычислением на массиве
+        halfpitch, thetas, self.refinements = pitch_points(
+            self.curve.radius, self.teeth * 2, self.tolerance, self.perimeter() / self.teeth / 2.0)
+        instrument.count("refinement passes", self.refinements)
+
+        self.cpitch = halfpitch * 2.0
+        module = self.cpitch / pi
+        self.dedendumd = module * 1.25
+        self.adendumd = module
+
+        p = self.curve.evaluate(thetas)
+        ro = p.r - self.dedendumd
+        locs = ToothLocations.from_columns(x=ro*np.cos(thetas), y=ro*np.sin(thetas), r=ro, t=thetas,
+                                           rc=np.abs(curvature_radius(p)),
+                                           dx=p.dx, dy=p.dy, dx2=p.dx2, dy2=p.dy2)
+        self.teeth_loc = locs[0::2]
+        self.gap_loc = locs[1::2]
+
+    def gear_segments(self):
+        """Список массивов отрезков (M,2,2), по одному на шестерню."""
+        if not self.teeth_loc:
+            self.calc_points()
+        with instrument.span("profile"):
+            return [segment_array(self.shape_segments(self.teeth_loc))]
+
+    def segments(self):
+        """Все отрезки одним массивом (M,2,2)."""
+        return np.concatenate(self.gear_segments())
+
+    def shape_segments(self, teeth_loc):
+        # Отрезки ((x1,y1),(x2,y2)) одной шестерни в порядке записи в DXF
+        teeth_ends = []
+        inner_pts = []
+        steps = 0
+        clipped = 0
+
+        for r, t, rc, dx, dy in teeth_loc.rows('r', 't', 'rc', 'dx', 'dy'):
+            rc = abs(rc)
+            td = t_closest_y(rc, self.dedendumd)
+            tt = t_closest_y(rc, self.dedendumd + self.adendumd)
+
+            x = r*cos(t)
+            y = r*sin(t)
+
+            dx, dy = normalize(dx, dy)
+
+            tooth_width = self.cpitch / 2.0
+            offset = (tooth_width / 2.0) + involute(rc, td)[0]
+            tx = t_below_x(rc, offset)
+            if tt > tx:
+                tt = tx
+                clipped += 1
+
+            if dy < 0:
+                rot = 3.0*pi/2.0 + atan(dx/dy)
+            else:
+                rot = pi/2.0 + atan(dx/dy)
+
+            pts = []
+            for tval in flank_parameters(tt, rc, self.tooth_slices, self.chord_tolerance):
+                ix, iy = involute(rc, tval)
+                px = -offset + ix
+                py = iy
+                npx = px*cos(rot) + py*sin(rot)
+                npy = px*(-sin(rot)) + py*cos(rot)
+                arr = [(x+npx, y+npy)]
+
+                px = offset - ix
+                py = iy
+                npx = px*cos(rot) + py*sin(rot)
+                npy = px*(-sin(rot)) + py*cos(rot)
+                arr.append((x+npx, y+npy))
+                pts.append(arr)
+            steps += len(pts)
+
+            for i in range(len(pts)):
+                if i == 0:
+                    yield (pts[i][0], pts[i][0])
+                else:
+                    yield (pts[i-1][0], pts[i][0])
+                if i == 0:
+                    yield (pts[i][1], pts[i][1])
+                else:
+                    yield (pts[i-1][1], pts[i][1])
+
+            yield (pts[-1][0], pts[-1][1])
+
+            ri = self.inner_radius(t)
+            inner_pts.append((ri*cos(t), ri*sin(t)))
+
+            teeth_ends.append((pts[0][0][0], pts[0][0][1], pts[0][1][0], pts[0][1][1]))
+
+        for i in range(len(inner_pts)):
+            yield (inner_pts[i-1], inner_pts[i])
+
+        for i in range(len(teeth_ends)):
+            yield ((teeth_ends[i-1][0], teeth_ends[i-1][1]), (teeth_ends[i][2], teeth_ends[i][3]))
+
+        # Счётчики - одним вызовом на шестерню, не на отрезок
+        instrument.count("theta steps", steps)
+        instrument.count("segments emitted", 2*steps + len(inner_pts) + 2*len(teeth_ends))
+        instrument.count("clipped teeth", clipped)
+
+
+class CircleGear(PitchGear):
+    """Круглая шестерня радиуса oradius."""
+
+    def __init__(self, teeth, ts=10, oradius=1.0, iradius=0.125, depth=0.2, tolerance=0.001,
+                 chord_tolerance=None):
+        if oradius <= 0:
+            raise ValueError("Радиус должен быть положительным")
+        self.oradius = oradius
+        self.curve = CircleCurve(oradius)
+        super().__init__(teeth, ts, iradius, depth, tolerance, chord_tolerance)
+
+    def perimeter(self):
+        return 2.0 * pi * self.oradius
+
+
+class OvalGear(PitchGear):
+    """Овальная шестерня r = p / (1 - e*cos(nodes*t)), p = a*(1 - e^2)."""
+
+    def __init__(self, teeth, ts=10, a=1.0, e=0.15, nodes=2, iradius=0.0625, depth=0.25, tolerance=0.001,
+                 chord_tolerance=None):
+        if not 0.0 <= e < 1.0:
+            raise ValueError("Эксцентриситет должен быть в диапазоне [0, 1)")
+        self.a = a
+        self.e = e
+        self.nodes = nodes
+        self.c = e*a
+        self.p = a*(1.0 - e*e)
+        self.b = math.sqrt(a*a - self.c*self.c)
+        self.curve = OvalCurve(self.p, self.e, self.nodes)
+        super().__init__(teeth, ts, iradius, depth, tolerance, chord_tolerance)
+
+    def perimeter(self):
+        return ramanujan_perimeter(self.a, self.b)
+
+
+class ConjugateOvalPair(OvalGear):
+    """
+    Овальная шестерня и сопряжённая к ней: ведомая делает оборот за period
+    оборотов ведущей, межосевое расстояние holedistance подбирается по
+    замыканию (holedistance в конструкторе - начальное приближение).
+    Обе шестерни - вокруг начала координат, как в v0.0/v3.0.
+    """
+
+    def __init__(self, teeth, ts=10, a=1.0, e=0.15, nodes=2, period=2, holedistance=3.0, iradius=0.0625,
+                 depth=0.25, tolerance=0.001, chord_tolerance=None):
+        super().__init__(teeth, ts, a, e, nodes, iradius, depth, tolerance, chord_tolerance)
+        self.period = period
+        self.holedistance = holedistance
+        self.conjugate_loc = ToothLocations()
+        # Закон движения пары (TransmissionTable), после calc_conjugate_points
+        self.transmission = None
+        self.conjugate_iterations = None
+        self.conjugate_residual = None
+
+    def conjugate_locations(self, holedistance):
+        # Сопряжённые точки для заданного holedistance и полный угол поворота.
+        # При замыкании угол равен 2*pi, последняя точка совпадает с первой.
+        # Приращения угла dtp (теорема косинусов) зависят только от соседних
+        # впадин, углы - их префиксная сумма
+        index = np.arange(len(self.gap_loc)*self.period + 1) % self.teeth
+        src = self.gap_loc[index]
+        r = src['r']
+        rp = holedistance - (r + 2.0*self.dedendumd)
+
+        r1, r2 = r[1:], r[:-1]
+        rp1, rp2 = rp[1:], rp[:-1]
+        dt = np.diff(src['t'])
+        dt[dt < 0] += 2.0*pi
+
+        numerator = (r1**2 + r2**2 - 2.0*r1*r2*np.cos(dt) - rp1**2 - rp2**2)
+        denominator = (-2.0*rp1*rp2)
+        if np.any(denominator == 0):
+            raise ValueError("Деление на ноль при вычислении acos")
+        dtp = np.arccos(np.clip(numerator/denominator, -1.0, 1.0))
+        steps = np.cumsum(dtp)
+        total = float(steps[-1]) if len(steps) else 0.0
+
+        t0 = pi - float(src['t'][0])
+        ts = np.mod(np.concatenate(([t0], t0 + steps)), 2.0*pi)
+
+        # rc, dx2, dy2 - от впадины-прообраза; касательная - перпендикуляр к радиусу
+        locs = ToothLocations.from_columns(x=rp*np.cos(ts), y=rp*np.sin(ts), r=rp, t=ts, rc=src['rc'],
+                                           dx=-np.sin(ts), dy=np.cos(ts), dx2=src['dx2'], dy2=src['dy2'])
+        return locs, total
+
+    def closure_gap(self, holedistance):
+        # Невязка замыкания, монотонно убывает с ростом holedistance
+        return self.conjugate_locations(holedistance)[1] - 2.0*pi
+
+    @instrument.stage("conjugate")
+    def calc_conjugate_points(self):
+        if not self.teeth_loc:
+            self.calc_points()
+        # holedistance - корень closure_gap; ниже lower радиусы сопряжённой шестерни отрицательны
+        lower = float(self.gap_loc['r'].max()) + 2.0*self.dedendumd
+        self.holedistance, self.conjugate_iterations, self.conjugate_residual = solve_bracketed(
+            self.closure_gap, max(self.holedistance, lower*1.01), lower, self.tolerance*1e-3)
+        instrument.count("holedistance adjustments", self.conjugate_iterations)
+
+        # Последняя точка совпадает с первой; касательная - разность соседей по кругу
+        locs = self.conjugate_locations(self.holedistance)[0][:-1].copy()
+        locs['dx'] = np.roll(locs['x'], -1) - np.roll(locs['x'], 1)
+        locs['dy'] = np.roll(locs['y'], -1) - np.roll(locs['y'], 1)
+        self.conjugate_loc = locs
+        self.transmission = self.transmission_table()
+
+    def transmission_table(self, samples_per_tooth=64):
+        # Непрерывная обкатка кривых впадин на расстоянии holedistance - 2*dedendumd,
+        # нормированная на оборот ведомой за period оборотов ведущей
+        return TransmissionTable.from_pitch(lambda t: self.curve.radius(t) - self.dedendumd,
+                                            self.holedistance - 2.0*self.dedendumd,
+                                            2.0*pi*self.period,
+                                            self.teeth*self.period*samples_per_tooth)
+
+    def gear_segments(self):
+        if not self.conjugate_loc:
+            self.calc_conjugate_points()
+        with instrument.span("profile"):
+            return [segment_array(self.shape_segments(self.teeth_loc)),
+                    segment_array(self.shape_segments(self.conjugate_loc))]
@@ -0,0 +1,236 @@
+import math
+import numpy as np
+import shapely
+from numpy.lib.stride_tricks import sliding_window_view
+from shapely.geometry import Polygon
+
+def polar_ellipse_radius(a,b,theta):
+    """
+    Полярное задание эллипса:
+      R = (a*b) / sqrt((b*cos(theta))^2 + (a*sin(theta))^2).
+    theta - число или массив (как ufunc: форма результата = форма theta).
+    Там, где denom<=0 (вырожденный эллипс), R = 0.
+    """
+    theta = np.asarray(theta, dtype=float)
+    denom = (b*np.cos(theta))**2 + (a*np.sin(theta))**2
+    ok = denom > 0
+    r = np.zeros(np.shape(denom))
+    np.divide(a*b, np.sqrt(denom, where=ok, out=np.ones_like(r)), where=ok, out=r)
+    return r if r.ndim else r[()]
+
+def involute_profile(base_radius, start_r, end_r, n_points=20):
+    """
+    Генерация точек инволюты от start_r до end_r 
+    (где start_r >= base_radius, end_r >= start_r).
+    t = sqrt((r/base_r)^2 - 1), для r < base_radius t = 0.
+    Возвращает массив (..., n_points, 2) точек (x,y); base_radius, start_r,
+    end_r - числа или массивы одной формы (по профилю на элемент).
+    (Локальная инволюта, ось X "радиальная").
+    """
+    base_radius = np.asarray(base_radius, dtype=float)[..., None]
+
+    def t_of_r(r):
+        ratio = np.asarray(r, dtype=float)[..., None] / base_radius
+        return np.sqrt(np.maximum(ratio**2 - 1, 0))
+
+    t1 = t_of_r(start_r)
+    t2 = t_of_r(end_r)
+    s = np.linspace(0.0, 1.0, n_points) if n_points>1 else np.zeros(n_points)
+    t = t1 + (t2 - t1)*s
+    x = base_radius*(np.cos(t) + t*np.sin(t))
+    y = base_radius*(np.sin(t) - t*np.cos(t))
+    return np.stack((x, y), axis=-1)
+
+def arc_divisions(radius, angle, tol):
+    """
+    Число хорд дуги радиуса radius на угол angle, при котором
+    стрелка прогиба (отклонение хорды от дуги) не больше tol.
+    """
+    if radius <= tol:
+        return max(1, math.ceil(abs(angle) / math.pi))
+    step = 2.0*math.acos(1.0 - tol/radius)
+    return max(1, math.ceil(abs(angle) / step))
+
+def involute_parameters(t_end, base_radius, tol, t_start=0.0):
+    """
+    Параметры t точек инволюты от t_start до t_end с прогибом хорды <= tol.
+    Радиус кривизны инволюты rho = base_radius*t, стрелка хорды
+    ~ base_radius*t*dt^2/8, поэтому точки равномерны по u = t^1.5:
+    du = 1.5*sqrt(8*tol/base_radius). Густо у вершины, редко у основания.
+    """
+    u0, u1 = t_start**1.5, t_end**1.5
+    if not tol > 0:
+        raise ValueError("Допуск хорды должен быть положительным")
+    if not (math.isfinite(base_radius) and base_radius > 0 and math.isfinite(tol)) or u1 <= u0:
+        # Бесконечный радиус кривизны - бок зуба прямой; нулевой радиус - инволюта
+        # вырождается в точку; бесконечный допуск - хватает концов
+        return np.array([t_start, t_end])
+    du = 1.5*math.sqrt(8.0*tol/base_radius)
+    n = max(1, math.ceil((u1 - u0) / du))
+    return np.linspace(u0, u1, n + 1)**(2.0/3.0)
+
+def chord_deviation(pm, p0, p1):
+    """
+    Расстояние от точек pm до хорд p0->p1 (массивы (...,2)).
+    """
+    d = p1 - p0
+    v = pm - p0
+    length = np.hypot(d[..., 0], d[..., 1])
+    cross = np.abs(d[..., 0]*v[..., 1] - d[..., 1]*v[..., 0])
+    dist = np.hypot(v[..., 0], v[..., 1])
+    np.divide(cross, length, out=dist, where=length > 0)
+    return dist
+
+def refine_parameters(curve, t, tol, max_passes=20):
+    """
+    Адаптивная дискретизация: делит интервалы параметров t (по возрастанию)
+    пополам, пока точки кривой в четвертях интервала отстоят от хорды
+    больше чем на tol. curve(t) -> точки (N,2) или (N,K,2) - K кривых
+    на общих параметрах (проверяется худшая). Возвращает новый массив t.
+    """
+    t = np.asarray(t, dtype=float)
+    pts = curve(t)
+    for _ in range(max_passes):
+        tm = 0.5*(t[:-1] + t[1:])
+        pm = curve(tm)
+        dev = chord_deviation(pm, pts[:-1], pts[1:])
+        # Середина может случайно лечь на хорду - проверяем и четверти
+        for q in (0.25, 0.75):
+            tq = t[:-1] + q*(t[1:] - t[:-1])
+            dev = np.maximum(dev, chord_deviation(curve(tq), pts[:-1], pts[1:]))
+        if dev.ndim > 1:
+            dev = dev.max(axis=tuple(range(1, dev.ndim)))
+        bad = dev > tol
+        if not bad.any():
+            break
+        idx = np.nonzero(bad)[0] + 1
+        t = np.insert(t, idx, tm[bad])
+        pts = np.insert(pts, idx, pm[bad], axis=0)
+    return t
+
+def tooth_polygon(thetas, r_out, r_in):
+    """
+    Полигон одного зуба: кривая r_out(theta) туда, r_in(theta) обратно.
+    """
+    out_pts = np.column_stack((r_out*np.cos(thetas), r_out*np.sin(thetas)))
+    in_pts = np.column_stack((r_in*np.cos(thetas), r_in*np.sin(thetas)))
+    return Polygon(np.concatenate((out_pts, in_pts[::-1])))
+
+def radial_outline(thetas, r_out, r_in):
+    """
+    Контур шестерни сразу целиком, без объединения зубьев:
+    оболочка - кривая r_out(theta), отверстие - кривая r_in(theta).
+    thetas - полный оборот по возрастанию, без повтора первой точки.
+    Обе кривые звёздные относительно центра, поэтому при 0 < r_in < r_out
+    полигон заведомо корректен; иначе (кривая проходит через центр или
+    пересекает другую) возвращает None - тогда нужен unary_union зубьев.
+    """
+    thetas = np.asarray(thetas, dtype=float)
+    r_out = np.asarray(r_out, dtype=float)
+    r_in = np.asarray(r_in, dtype=float)
+    if not (np.all(r_in > 0) and np.all(r_out > r_in)):
+        return None
+    c, s = np.cos(thetas), np.sin(thetas)
+    shell = np.column_stack((r_out*c, r_out*s))
+    hole = np.column_stack((r_in*c, r_in*s))[::-1]
+    return Polygon(shell, [hole])
+
+def unify_segments(geometry):
+    """
+    Превращает Polygon / MultiPolygon (shapely) в список отрезков [( (x1,y1),(x2,y2) ), ...]
+    Берём exterior-координаты, затем отверстия (окружность впадин).
+    """
+    lines = []
+    if geometry.is_empty:
+        return lines
+
+    geom_type = geometry.geom_type
+    if geom_type == 'Polygon':
+        lines += polygon_to_lines(geometry)
+    elif geom_type == 'MultiPolygon':
+        for g in geometry.geoms:
+            lines += polygon_to_lines(g)
+    else:
+        # Возможно GeometryCollection, обойдём все geoms
+        if hasattr(geometry, 'geoms'):
+            for gg in geometry.geoms:
+                lines += unify_segments(gg)
+    return lines
+
+def iter_polygons(geometry):
+    """
+    Полигоны геометрии в порядке обхода unify_segments
+    (Polygon, MultiPolygon, вложенные коллекции).
+    """
+    if geometry.is_empty:
+        return
+    geom_type = geometry.geom_type
+    if geom_type == 'Polygon':
+        yield geometry
+    elif hasattr(geometry, 'geoms'):
+        for g in geometry.geoms:
+            yield from iter_polygons(g)
+
+def ring_arrays(geometry):
+    """
+    Все кольца геометрии (у каждого полигона exterior, затем отверстия)
+    как массивы (N,2), замкнутые: последняя точка повторяет первую.
+    Координаты читаются одним shapely.get_coordinates в общий непрерывный
+    буфер, кольца - его срезы (без копий и без кортежей на точку).
+    """
+    polys = list(iter_polygons(geometry))
+    if not polys:
+        return []
+    rings = shapely.get_rings(polys)
+    coords, index = shapely.get_coordinates(rings, return_index=True)
+    counts = np.bincount(index, minlength=len(rings))
+    return np.split(coords, np.cumsum(counts)[:-1])
+
+def segment_view(ring):
+    """
+    Отрезки замкнутого кольца (N,2) как представление (N-1,2,2)
+    поверх тех же данных (sliding_window_view, только для чтения).
+    """
+    return sliding_window_view(ring, 2, axis=0).transpose(0, 2, 1)
+
+def segment_arrays(geometry):
+    """
+    Массив (M,2,2) отрезков всех колец - то же, что unify_segments,
+    но одной склейкой представлений segment_view вместо кортежа на отрезок.
+    """
+    views = [segment_view(ring) for ring in ring_arrays(geometry)]
+    if not views:
+        return np.empty((0, 2, 2))
+    return np.concatenate(views)
+
+def unify_rings(geometry):
+    """
+    Тот же обход, что unify_segments, но возвращает замкнутые контуры:
+    список массивов (N,2) координат exterior и отверстий (без повтора
+    первой точки) - для вывода одной LWPOLYLINE на контур.
+    """
+    return [ring[:-1] for ring in ring_arrays(geometry)]
+
+def segments_bounds(*arrays):
+    """
+    (minx, miny, maxx, maxy) по массивам отрезков (M,2,2) - одним min/max,
+    без списков координат. None, если отрезков нет.
+    """
+    pts = np.concatenate([np.asarray(s, dtype=float).reshape(-1, 2) for s in arrays])
+    if not len(pts):
+        return None
+    (mnx, mny), (mxx, mxy) = pts.min(axis=0), pts.max(axis=0)
+    return mnx, mny, mxx, mxy
+
+def polygon_to_lines(poly: Polygon):
+    """
+    Берём exterior и отверстия полигона -> список отрезков.
+    """
+    segments = []
+    for ring in (poly.exterior, *poly.interiors):
+        coords = list(ring.coords)
+        for i in range(len(coords)-1):
+            p1 = coords[i]
+            p2 = coords[i+1]
+            segments.append(((p1[0],p1[1]), (p2[0],p2[1])))
+    return segments
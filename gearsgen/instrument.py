@@ -0,0 +1,185 @@
+"""
+Замеры этапов построения: вложенные интервалы (span) и счётчики (count).
+
+    with instrument.profiling() as profile:
+        builder.build_pair_polygons()
+    print(profile.table())
+    profile.dump("profile.json")
+
+    @instrument.stage("placement")         # весь вызов метода - интервал
+    def calcPoints(self): ...
+
+    python instrument.py profile.json      # таблица сохранённого профиля
+
+Пока сбор не включён (вне profiling()), span() возвращает один общий пустой
+контекст, а count() сразу выходит: в горячих путях остаются вызов функции
+и проверка глобальной переменной. Счётчики увеличиваются пачками - один
+вызов на этап (число отрезков, итераций), а не на каждый отрезок.
+
+Профиль один на процесс: внутри profiling() в него пишут все потоки,
+поэтому профилировать стоит одну сборку за раз.
+"""
+import functools
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+# Активный профиль (None - сбор выключен)
+_profile = None
+
+
+class Profile:
+    """
+    spans    - путь интервала ("pair/gear1") -> [вызовов, секунд]
+    counters - имя -> значение
+    elapsed  - длительность profiling(), с
+    """
+
+    def __init__(self):
+        self.spans = {}
+        self.counters = {}
+        self.elapsed = 0.0
+        self._stack = []
+
+    def to_dict(self):
+        return {
+            "elapsed": self.elapsed,
+            "spans": {path: {"calls": calls, "seconds": seconds}
+                      for path, (calls, seconds) in self.spans.items()},
+            "counters": dict(self.counters),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = cls()
+        profile.elapsed = data["elapsed"]
+        profile.spans = {path: [s["calls"], s["seconds"]] for path, s in data["spans"].items()}
+        profile.counters = dict(data["counters"])
+        return profile
+
+    def merge(self, other):
+        """Прибавляет другой профиль (например, профили заданий пакета)."""
+        for path, (calls, seconds) in other.spans.items():
+            entry = self.spans.setdefault(path, [0, 0.0])
+            entry[0] += calls
+            entry[1] += seconds
+        for name, value in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        self.elapsed += other.elapsed
+
+    def dump(self, filename):
+        with open(filename, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    def table(self):
+        """Текстовая таблица: интервалы деревом (с долей от elapsed), затем счётчики."""
+        lines = ["%-40s %8s %12s %7s" % ("этап", "вызовов", "мс", "%")]
+        for path in self.spans:
+            calls, seconds = self.spans[path]
+            depth = path.count("/")
+            name = "  "*depth + path.rsplit("/", 1)[-1]
+            share = 100.0*seconds/self.elapsed if self.elapsed > 0 else 0.0
+            lines.append("%-40s %8d %12.3f %7.1f" % (name, calls, 1e3*seconds, share))
+        lines.append("%-40s %8s %12.3f" % ("всего", "", 1e3*self.elapsed))
+        if self.counters:
+            lines.append("")
+            lines.append("%-40s %12s" % ("счётчик", "значение"))
+            for name in sorted(self.counters):
+                lines.append("%-40s %12s" % (name, self.counters[name]))
+        return "\n".join(lines)
+
+
+class _Span:
+    __slots__ = ("profile", "name", "path", "entry", "t0")
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profile._stack
+        self.path = stack[-1] + "/" + self.name if stack else self.name
+        stack.append(self.path)
+        # Запись заводится при входе: в таблице этапы идут в порядке начала
+        self.entry = self.profile.spans.setdefault(self.path, [0, 0.0])
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        dt = time.perf_counter() - self.t0
+        self.profile._stack.pop()
+        self.entry[0] += 1
+        self.entry[1] += dt
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Контекст-интервал name, вложенный в текущий (пустой, если сбор выключен)."""
+    if _profile is None:
+        return _NULL_SPAN
+    return _Span(_profile, name)
+
+
+def stage(name):
+    """Декоратор: весь вызов метода - интервал name (этапы целиком, не генераторы)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _profile is None:
+                return fn(*args, **kwargs)
+            with _Span(_profile, name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    """Увеличить счётчик name на n (ничего не делает, если сбор выключен)."""
+    if _profile is not None:
+        _profile.counters[name] = _profile.counters.get(name, 0) + n
+
+
+def enabled():
+    return _profile is not None
+
+
+@contextmanager
+def profiling(profile=None):
+    """Включает сбор на время блока; отдаёт Profile (новый или переданный)."""
+    global _profile
+    previous = _profile
+    if profile is None:
+        profile = Profile()
+    _profile = profile
+    t0 = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.elapsed += time.perf_counter() - t0
+        _profile = previous
+
+
+def main():
+    if len(sys.argv) != 2:
+        print(f"Использование: python {sys.argv[0]} ПРОФИЛЬ.json")
+        sys.exit(1)
+    with open(sys.argv[1]) as f:
+        print(Profile.from_dict(json.load(f)).table())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Адаптивная дискретизация боковых сторон зубьев.
+
+Бок зуба - инволюта окружности радиуса rc (радиус кривизны делительной
+кривой в точке зуба, radius_of_curvature). Её радиус кривизны rho = rc*t,
+поэтому число точек можно выбрать по допуску хорды заранее, без итераций:
+стрелка прогиба хорды ~ rc*t*dt^2/8, точки равномерны по u = t^1.5.
+"""
+import math
+import numpy as np
+
+
+def involute_parameters(t_end, base_radius, tol, t_start=0.0):
+    """
+    Параметры t точек инволюты от t_start до t_end с прогибом хорды <= tol.
+    Густо у вершины зуба, редко у основания.
+    """
+    u0, u1 = t_start**1.5, t_end**1.5
+    if not tol > 0:
+        raise ValueError("Допуск хорды должен быть положительным")
+    if not (math.isfinite(base_radius) and base_radius > 0 and math.isfinite(tol)) or u1 <= u0:
+        # Бесконечный радиус кривизны - бок зуба прямой; нулевой радиус - инволюта
+        # вырождается в точку; бесконечный допуск - хватает концов
+        return np.array([t_start, t_end])
+    du = 1.5*math.sqrt(8.0*tol/base_radius)
+    n = max(1, math.ceil((u1 - u0) / du))
+    return np.linspace(u0, u1, n + 1)**(2.0/3.0)
+
+
+def flank_parameters(tt, rc, slices, tolerance=None):
+    """
+    Параметры точек бока зуба от 0 до tt.
+    tolerance=None - slices точек с постоянным шагом (как в v0.0),
+    иначе - по допуску хорды (involute_parameters).
+    """
+    if tolerance is None:
+        step = tt/(slices-1.0)
+        values = []
+        t = 0.0
+        for m in range(slices):
+            values.append(t)
+            t += step
+        return values
+    return involute_parameters(tt, rc, tolerance).tolist()
@@ -0,0 +1,363 @@
+"""
+Локальный HTTP-сервис генерации шестерён (asyncio, только loopback).
+
+    python -m gearsgen.server [опции]
+
+    GET /gear/KIND.FMT?параметры   KIND - circle, oval, conj-oval, pair;
+                                   FMT - dxf, svg, json
+    GET /stats                     очередь, число запросов, задержки (JSON)
+    GET /health                    "ok"
+
+Параметры - как у gearsgen.build (gearsgen.DEFAULTS), none - значение None;
+для dxf также polylines=1 и precision=N. Пример:
+
+    curl 'http://127.0.0.1:8765/gear/conj-oval.dxf?teeth=40&e=0.2' -o pair.dxf
+
+Расчёт идёт в пуле процессов, прогретом при запуске (numpy и модули
+расчёта уже импортированы). Одинаковые запросы, пришедшие, пока такой же
+ещё считается, ждут один общий результат. Если в работе больше max_queue
+расчётов, новые получают 503.
+"""
+import asyncio
+import collections
+import getopt
+import ipaddress
+import json
+import math
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit, parse_qsl, unquote
+
+from . import export
+from .api import DEFAULTS, build, resolve_params
+
+FORMATS = {
+    "dxf": "application/dxf",
+    "svg": "image/svg+xml",
+    "json": "application/json",
+}
+
+# Последних задержек для процентилей
+LATENCY_WINDOW = 1000
+MAX_HEADERS = 100
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- Процесс пула ---
+
+def render(kind, params, fmt, polylines, precision):
+    """Выполняется в процессе пула: (тело ответа в байтах, info)."""
+    geometry = build(kind, **params)
+    if fmt == "dxf":
+        text = export.to_dxf(geometry, polylines, precision)
+    elif fmt == "svg":
+        text = export.to_svg(geometry)
+    else:
+        text = export.to_json(geometry)
+    return text.encode(), geometry.info
+
+
+def _ready():
+    # Пустое задание: процесс пула уже импортировал этот модуль, а с ним numpy и расчёт
+    return True
+
+
+# --- Разбор запроса ---
+
+def parse_value(text, default):
+    """Значение параметра из строки запроса с типом по значению по умолчанию."""
+    if text.strip().lower() == "none":
+        return None
+    try:
+        value = float(text)
+        if not math.isfinite(value):
+            raise ValueError
+        if isinstance(default, int) and not isinstance(default, bool):
+            if value != int(value):
+                raise ValueError
+            return int(value)
+        return value
+    except (ValueError, OverflowError):
+        raise HTTPError(400, "Некорректное значение: %r" % text)
+
+
+def parse_gear_request(path, query):
+    """(kind, fmt, params, polylines, precision) по пути /gear/KIND.FMT и строке запроса."""
+    name = unquote(path[len("/gear/"):])
+    kind, _, fmt = name.rpartition(".")
+    if kind not in DEFAULTS:
+        raise HTTPError(404, "Тип шестерёнки '%s' не поддерживается." % kind)
+    if fmt not in FORMATS:
+        raise HTTPError(404, "Формат '%s' не поддерживается (%s)." % (fmt, ", ".join(FORMATS)))
+
+    polylines = False
+    precision = 6
+    params = {}
+    for key, value in parse_qsl(query, keep_blank_values=True):
+        if key == "polylines":
+            polylines = value.lower() in ("1", "true", "yes", "")
+        elif key == "precision":
+            precision = parse_value(value, 0)
+            if precision is None or not 0 <= precision <= 15:
+                raise HTTPError(400, "precision - от 0 до 15")
+        elif key in DEFAULTS[kind]:
+            params[key] = parse_value(value, DEFAULTS[kind][key])
+        else:
+            raise HTTPError(400, "Неизвестный параметр: %s" % key)
+    try:
+        params = resolve_params(kind, params)
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    return kind, fmt, params, polylines, precision
+
+
+async def read_request(reader):
+    """(метод, цель, заголовки) или None, если клиент закрыл соединение."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "Некорректная строка запроса")
+    headers = {}
+    for _ in range(MAX_HEADERS):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    else:
+        raise HTTPError(400, "Слишком много заголовков")
+    return method, target, headers
+
+
+def percentiles(values, ps=(50, 90, 99)):
+    """Процентили по ближайшему рангу, мс."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {"p%d" % p: 1e3*ordered[min(len(ordered) - 1, max(0, -(-p*len(ordered)//100) - 1))]
+              for p in ps}
+    result["max"] = 1e3*ordered[-1]
+    return result
+
+
+# --- Сервис ---
+
+class GearService:
+    """
+    Пул процессов и слияние одинаковых запросов.
+    inflight - ключ запроса -> asyncio.Future расчёта, пока он идёт.
+    """
+
+    def __init__(self, workers=None, max_queue=64):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_queue = max_queue
+        self.pool = None
+        self.inflight = {}
+        self.started = time.monotonic()
+        self.requests = 0
+        self.coalesced = 0
+        self.computed = 0
+        self.errors = 0
+        self.rejected = 0
+        self.waiting = 0
+        self.latency = collections.defaultdict(lambda: collections.deque(maxlen=LATENCY_WINDOW))
+
+    async def start(self):
+        # spawn: процессы пула не наследуют цикл событий и потоки сервера
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        loop = asyncio.get_running_loop()
+        # По заданию на процесс - пул поднимает все процессы сразу
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _ready) for _ in range(self.workers)))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def generate(self, kind, fmt, params, polylines, precision):
+        key = (kind, fmt, polylines, precision, tuple(sorted(params.items())))
+        future = self.inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            if len(self.inflight) >= self.max_queue:
+                self.rejected += 1
+                raise HTTPError(503, "Очередь заполнена (%d расчётов)" % len(self.inflight))
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.pool, render, kind, params, fmt, polylines, precision)
+            self.inflight[key] = future
+            self.computed += 1
+            future.add_done_callback(lambda _: self.inflight.pop(key, None))
+        self.waiting += 1
+        try:
+            # shield: обрыв одного клиента не отменяет расчёт для остальных
+            return await asyncio.shield(future)
+        finally:
+            self.waiting -= 1
+
+    def stats(self):
+        inflight = len(self.inflight)
+        latency = {name: percentiles(values) for name, values in self.latency.items()}
+        return {
+            "workers": self.workers,
+            "queue_depth": max(0, inflight - self.workers),
+            "inflight": inflight,
+            "waiting_requests": self.waiting,
+            "max_queue": self.max_queue,
+            "requests": self.requests,
+            "computed": self.computed,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "uptime": time.monotonic() - self.started,
+            "latency_ms": latency,
+        }
+
+    async def dispatch(self, method, target):
+        """(статус, тип содержимого, тело) ответа."""
+        if method not in ("GET", "HEAD"):
+            raise HTTPError(405, "Поддерживаются только GET и HEAD")
+        url = urlsplit(target)
+        if url.path == "/health":
+            return 200, "text/plain; charset=utf-8", b"ok\n"
+        if url.path == "/stats":
+            return 200, "application/json", json.dumps(self.stats(), indent=1).encode()
+        if not url.path.startswith("/gear/"):
+            raise HTTPError(404, "Нет такого адреса: %s" % url.path)
+
+        t0 = time.perf_counter()
+        self.requests += 1
+        kind, fmt, params, polylines, precision = parse_gear_request(url.path, url.query)
+        try:
+            body, _ = await self.generate(kind, fmt, params, polylines, precision)
+        except HTTPError:
+            raise
+        except ValueError as e:
+            self.errors += 1
+            raise HTTPError(400, str(e))
+        except Exception as e:
+            self.errors += 1
+            raise HTTPError(500, "%s: %s" % (type(e).__name__, e))
+        dt = time.perf_counter() - t0
+        self.latency["all"].append(dt)
+        self.latency[fmt].append(dt)
+        return 200, FORMATS[fmt], body
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, target, headers = request
+                    status, ctype, body = await self.dispatch(method, target)
+                except HTTPError as e:
+                    method, headers = "GET", {"connection": "close"}
+                    status, ctype, body = e.status, "text/plain; charset=utf-8", (str(e) + "\n").encode()
+                keep_alive = headers.get("connection", "").lower() != "close"
+                head = ["HTTP/1.1 %d %s" % (status, STATUS_TEXT.get(status, "")),
+                        "Content-Type: %s" % ctype,
+                        "Content-Length: %d" % len(body),
+                        "Connection: %s" % ("keep-alive" if keep_alive else "close")]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def check_loopback(host):
+    """Сервис слушает только локальный интерфейс."""
+    if host == "localhost":
+        return
+    try:
+        loopback = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        raise ValueError("Адрес %s не локальный: сервис работает только на loopback" % host)
+
+
+async def serve(host="127.0.0.1", port=8765, workers=None, max_queue=64, ready=None):
+    """Запускает сервис и работает до отмены; ready(server) - после прогрева пула."""
+    check_loopback(host)
+    service = GearService(workers, max_queue)
+    await service.start()
+    server = await asyncio.start_server(service.handle, host, port)
+    try:
+        if ready is not None:
+            ready(server, service)
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def print_help():
+    print("")
+    print("Использование: python -m gearsgen.server [опции]")
+    print("")
+    print("Опции:")
+    print("  -H АДРЕС  Локальный адрес (по умолчанию 127.0.0.1)")
+    print("  -p ПОРТ   Порт (по умолчанию 8765)")
+    print("  -j N      Процессов в пуле (по умолчанию - число ядер)")
+    print("  -q N      Расчётов в работе, сверх которых запросы получают 503 (по умолчанию 64)")
+    print("  -h        Показать эту справку")
+    print("")
+
+
+def main():
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hH:p:j:q:")
+    except getopt.GetoptError:
+        print_help()
+        sys.exit(1)
+    params = dict(host="127.0.0.1", port=8765, workers=None, max_queue=64)
+    for o, a in opts:
+        if o == "-h":
+            print_help()
+            sys.exit()
+        elif o == "-H":
+            params["host"] = a
+        elif o == "-p":
+            params["port"] = int(a)
+        elif o == "-j":
+            params["workers"] = int(a)
+        elif o == "-q":
+            params["max_queue"] = int(a)
+    try:
+        check_loopback(params["host"])
+    except ValueError as e:
+        print("Ошибка: %s" % e)
+        sys.exit(1)
+
+    def ready(server, service):
+        address = server.sockets[0].getsockname()
+        print("gearsgen: http://%s:%d/ (процессов: %d)" % (address[0], address[1], service.workers))
+
+    try:
+        asyncio.run(serve(ready=ready, **params))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,57 @@
 который отвечает за генерацию пары сопряжённых шестерён.
 Такие шестерни взаимодействуют друг с другом с определёнными параметрами."""
 
-from math import sin, cos, pi, sqrt, atan, acos
-from slfmaker import SLFMaker, involute, normalize, findClosest, findClosestDown, toCartesian 
+from math import sin, cos, pi, atan
+from slfmaker import SLFMaker, involute, normalize, toCartesian, involuteClosestY, involuteBelowX, writeLine, streamWrite
+from pitch_placement import pitchPoints
+from pitch_curves import curvatureRadius
+from tooth_locations import ToothLocations
+from transmission import TransmissionTable
+import instrument
+import numpy as np
+
+
+def solveBracketed(f, x0, lower, ftol, maxIterations=100):
+    """
+    Корень монотонно убывающей функции f на (lower, inf).
+    Сначала от x0 ищется интервал со сменой знака (вверх - удвоением шага,
+    вниз - делением расстояния до lower пополам), затем метод Иллинойса.
+
+    :return: (x, число вычислений f, |f(x)|).
+    """
+    iterations = 1
+    a, fa = x0, f(x0)
+    if fa == 0.0:
+        return a, iterations, 0.0
+    step = max(abs(x0 - lower), 1e-6)
+    while True:
+        if fa > 0:
+            b = a + step
+            step *= 2.0
+        else:
+            b = lower + (a - lower) / 2.0
+        fb = f(b)
+        iterations += 1
+        if fa * fb <= 0.0:
+            break
+        a, fa = b, fb
+        if iterations >= maxIterations:
+            raise ValueError("Не удалось найти интервал со сменой знака")
+
+    x, fx = b, fb
+    while abs(fx) > ftol and iterations < maxIterations:
+        x = (a * fb - b * fa) / (fb - fa)
+        fx = f(x)
+        iterations += 1
+        if fx * fb < 0.0:
+            a, fa = b, fb
+        else:
+            fa /= 2.0
+        b, fb = x, fx
+        if abs(b - a) <= 1e-15 * abs(b):
+            break
+    return x, iterations, abs(fx)
+
 
 class ConjugateSLFMaker(SLFMaker):
     """Расширяет функциональность SLFMaker для создания сопряжённых шестерён."""
@@ -19,34 +68,41 @@ class ConjugateSLFMaker(SLFMaker):
         :param depth: Глубина зуба.
         :param tolerance: Допуск для вычислений.
         """
-        # Вызов конструктора базового класса SLFMaker без tolerance
-        super().__init__(teethCount=teethCount, ts=ts, period=period, holedistance=holedistance, depth=depth)
-        
+        super().__init__(teethCount=teethCount, ts=ts, depth=depth, tolerance=tolerance)
+
         # Инициализация дополнительных атрибутов
-        self.tolerance = tolerance
-        self.teethLoc = []
-        self.gapLoc = []
+        self.holedistance = holedistance
+        self.teethLoc = ToothLocations()
+        self.gapLoc = ToothLocations()
         self.periodfactor = period
-        self.conjugateTeethLoc = []
+        self.conjugateTeethLoc = ToothLocations()
+        self.transmission = None
         self.toothSlices = ts
         self.secondOffset = 1.0
 
-        print("est. circular pitch:", self.cpitch, "est. perimeter: ", self.perimeter())
-
-    def write(self, filename):
+    @instrument.stage("write")
+    def write(self, filename, streaming=False, polylines=False, precision=6):
         """
         Записывает данные шестерни в файл.
 
         :param filename: Имя файла для записи.
+        :param streaming: Писать отрезки пачками через DXFStreamWriter.
+        :param polylines: Писать каждый контур одной LWPOLYLINE.
+        :param precision: Знаков после запятой в координатах.
         """
         if not self.teethLoc:
             self.calcPoints()
         if not self.conjugateTeethLoc:
             self.calcConjugatePoints()
-        with open(filename, 'w') as f:
-            self.preamble(f)
-            self.amble(f)
-            self.postamble(f)
+        # Отрезки генерируются по ходу записи: профиль и экспорт - один интервал
+        with instrument.span("profile+export"):
+            if streaming or polylines:
+                streamWrite(filename, self.segments(), polylines, precision)
+                return
+            with open(filename, 'w') as f:
+                self.preamble(f)
+                self.amble(f)
+                self.postamble(f)
 
     def amble(self, f):
         """
@@ -58,6 +114,11 @@ class ConjugateSLFMaker(SLFMaker):
         self.doShape(f, self.teethLoc, "a", "sBlu")
         self.doShape(f, self.conjugateTeethLoc, "b", "sRed")
 
+    def segments(self):
+        """Генератор отрезков обеих шестерён в порядке записи."""
+        yield from self.shapeSegments(self.teethLoc)
+        yield from self.shapeSegments(self.conjugateTeethLoc)
+
     def doShape(self, f, teethLoc, gearLetter, color):
         """
         Рисует форму шестерни.
@@ -67,9 +128,15 @@ class ConjugateSLFMaker(SLFMaker):
         :param gearLetter: Буква для обозначения шестерни.
         :param color: Цвет шестерни.
         """
-        import string
+        for seg in self.shapeSegments(teethLoc):
+            writeLine(f, seg)
 
-        inc = 0.01
+    def shapeSegments(self, teethLoc):
+        """
+        Генератор отрезков ((x1,y1),(x2,y2)) одной шестерни.
+
+        :param teethLoc: Локальные координаты зубьев.
+        """
         teethCount = len(teethLoc)
 
         print("teeth completed: ", end=' ')
@@ -77,30 +144,18 @@ class ConjugateSLFMaker(SLFMaker):
         n = 0
         teeth_ends = []
         inner_pts = []
-        for d in teethLoc:
-            rc = abs(d['rc'])
-            inverseInvoluteTableY = []
-            inverseInvoluteTableX = []
-            t = 0.0
-            while t < pi / 2.0:
-                i = involute(rc, t)
-                inverseInvoluteTableX.append((i[0], t))
-                inverseInvoluteTableY.append((i[1], t))
-                t += inc
+        for r, theta, rc, dx, dy in teethLoc.rows('r', 't', 'rc', 'dx', 'dy'):
+            rc = abs(rc)
 
             # t параметр на пике окружности
-            td = findClosest(inverseInvoluteTableY, self.dedendumd)
+            td = involuteClosestY(rc, self.dedendumd)
 
             # t параметр на вершине зуба
-            tt = findClosest(inverseInvoluteTableY, self.dedendumd + self.adendumd)
+            tt = involuteClosestY(rc, self.dedendumd + self.adendumd)
 
             # Новый радиус и соответствующие x и y
-            r = d['r']
-            x = r * cos(d['t'])
-            y = r * sin(d['t'])
-
-            dx = d['dx']
-            dy = d['dy']
+            x = r * cos(theta)
+            y = r * sin(theta)
 
             dx, dy = normalize(dx, dy)
 
@@ -110,7 +165,7 @@ class ConjugateSLFMaker(SLFMaker):
             offset = (toothWidth / 2.0) + involute(rc, td)[0]
 
             # Убедиться, что инволюта не пересечёт симметричного партнёра
-            tx = findClosestDown(inverseInvoluteTableX, offset)
+            tx = involuteBelowX(rc, offset)
 
             if tt > tx:
                 tt = tx
@@ -147,44 +202,29 @@ class ConjugateSLFMaker(SLFMaker):
 
             for i in range(len(pts)):
                 # Рисуем линию для левой стороны зуба
-                f.write("  0\nLINE\n")
-                f.write("  8\n %s \n" % ('gear'))  # Имя слоя
                 if i == 0:
                     # Для первой линии не имеет смысла соединять с предыдущей
-                    f.write(" 10\n%f\n" % pts[i][0][0])
-                    f.write(" 20\n%f\n" % pts[i][0][1])
+                    start = pts[i][0]
                 else:
-                    f.write(" 10\n%f\n" % pts[i - 1][0][0])
-                    f.write(" 20\n%f\n" % pts[i - 1][0][1])
-                f.write(" 11\n%f\n" % pts[i][0][0])
-                f.write(" 21\n%f\n" % pts[i][0][1])
+                    start = pts[i - 1][0]
+                yield (start, pts[i][0])
 
                 # Рисуем линию для правой стороны зуба
-                f.write("  0\nLINE\n")
-                f.write("  8\n %s \n" % ('gear'))
                 if i == 0:
-                    f.write(" 10\n%f\n" % pts[i][1][0])
-                    f.write(" 20\n%f\n" % pts[i][1][1])
+                    start = pts[i][1]
                 else:
-                    f.write(" 10\n%f\n" % pts[i - 1][1][0])
-                    f.write(" 20\n%f\n" % pts[i - 1][1][1])
-                f.write(" 11\n%f\n" % pts[i][1][0])
-                f.write(" 21\n%f\n" % pts[i][1][1])
+                    start = pts[i - 1][1]
+                yield (start, pts[i][1])
 
             # Сохраняем первые две точки для соединения зубьев
             teeth_ends.append((pts[0][0][0], pts[0][0][1], pts[0][1][0], pts[0][1][1],))
 
             # Соединяем последние две точки вершины зуба
-            f.write("  0\nLINE\n")
-            f.write("  8\n %s \n" % ('gear'))
-            f.write(" 10\n%f\n" % pts[-1][0][0])
-            f.write(" 20\n%f\n" % pts[-1][0][1])
-            f.write(" 11\n%f\n" % pts[-1][1][0])
-            f.write(" 21\n%f\n" % pts[-1][1][1])
+            yield (pts[-1][0], pts[-1][1])
 
             # Внутренняя точка на внутреннем валу
-            ri = self.innerradius(d['t'])
-            xi, yi = toCartesian(ri, d['t'])
+            ri = self.innerradius(theta)
+            xi, yi = toCartesian(ri, theta)
 
             inner_pts.append((xi, yi,))
 
@@ -194,29 +234,23 @@ class ConjugateSLFMaker(SLFMaker):
 
         # Соединяем внутренний радиус
         for i in range(len(inner_pts)):
-            f.write("  0\nLINE\n")
-            f.write("  8\n %s \n" % ('gear'))  # Имя слоя
             if i == 0:
-                f.write(" 10\n%f\n" % inner_pts[-1][0])
-                f.write(" 20\n%f\n" % inner_pts[-1][1])
+                start = inner_pts[-1]
             else:
-                f.write(" 10\n%f\n" % inner_pts[i - 1][0])
-                f.write(" 20\n%f\n" % inner_pts[i - 1][1])
-            f.write(" 11\n%f\n" % inner_pts[i][0])
-            f.write(" 21\n%f\n" % inner_pts[i][1])
+                start = inner_pts[i - 1]
+            yield (start, inner_pts[i])
 
         # Соединяем зубья
         for i in range(len(teeth_ends)):
-            f.write("  0\nLINE\n")
-            f.write("  8\n %s \n" % ('gear'))  # Имя слоя
             if i == 0:
-                f.write(" 10\n%f\n" % teeth_ends[-1][0])
-                f.write(" 20\n%f\n" % teeth_ends[-1][1])
+                start = teeth_ends[-1][:2]
             else:
-                f.write(" 10\n%f\n" % teeth_ends[i - 1][0])
-                f.write(" 20\n%f\n" % teeth_ends[i - 1][1])
-            f.write(" 11\n%f\n" % teeth_ends[i][2])
-            f.write(" 21\n%f\n" % teeth_ends[i][3])
+                start = teeth_ends[i - 1][:2]
+            yield (start, (teeth_ends[i][2], teeth_ends[i][3]))
+
+        # Счётчики - одним вызовом на шестерню, не на отрезок
+        instrument.count("theta steps", n * self.toothSlices)
+        instrument.count("segments emitted", n * (2 * self.toothSlices + 1) + len(inner_pts) + len(teeth_ends))
 
     def preamble(self, f):
         """
@@ -237,66 +271,18 @@ class ConjugateSLFMaker(SLFMaker):
         f.write("  0\nENDSEC\n")
         f.write("  0\nEOF\n")
 
-    def radiusOfCurvature(self, t):
-        """
-        Вычисляет радиус кривизны в точке t.
-
-        :param t: Угол в радианах.
-        :return: Радиус кривизны.
-        """
-        dx = self.dx(t)
-        dy = self.dy(t)
-        dx2 = self.dx2(t)
-        dy2 = self.dy2(t)
-
-        return ((dx * dx + dy * dy) ** 1.5) / (dx * dy2 - dx2 * dy)
-
+    @instrument.stage("placement")
     def calcPoints(self):
         """
         Вычисляет точки для зубьев шестерни с учётом заданной точности.
         """
-        refinement = 1
+        # Шаг и позиции зубьев ищутся по таблице длины дуги кривой дедендума,
+        # tolerance - допустимая ошибка длины дуги (см. pitch_placement.py).
         halfteethCount = self.teethCount * 2
-        halfpitch = self.cpitch / 2.0
-
-        while True:
-            module = halfpitch * 2.0 / pi
-
-            self.dedendumd = module * 1.25
-            self.adendumd = module
-
-            ccd = 0.0
-
-            theta = 0.0
-            ro = self.outerradius(0) - self.dedendumd
-
-            fx = lx = ro * cos(0)
-            fy = ly = ro * sin(0)
-
-            actualTeeth = 1
-
-            while theta < 2.0 * pi:
-                theta += self.tolerance
-                ro = self.outerradius(theta) - self.dedendumd
-                x = ro * cos(theta)
-                y = ro * sin(theta)
-                # Добавляем расстояние от последней точки
-                ccd += sqrt((x - lx) ** 2 + (y - ly) ** 2)
-                if (ccd >= halfpitch and actualTeeth < halfteethCount):
-                    # Добавляем новый набор точек
-                    actualTeeth += 1
-                    ccd = 0.0
-
-                lx = x
-                ly = y
-
-            print("refinement", refinement, ",", "half-teeth =", actualTeeth, "extra = ", ccd, "c pitch = ", halfpitch * 2.0)
-            # Проверяем, достигли ли нужного количества зубьев с допустимым отклонением
-            if halfteethCount == actualTeeth and (abs(ccd - halfpitch) < self.tolerance * 5):
-                break
-
-            refinement += 1
-            halfpitch = (halfpitch * actualTeeth + ccd) / (halfteethCount + 1)
+        halfpitch, thetas, refinement = pitchPoints(self.outerradius, halfteethCount,
+                                                    self.tolerance, self.cpitch / 2.0)
+        instrument.count("refinement passes", refinement)
+        print(f"refinements {refinement}, half-teeth = {halfteethCount}, c pitch = {halfpitch * 2.0}")
 
         self.cpitch = halfpitch * 2.0
 
@@ -312,172 +298,110 @@ class ConjugateSLFMaker(SLFMaker):
         print("adendum distance =", self.adendumd)
         print("tooth height =", self.dedendumd + self.adendumd)
 
-        # Вычисляем финальную доработку и сохраняем данные
-        ccd = 0.0
-        theta = 0.0
-        ro = self.outerradius(theta) - self.dedendumd
-
-        lx = ro * cos(theta)
-        ly = ro * sin(theta)
-
-        rc = self.radiusOfCurvature(theta)
-
-        self.teethLoc = [{
-            'x': lx, 'y': ly, 'r': ro, 't': 0.0, 
-            'rc': rc, 
-            'dx': self.dx(0.0), 'dy': self.dy(0.0), 
-            'dx2': self.dx2(0.0), 'dy2': self.dy2(0.0)
-        }]
-        self.gapLoc = []
-        gapFlag = 1
-
-        print("вычисление точек для финальной доработки")
-
-        actualTeeth = 1
-
-        while actualTeeth < halfteethCount:
-            theta += self.tolerance
-            ro = self.outerradius(theta) - self.dedendumd
-            x = ro * cos(theta)
-            y = ro * sin(theta)
-            # Добавляем расстояние от последней точки
-            ccd = sqrt((x - lx) ** 2 + (y - ly) ** 2)
-            if (ccd >= halfpitch):
-                # Добавляем новый набор точек
-                rc = self.radiusOfCurvature(theta)
-                if gapFlag:
-                    self.gapLoc.append({
-                        'x': x, 'y': y, 'r': ro, 't': theta, 
-                        'rc': rc, 
-                        'dx': self.dx(theta), 'dy': self.dy(theta), 
-                        'dx2': self.dx2(theta), 'dy2': self.dy2(theta)
-                    })
-                else:
-                    self.teethLoc.append({
-                        'x': x, 'y': y, 'r': ro, 't': theta, 
-                        'rc': rc, 
-                        'dx': self.dx(theta), 'dy': self.dy(theta), 
-                        'dx2': self.dx2(theta), 'dy2': self.dy2(theta)
-                    })
-
-                gapFlag = not gapFlag
-                lx = x
-                ly = y
-                actualTeeth += 1
+        # Зубья и впадины чередуются, первый - зуб в theta = 0.
+        # Кривая во всех позициях - одним вычислением на массиве
+        p = self.curve.evaluate(thetas)
+        ro = p.r - self.dedendumd
+        locs = ToothLocations.fromColumns(x=ro * np.cos(thetas), y=ro * np.sin(thetas), r=ro, t=thetas,
+                                          rc=curvatureRadius(p), dx=p.dx, dy=p.dy, dx2=p.dx2, dy2=p.dy2)
+        self.teethLoc = locs[0::2]
+        self.gapLoc = locs[1::2]
+
+    def conjugateLocations(self, holedistance):
+        """
+        Строит сопряжённые точки для заданного расстояния между отверстиями.
+
+        :param holedistance: Расстояние между отверстиями.
+        :return: (точки, полный угол поворота сопряжённой шестерни).
+                 При замыкании угол равен 2*pi, а последняя точка совпадает с первой.
+        """
+        # При фиксированном holedistance приращение угла на каждом шаге (теорема
+        # косинусов) зависит только от пары соседних впадин, а сами углы -
+        # префиксная сумма приращений: всё считается на массивах за O(1) вызовов numpy.
+        index = np.arange(len(self.gapLoc) * self.periodfactor + 1) % self.teethCount
+        source = self.gapLoc[index]
+        r = source['r']
+        rp = holedistance - (r + 2.0 * self.dedendumd)
+
+        r1, r2 = r[1:], r[:-1]
+        rp1, rp2 = rp[1:], rp[:-1]
+        dt = np.diff(source['t'])
+
+        # Вычисление разности углов для сопряжения
+        numerator = (r1 ** 2.0 + r2 ** 2.0 - 2.0 * r1 * r2 * np.cos(dt) - rp1 ** 2.0 - rp2 ** 2.0)
+        denominator = (-2.0 * rp1 * rp2)
+        # Проверка, чтобы аргумент acos был в пределах [-1, 1]
+        if np.any(denominator == 0):
+            raise ValueError("Деление на ноль при вычислении acos")
+        # Ограничение значения аргумента acos
+        dtp = np.arccos(np.clip(numerator / denominator, -1.0, 1.0))
+        steps = np.cumsum(dtp)
+        total = float(steps[-1]) if len(steps) else 0.0
+
+        t0 = pi - float(source['t'][0])
+        ts = np.mod(np.concatenate(([t0], t0 + steps)), 2.0 * pi)
+
+        # rc, dx2, dy2 берутся у впадины-прообраза, касательная - перпендикуляр к радиусу
+        locs = ToothLocations.fromColumns(x=np.cos(ts) * rp, y=np.sin(ts) * rp, r=rp, t=ts,
+                                          rc=source['rc'], dx=-np.sin(ts), dy=np.cos(ts),
+                                          dx2=source['dx2'], dy2=source['dy2'])
+        return locs, total
+
+    def closureGap(self, holedistance):
+        """
+        Невязка замыкания: полный угол сопряжённой шестерни минус 2*pi.
+        Монотонно убывает с ростом holedistance.
+        """
+        return self.conjugateLocations(holedistance)[1] - 2.0 * pi
 
+    @instrument.stage("conjugate")
     def calcConjugatePoints(self):
         """
         Вычисляет сопряжённые точки шестерён.
+        Расстояние между отверстиями ищется как корень closureGap.
         """
         self.secondOffset = 1.2 * self.holedistance / 2.0
 
         print("вычисление сопряжённых точек")
 
-        while True:
-            p = self.gapLoc[0]
-
-            r = self.holedistance - (p['r'] + 2.0 * self.dedendumd)
-            t = pi - p['t']
-            x, y = toCartesian(r, t)
-
-            dx = -sin(t)
-            dy = cos(t)
-
-            self.conjugateTeethLoc = [{
-                'x': x,
-                'y': y,
-                'r': r,
-                't': t,
-                'rc': p['rc'],
-                'dx': dx,
-                'dy': dy,
-                'dx2': p['dx2'],
-                'dy2': p['dy2']
-            }]
-
-            n = 1
-            while n < len(self.gapLoc) * self.periodfactor + 1:
-                p = self.gapLoc[n % self.teethCount]
-
-                rp1 = self.holedistance - (p['r'] + 2.0 * self.dedendumd)
-                rp2 = self.conjugateTeethLoc[n - 1]['r']
-
-                r1 = self.gapLoc[n % self.teethCount]['r']
-                r2 = self.gapLoc[(n - 1) % self.teethCount]['r']
-
-                dt = self.gapLoc[n % self.teethCount]['t'] - self.gapLoc[(n - 1) % self.teethCount]['t']
-
-                # Вычисление разности углов для сопряжения
-                numerator = (r1 ** 2.0 + r2 ** 2.0 - 2.0 * r1 * r2 * cos(dt) - rp1 ** 2.0 - rp2 ** 2.0)
-                denominator = (-2.0 * rp1 * rp2)
-                # Проверка, чтобы аргумент acos был в пределах [-1, 1]
-                if denominator == 0:
-                    raise ValueError("Деление на ноль при вычислении acos")
-                arg = numerator / denominator
-                # Ограничение значения аргумента acos
-                arg = max(min(arg, 1.0), -1.0)
-                dtp = acos(arg)
-                t = self.conjugateTeethLoc[n - 1]['t'] + dtp
-                if t < 0:
-                    t += 2.0 * pi
-                if t > 2.0 * pi:
-                    t -= 2.0 * pi
-
-                x = cos(t) * rp1
-                y = sin(t) * rp1
-
-                dx = -sin(t)
-                dy = cos(t)
-
-                self.conjugateTeethLoc.append({
-                    'x': x,
-                    'y': y,
-                    'r': rp1,
-                    't': t,
-                    'rc': p['rc'],
-                    'dx': dx,
-                    'dy': dy,
-                    'dx2': p['dx2'],
-                    'dy2': p['dy2']
-                })
-                n += 1
-
-            if n < self.teethCount * self.periodfactor + 1:
-                self.holedistance += self.tolerance
-            elif n > self.teethCount * self.periodfactor + 1:
-                self.holedistance -= self.tolerance
-            else:  # должно быть равно
-                gap = sqrt(
-                    (self.conjugateTeethLoc[-1]['x'] - self.conjugateTeethLoc[0]['x']) ** 2 +
-                    (self.conjugateTeethLoc[-1]['y'] - self.conjugateTeethLoc[0]['y']) ** 2
-                )
-                if gap >= self.tolerance * 10:
-                    if t >= 2.0 * pi:
-                        self.holedistance += self.tolerance
-                    else:
-                        self.holedistance -= self.tolerance
-                else:
-                    self.conjugateTeethLoc = self.conjugateTeethLoc[:-1]
-                    break
+        # Ниже этой границы радиусы сопряжённой шестерни становятся отрицательными
+        lower = float(self.gapLoc['r'].max()) + 2.0 * self.dedendumd
+        self.holedistance, self.conjugateIterations, self.conjugateResidual = solveBracketed(
+            self.closureGap, max(self.holedistance, lower * 1.01), lower, self.tolerance * 1e-3)
+        instrument.count("holedistance adjustments", self.conjugateIterations)
+        print("итераций:", self.conjugateIterations, "невязка:", self.conjugateResidual)
+
+        locs, _ = self.conjugateLocations(self.holedistance)
+        # Последняя точка совпадает с первой
+        self.conjugateTeethLoc = locs[:-1].copy()
 
         print("используется расстояние между отверстиями:", repr(self.holedistance))
-        for n in range(len(self.conjugateTeethLoc)):
-            before = n - 1
-            after = n + 1
+        # Касательная - разность соседних точек (по кругу)
+        x = self.conjugateTeethLoc['x']
+        y = self.conjugateTeethLoc['y']
+        self.conjugateTeethLoc['dx'] = np.roll(x, -1) - np.roll(x, 1)
+        self.conjugateTeethLoc['dy'] = np.roll(y, -1) - np.roll(y, 1)
+
+        self.transmission = self.transmissionTable()
+        print("невязка закона движения:", self.transmission.closureError)
 
-            if before < 0:
-                before += len(self.conjugateTeethLoc)
-            if after >= len(self.conjugateTeethLoc):
-                after -= len(self.conjugateTeethLoc)
-            dt = self.conjugateTeethLoc[after]['t'] - self.conjugateTeethLoc[before]['t']
-            if dt < 0:
-                dt += 2.0 * pi
+    def transmissionTable(self, samplesPerTooth=64):
+        """
+        Закон движения пары на плотной сетке (TransmissionTable): theta2(theta1),
+        передаточное отношение и скорость ведомой для массивов углов.
 
-            dx = self.conjugateTeethLoc[after]['x'] - self.conjugateTeethLoc[before]['x']
-            dy = self.conjugateTeethLoc[after]['y'] - self.conjugateTeethLoc[before]['y']
+        Зубья сопряжённой шестерни расставлены по равным хордам кривых впадин,
+        которые обкатываются на расстоянии holedistance - 2*dedendumd; таблица -
+        непрерывный вариант той же обкатки, нормированный на один оборот
+        ведомой за periodfactor оборотов ведущей. theta1 - полярный угол
+        ведущей в точке контакта.
 
-            self.conjugateTeethLoc[n]['dx'] = dx
-            self.conjugateTeethLoc[n]['dy'] = dy
+        :param samplesPerTooth: Узлов таблицы на зуб.
+        """
+        return TransmissionTable.fromPitch(lambda t: self.outerradius(t) - self.dedendumd,
+                                           self.holedistance - 2.0 * self.dedendumd,
+                                           2.0 * pi * self.periodfactor,
+                                           self.teethCount * self.periodfactor * samplesPerTooth)
 
     @staticmethod
     def teethCmp(x, y):
@@ -525,6 +449,10 @@ class ConjugateSLFMakerSphereTeeth(ConjugateSLFMaker):
         # Реализуйте метод согласно вашим требованиям
         pass
 
+    def shapeSegments(self, points):
+        """Шариковые зубья пока не рисуются - отрезков нет."""
+        return iter(())
+
 if __name__ == "__main__":
     # Пример создания и использования класса ConjugateSLFMaker
     teeth_count = 20  # Укажите необходимое количество зубьев
@@ -0,0 +1,250 @@
+# gearsbatch.py
+#!/usr/bin/python
+
+"""Пакетная генерация шестерён по сетке параметров (CSV/JSON) в пуле процессов.
+
+Каждое задание - одна строка CSV или один объект JSON с полем kind
+(circle, oval, ellipse, conj-oval, pair) и параметрами конструктора.
+В JSON вместо списка заданий можно задать перебор:
+
+    {"kind": "oval", "teeth": 30, "sweep": {"e": [0.1, 0.15, 0.2], "nodes": [2, 3]}}
+
+Каждый результат сразу пишется в свой DXF (потоковый писатель),
+в конце печатается сводка по производительности."""
+
+import contextlib
+import csv
+import getopt
+import importlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import instrument
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+# Параметры по умолчанию - как в скриптах circular_gear.py, oval_gear.py, el-gear.py,
+# conj_oval_gear.py и в приложении v4.0
+DEFAULTS = {
+    "circle": dict(teeth=20, ts=10, oradius=1.0, iradius=0.125, depth=0.2, tolerance=0.001),
+    "oval": dict(teeth=30, ts=10, a=1.0, e=0.15, nodes=2, iradius=0.0625, depth=0.25, tolerance=0.001),
+    "ellipse": dict(teeth=20, ts=10, a=1.0, e=0.65, iradius=0.0625, depth=0.25, tolerance=0.001),
+    "conj-oval": dict(teeth=40, ts=10, a=1.0, e=0.15, nodes=2, period=2, holedistance=3.0,
+                      iradius=0.0625, depth=0.25, tolerance=0.001),
+    "pair": dict(t1=20, a1=50.0, b1=40.0, t2=20, a2=50.0, b2=40.0, module=2.0,
+                 pressure_angle=20.0, clearance=0.25),
+}
+
+def print_help():
+    print("")
+    print(f"Использование: python {sys.argv[0]} [опции] ФАЙЛ.csv|ФАЙЛ.json")
+    print("")
+    print("Опции:")
+    print("  -j N      Число процессов (по умолчанию - число ядер)")
+    print("  -o DIR    Каталог для DXF (по умолчанию текущий)")
+    print("  -P        Контуры одной LWPOLYLINE вместо отдельных LINE")
+    print("  -d N      Знаков после запятой в координатах DXF (по умолчанию 6)")
+    print("  -I        Профиль каждого задания (этапы, счётчики) в ИМЯ.dxf.profile.json")
+    print("            и общая таблица по всем заданиям")
+    print("  -h        Показать эту справку")
+    print("")
+    print("Типы (kind) и параметры по умолчанию:")
+    for kind, params in DEFAULTS.items():
+        print("  %-10s %s" % (kind, ", ".join("%s=%s" % kv for kv in params.items())))
+    print("")
+    print("Необязательное поле out - имя DXF, иначе KIND_NNNN.dxf.")
+    print("")
+
+def parse_value(v):
+    """Число из ячейки CSV, иначе строка как есть."""
+    if not isinstance(v, str):
+        return v
+    v = v.strip()
+    for conv in (int, float):
+        try:
+            return conv(v)
+        except ValueError:
+            pass
+    return v
+
+def expand(entry):
+    """Задание JSON -> список заданий (перебор декартова произведения sweep)."""
+    entry = dict(entry)
+    sweep = entry.pop("sweep", None)
+    if not sweep:
+        return [entry]
+    keys = list(sweep)
+    return [dict(entry, **dict(zip(keys, values)))
+            for values in itertools.product(*(sweep[k] for k in keys))]
+
+def load_jobs(filename):
+    """Чтение сетки параметров из CSV (строка = задание) или JSON."""
+    if filename.lower().endswith(".json"):
+        with open(filename) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [data]
+        return [job for entry in data for job in expand(entry)]
+
+    jobs = []
+    with open(filename, newline="") as f:
+        for row in csv.DictReader(f):
+            jobs.append({k.strip(): parse_value(v) for k, v in row.items() if v not in (None, "")})
+    return jobs
+
+def build_gear(kind, params):
+    """Создание объекта-шестерни v0.0 по типу задания."""
+    if kind == "circle":
+        from circular_gear import circle
+        return circle(**params)
+    if kind == "oval":
+        from oval_gear import oval
+        return oval(**params)
+    if kind == "ellipse":
+        return importlib.import_module("el-gear").makeEllipse(**params)
+    if kind == "conj-oval":
+        from conj_oval_gear import oval
+        return oval(**params)
+    raise ValueError(f"Тип шестерёнки '{kind}' не поддерживается.")
+
+def write_pair(filename, params, polylines, precision):
+    """
+    Эллиптическая пара v4.0 -> DXF через пакет gearsgen: модули v4.0
+    (transmission, instrument, dxf_stream) совпадают по имени с модулями v0.0
+    и в одном процессе с ними не уживаются, а в пакете они свои.
+    """
+    # Корень репозитория - первым: в v0.0 есть одноимённый скрипт gearsgen.py
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    import gearsgen
+    from gearsgen import instrument as gearsgen_instrument
+
+    # Замеры пакета - в профиль задания (-I), под теми же интервалами pair и export
+    with instrument.span("pair"):
+        with gearsgen_instrument.profiling() as inner:
+            geometry = gearsgen.build("pair", **params)
+        instrument.absorb(inner)
+    with gearsgen_instrument.profiling() as inner:
+        gearsgen.write_dxf(geometry, filename, polylines=polylines, precision=precision)
+    instrument.absorb(inner)
+
+def run_job(index, job, outdir, polylines, precision, profile=False):
+    """
+    Выполняется в процессе пула: строит шестерню и пишет DXF.
+    Возвращает (index, filename, seconds, error, профиль - dict или None).
+    """
+    t0 = time.perf_counter()
+    job = dict(job)
+    kind = str(job.pop("kind", "")).lower()
+    filename = os.path.join(outdir, job.pop("out", "%s_%04d.dxf" % (kind, index)))
+    try:
+        if kind not in DEFAULTS:
+            raise ValueError(f"Тип шестерёнки '{kind}' не поддерживается.")
+        unknown = set(job) - set(DEFAULTS[kind])
+        if unknown:
+            raise ValueError("Неизвестные параметры: " + ", ".join(sorted(unknown)))
+        params = dict(DEFAULTS[kind], **job)
+        # Конструкторы v0.0 печатают ход расчёта - в пакетном режиме он не нужен
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), \
+                (instrument.profiling() if profile else contextlib.nullcontext()) as report:
+            if kind == "pair":
+                write_pair(filename, params, polylines, precision)
+            else:
+                gear = build_gear(kind, params)
+                gear.write(filename, streaming=True, polylines=polylines, precision=precision)
+        if report is not None:
+            report.dump(filename + ".profile.json")
+            report = report.to_dict()
+    except Exception as e:
+        return index, filename, time.perf_counter() - t0, f"{type(e).__name__}: {e}", None
+    return index, filename, time.perf_counter() - t0, None, report
+
+def parse_args():
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "hj:o:Pd:I")
+    except getopt.GetoptError:
+        print_help()
+        sys.exit(1)
+
+    workers = os.cpu_count() or 1
+    outdir = "."
+    polylines = False
+    precision = 6
+    profile = False
+
+    for o, a in opts:
+        if o == "-h":
+            print_help()
+            sys.exit()
+        elif o == "-j":
+            workers = int(a)
+        elif o == "-o":
+            outdir = a
+        elif o == "-P":
+            polylines = True
+        elif o == "-d":
+            precision = int(a)
+        elif o == "-I":
+            profile = True
+
+    if len(args) != 1:
+        print("Ошибка: не указан файл с сеткой параметров.")
+        print_help()
+        sys.exit(1)
+
+    return {
+        "gridfile": args[0],
+        "workers": workers,
+        "outdir": outdir,
+        "polylines": polylines,
+        "precision": precision,
+        "profile": profile
+    }
+
+def main():
+    params = parse_args()
+    jobs = load_jobs(params["gridfile"])
+    outdir = params["outdir"]
+    os.makedirs(outdir, exist_ok=True)
+
+    print(f"Заданий: {len(jobs)}, процессов: {params['workers']}")
+    t0 = time.perf_counter()
+    busy = 0.0
+    failed = 0
+    total_bytes = 0
+    profile = instrument.Profile()
+    with ProcessPoolExecutor(max_workers=params["workers"]) as pool:
+        futures = [pool.submit(run_job, i, job, outdir, params["polylines"], params["precision"],
+                               params["profile"])
+                   for i, job in enumerate(jobs)]
+        for done, future in enumerate(as_completed(futures), 1):
+            index, filename, seconds, error, report = future.result()
+            busy += seconds
+            if report is not None:
+                profile.merge(instrument.Profile.from_dict(report))
+            if error:
+                failed += 1
+                print(f"[{done}/{len(jobs)}] #{index} ОШИБКА {error}")
+                continue
+            total_bytes += os.path.getsize(filename)
+            print(f"[{done}/{len(jobs)}] #{index} {filename} {seconds:.2f} с")
+    wall = time.perf_counter() - t0
+
+    print("")
+    print(f"Готово: {len(jobs) - failed} из {len(jobs)}, ошибок: {failed}")
+    print(f"Время: {wall:.2f} с, {len(jobs) / wall:.2f} шестерён/с, "
+          f"{total_bytes / wall / 1e6:.2f} МБ/с DXF")
+    print(f"Суммарное время заданий: {busy:.2f} с, ускорение пула: {busy / wall:.2f}x")
+    if params["profile"]:
+        print("")
+        print(profile.table())
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
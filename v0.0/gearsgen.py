@@ -28,6 +28,8 @@ def print_help():
     print("  -y X      Смещение по оси Y")
     print("  -r X      Поворот шестерёнки на угол X (в градусах)")
     print("  -f T      Имя выходного файла DXF")
+    print("  -P        Контуры одной LWPOLYLINE вместо отдельных LINE")
+    print("  -d N      Знаков после запятой в координатах DXF (по умолчанию 6)")
     print("  -h        Показать эту справку")
     print("")
     print("Примеры:")
@@ -37,7 +39,7 @@ def print_help():
 
 def parse_args():
     try:
-        opts, args = getopt.getopt(sys.argv[1:], "hg:i:n:m:c:a:p:s:t:D:A:el:x:y:r:f:")
+        opts, args = getopt.getopt(sys.argv[1:], "hg:i:n:m:c:a:p:s:t:D:A:el:x:y:r:f:Pd:")
     except getopt.GetoptError:
         print_help()
         sys.exit(1)
@@ -59,6 +61,8 @@ def parse_args():
     off_y = 0.0
     off_r = 0.0
     outfile = ""
+    polylines = False
+    precision = 6
 
     for o, a in opts:
         if o == "-h":
@@ -98,6 +102,10 @@ def parse_args():
             off_r = float(a)
         elif o == "-f":
             outfile = a
+        elif o == "-P":
+            polylines = True
+        elif o == "-d":
+            precision = int(a)
 
     if not gear_type:
         print("Ошибка: Тип шестерёнки не указан.")
@@ -121,7 +129,9 @@ def parse_args():
         "off_x": off_x,
         "off_y": off_y,
         "off_r": off_r,
-        "outfile": outfile
+        "outfile": outfile,
+        "polylines": polylines,
+        "precision": precision
     }
 
 def main():
@@ -144,6 +154,8 @@ def main():
     off_y = params["off_y"]
     off_r = params["off_r"]
     outfile = params["outfile"]
+    polylines = params["polylines"]
+    precision = params["precision"]
 
     # Выбор типа шестерёнки
     if gear_type == "circular":
@@ -174,7 +186,7 @@ def main():
 
     # Генерация и экспорт шестерёнки
     if outfile:
-        gear.write(outfile)
+        gear.write(outfile, polylines=polylines, precision=precision)
     else:
         # Вызов calcPoints() перед get_lines()
         gear.calcPoints()
@@ -4,16 +4,21 @@
 Это полезно, например, для эллиптических шестерён, 
 которые должны сцепляться только при определённой фазе."""
 
-from math import sin, cos, pi, sqrt, atan
+from math import sin, cos, pi, atan
 from slfmaker import *
+from pitch_placement import pitchPoints
+from pitch_curves import curvatureRadius
+from tooth_locations import ToothLocations
+import numpy as np
+import instrument
 
 class OffsetPairSLFMaker:
     """Создаёт пары шестерён с фазовым смещением."""
     def __init__(self, teethCount, ts=5, depth=0.1, tolerance=0.001, secondOffset=1.2):
         self.depth = depth
         self.secondOffset = secondOffset
-        self.teethLoc = []
-        self.gapLoc = []
+        self.teethLoc = ToothLocations()
+        self.gapLoc = ToothLocations()
         self.teethCount = teethCount
         self.cpitch = self.perimeter() / self.teethCount
         self.toothSlices = ts
@@ -21,23 +26,36 @@ class OffsetPairSLFMaker:
 
         self.tolerance = tolerance
 
-    def write(self, filename):
+    @instrument.stage("write")
+    def write(self, filename, streaming=False, polylines=False, precision=6):
         if not self.teethLoc:
             self.calcPoints()
-        with open(filename, 'w') as f:
-            self.preamble(f)
-            self.amble(f)
-            self.postamble(f)
+        # Отрезки генерируются по ходу записи: профиль и экспорт - один интервал
+        with instrument.span("profile+export"):
+            if streaming or polylines:
+                streamWrite(filename, self.segments(), polylines, precision)
+                return
+            with open(filename, 'w') as f:
+                self.preamble(f)
+                self.amble(f)
+                self.postamble(f)
 
     def amble(self, f):
         self.doShape(f, self.gapLoc, "a", "sBlu")
         self.doShape(f, self.teethLoc, "b", "sRed")
 
+    def segments(self):
+        """Генератор отрезков обеих шестерён в порядке записи."""
+        yield from self.shapeSegments(self.gapLoc)
+        yield from self.shapeSegments(self.teethLoc)
+
     def doShape(self, f, teethLoc, gearLetter, color):
         """Создание геометрии зубчатого колеса в файле."""
-        import string
+        for seg in self.shapeSegments(teethLoc):
+            writeLine(f, seg)
 
-        inc = 0.01
+    def shapeSegments(self, teethLoc):
+        """Генератор отрезков ((x1,y1),(x2,y2)) одной шестерни."""
         teethCount = len(teethLoc)
 
         print("teeth completed: ", end=' ')
@@ -45,33 +63,21 @@ class OffsetPairSLFMaker:
         n = 0
         teeth_ends = []
         inner_pts = []
-        for d in teethLoc:
-            rc = abs(d['rc'])
-            inverseInvoluteTableY = []
-            inverseInvoluteTableX = []
-            t = 0.0
-            while t < pi / 2.0:
-                i = involute(rc, t)
-                inverseInvoluteTableX.append((i[0], t))
-                inverseInvoluteTableY.append((i[1], t))
-                t += inc
+        for r, theta, rc, dx, dy in teethLoc.rows('r', 't', 'rc', 'dx', 'dy'):
+            rc = abs(rc)
 
-            td = findClosest(inverseInvoluteTableY, self.dedendumd)
-            tt = findClosest(inverseInvoluteTableY, self.dedendumd + self.adendumd)
+            td = involuteClosestY(rc, self.dedendumd)
+            tt = involuteClosestY(rc, self.dedendumd + self.adendumd)
 
-            r = d['r']
-            x = r * cos(d['t'])
-            y = r * sin(d['t'])
-
-            dx = d['dx']
-            dy = d['dy']
+            x = r * cos(theta)
+            y = r * sin(theta)
 
             dx, dy = normalize(dx, dy)
 
             toothWidth = self.cpitch / 2.0
             offset = (toothWidth / 2.0) + involute(rc, td)[0]
 
-            tx = findClosestDown(inverseInvoluteTableX, offset)
+            tx = involuteBelowX(rc, offset)
 
             if (tt > tx):
                 tt = tx
@@ -109,43 +115,28 @@ class OffsetPairSLFMaker:
             # Рисование линий зуба
             for i in range(0, len(pts)):
                 # Линия левой стороны
-                f.write("  0\nLINE\n")
-                f.write("  8\n %s \n" % ('gear'))  # Имя слоя
                 if(i == 0):
-                    f.write(" 10\n%f\n" % pts[i][0][0])
-                    f.write(" 20\n%f\n" % pts[i][0][1])
+                    start = pts[i][0]
                 else:
-                    f.write(" 10\n%f\n" % pts[i-1][0][0])
-                    f.write(" 20\n%f\n" % pts[i-1][0][1])
-                f.write(" 11\n%f\n" % pts[i][0][0])
-                f.write(" 21\n%f\n" % pts[i][0][1])
+                    start = pts[i-1][0]
+                yield (start, pts[i][0])
 
                 # Линия правой стороны
-                f.write("  0\nLINE\n")
-                f.write("  8\n %s \n" % ('gear'))
                 if(i == 0):
-                    f.write(" 10\n%f\n" % pts[i][1][0])
-                    f.write(" 20\n%f\n" % pts[i][1][1])
+                    start = pts[i][1]
                 else:
-                    f.write(" 10\n%f\n" % pts[i-1][1][0])
-                    f.write(" 20\n%f\n" % pts[i-1][1][1])
-                f.write(" 11\n%f\n" % pts[i][1][0])
-                f.write(" 21\n%f\n" % pts[i][1][1])
+                    start = pts[i-1][1]
+                yield (start, pts[i][1])
 
             # Сохранение начальных точек для соединения зубов
             teeth_ends.append((pts[0][0][0], pts[0][0][1], pts[0][1][0], pts[0][1][1],))
 
             # Соединение последних точек зуба
-            f.write("  0\nLINE\n")
-            f.write("  8\n %s \n" % ('gear'))
-            f.write(" 10\n%f\n" % pts[-1][0][0])
-            f.write(" 20\n%f\n" % pts[-1][0][1])
-            f.write(" 11\n%f\n" % pts[-1][1][0])
-            f.write(" 21\n%f\n" % pts[-1][1][1])
+            yield (pts[-1][0], pts[-1][1])
 
             # Внутренние точки для внутреннего отверстия
-            ri = self.innerradius(d['t'])
-            xi, yi = toCartesian(ri, d['t'])
+            ri = self.innerradius(theta)
+            xi, yi = toCartesian(ri, theta)
 
             inner_pts.append((xi, yi,))
 
@@ -156,33 +147,27 @@ class OffsetPairSLFMaker:
 
         # Соединение внутреннего радиуса
         for i in range(0, len(inner_pts)):
-            f.write("  0\nLINE\n")
-            f.write("  8\n %s \n" % ('gear'))  # Имя слоя
             if(i == 0):
-                f.write(" 10\n%f\n" % inner_pts[-1][0])
-                f.write(" 20\n%f\n" % inner_pts[-1][1])
+                start = inner_pts[-1]
             else:
-                f.write(" 10\n%f\n" % inner_pts[i-1][0])
-                f.write(" 20\n%f\n" % inner_pts[i-1][1])
-            f.write(" 11\n%f\n" % inner_pts[i][0])
-            f.write(" 21\n%f\n" % inner_pts[i][1])
+                start = inner_pts[i-1]
+            yield (start, inner_pts[i])
 
         # Соединение концов зубов
         for i in range(0, len(teeth_ends)):
-            f.write("  0\nLINE\n")
-            f.write("  8\n %s \n" % ('gear'))  # Имя слоя
             if(i == 0):
-                f.write(" 10\n%f\n" % teeth_ends[-1][0])
-                f.write(" 20\n%f\n" % teeth_ends[-1][1])
+                start = teeth_ends[-1][:2]
             else:
-                f.write(" 10\n%f\n" % teeth_ends[i-1][0])
-                f.write(" 20\n%f\n" % teeth_ends[i-1][1])
-            f.write(" 11\n%f\n" % teeth_ends[i][2])
-            f.write(" 21\n%f\n" % teeth_ends[i][3])
+                start = teeth_ends[i-1][:2]
+            yield (start, (teeth_ends[i][2], teeth_ends[i][3]))
+
+        # Счётчики - одним вызовом на шестерню, не на отрезок
+        instrument.count("theta steps", n * self.toothSlices)
+        instrument.count("segments emitted", n * (2 * self.toothSlices + 1) + len(inner_pts) + len(teeth_ends))
 
     def preamble(self, f):
         """Запись заголовка DXF файла."""
-        f.write("  999\nDXF created from gearsgen.py phill baker\n")
+        f.write("  999\n%s\n" % DXF_COMMENT)
         f.write("  0\nSECTION\n")
         f.write("  2\nENTITIES\n")
 
@@ -191,58 +176,38 @@ class OffsetPairSLFMaker:
         f.write("  0\nENDSEC\n")
         f.write("  0\nEOF\n")
 
-    def radiusOfCurvature(self, t):
-        """Вычисление радиуса кривизны в точке t."""
-        dx = self.dx(t)
-        dy = self.dy(t)
-        dx2 = self.dx2(t)
-        dy2 = self.dy2(t)
-
-        return ((dx * dx + dy * dy) ** 1.5) / (dx * dy2 - dx2 * dy)
-
-    def calcPoints(self):
-        """Вычисление точек для зубчатого колеса."""
-        refinement = 1
-        halfteethCount = self.teethCount * 2
-        halfpitch = self.cpitch / 2.0
-
-        while True:
-            module = halfpitch * 2.0 / pi
-
-            self.dedendumd = module * 1.25
-            self.adendumd = module
-
-            ccd = 0.0
+    # Делительная кривая задаётся потомком как self.curve (pitch_curves.py)
 
-            theta = 0.0
-            ro = self.outerradius(0) - self.dedendumd
+    def outerradius(self, theta):
+        """Радиус делительной кривой (число или массив углов)."""
+        return self.curve.radius(theta)
 
-            fx = lx = ro * cos(0)
-            fy = ly = ro * sin(0)
+    def dx(self, t):
+        return self.curve.evaluate(t).dx
 
-            actualTeeth = 1
+    def dy(self, t):
+        return self.curve.evaluate(t).dy
 
-            while theta < 2.0 * pi:
-                theta += self.tolerance
-                ro = self.outerradius(theta) - self.dedendumd
-                x = ro * cos(theta)
-                y = ro * sin(theta)
-                # Добавление расстояния от последней точки
-                ccd += sqrt((x - lx) ** 2 + (y - ly) ** 2)
-                if (ccd >= halfpitch and actualTeeth < halfteethCount):
-                    # Добавление новой точки
-                    actualTeeth += 1
-                    ccd = 0.0
+    def dx2(self, t):
+        return self.curve.evaluate(t).dx2
 
-                lx = x
-                ly = y
+    def dy2(self, t):
+        return self.curve.evaluate(t).dy2
 
-            print(f"refinement {refinement}, half-teeth = {actualTeeth}, extra = {ccd}, c pitch = {halfpitch * 2.0}")
-            if halfteethCount == actualTeeth and abs(ccd - halfpitch) < self.tolerance * 5:
-                break
+    def radiusOfCurvature(self, t):
+        """Вычисление радиуса кривизны в точке t."""
+        return self.curve.radiusOfCurvature(t)
 
-            refinement += 1
-            halfpitch = (halfpitch * actualTeeth + ccd) / (halfteethCount + 1)
+    @instrument.stage("placement")
+    def calcPoints(self):
+        """Вычисление точек для зубчатого колеса."""
+        # Шаг и позиции зубьев ищутся по таблице длины дуги кривой дедендума,
+        # tolerance - допустимая ошибка длины дуги (см. pitch_placement.py).
+        halfteethCount = self.teethCount * 2
+        halfpitch, thetas, refinement = pitchPoints(self.outerradius, halfteethCount,
+                                                    self.tolerance, self.cpitch / 2.0)
+        instrument.count("refinement passes", refinement)
+        print(f"refinements {refinement}, half-teeth = {halfteethCount}, c pitch = {halfpitch * 2.0}")
 
         self.cpitch = halfpitch * 2.0
 
@@ -258,43 +223,14 @@ class OffsetPairSLFMaker:
         print("adendum distance =", self.adendumd)
         print("tooth height =", self.dedendumd + self.adendumd)
 
-        # Вычисление окончательных точек и сохранение данных
-        ccd = 0.0
-        theta = 0.0
-        ro = self.outerradius(theta) - self.dedendumd
-
-        lx = ro * cos(theta)
-        ly = ro * sin(theta)
-
-        rc = self.radiusOfCurvature(theta)
-
-        self.teethLoc = [{'x': lx, 'y': ly, 'r': ro, 't': 0.0, 'rc': rc}]
-        self.gapLoc = []
-        gapFlag = True
-
-        print("computing points for final refinement")
-
-        actualTeeth = 1
-
-        while actualTeeth < halfteethCount:
-            theta += self.tolerance
-            ro = self.outerradius(theta) - self.dedendumd
-            x = ro * cos(theta)
-            y = ro * sin(theta)
-            # Добавление расстояния от последней точки
-            ccd = sqrt((x - lx) ** 2 + (y - ly) ** 2)
-            if (ccd >= halfpitch):
-                # Добавление новой точки
-                rc = self.radiusOfCurvature(theta)
-                if gapFlag:
-                    self.gapLoc.append({'x': x, 'y': y, 'r': ro, 't': theta, 'rc': rc})
-                else:
-                    self.teethLoc.append({'x': x, 'y': y, 'r': ro, 't': theta, 'rc': rc})
-
-                gapFlag = not gapFlag
-                lx = x
-                ly = y
-                actualTeeth += 1
+        # Зубья и впадины чередуются, первый - зуб в theta = 0.
+        # Кривая во всех позициях - одним вычислением на массиве
+        p = self.curve.evaluate(thetas)
+        ro = p.r - self.dedendumd
+        locs = ToothLocations.fromColumns(x=ro * np.cos(thetas), y=ro * np.sin(thetas), r=ro, t=thetas,
+                                          rc=curvatureRadius(p), dx=p.dx, dy=p.dy, dx2=p.dx2, dy2=p.dy2)
+        self.teethLoc = locs[0::2]
+        self.gapLoc = locs[1::2]
 
 if (__name__ == "__main__"):
     # Создание экземпляра класса SLFMaker с необходимыми аргументами
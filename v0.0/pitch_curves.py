@@ -0,0 +1,99 @@
+"""
+Делительные кривые шестерён в полярной форме r(theta).
+
+Кривая считает r, r', r'' одним вызовом (общие подвыражения - знаменатель
+и тригонометрия - вычисляются один раз), а из них - точку и декартовы
+производные x', y', x'', y'':
+
+    x  = r cos t                      y  = r sin t
+    x' = r' cos t - y                 y' = r' sin t + x
+    x''= r'' cos t - 2 r' sin t - x   y''= r'' sin t + 2 r' cos t - y
+
+Все методы принимают число или массив t (форма результата = форма t),
+поэтому проход по позициям зубьев - одно вычисление на массиве вместо
+четырёх скалярных вызовов dx/dy/dx2/dy2 на точку.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+PitchSample = namedtuple("PitchSample", "r dr ddr x y dx dy dx2 dy2")
+
+
+class PitchCurve:
+    """Базовая кривая: потомки реализуют radiusDerivatives(t) -> (r, r', r'')."""
+
+    def radiusDerivatives(self, t):
+        raise NotImplementedError
+
+    def radius(self, t):
+        """r(t); для числа - float (как прежние outerradius)."""
+        r = self.radiusDerivatives(np.asarray(t, dtype=float))[0]
+        return float(r) if np.ndim(r) == 0 else r
+
+    def evaluate(self, t):
+        """PitchSample со всеми величинами в точках t (для числа t - float)."""
+        t = np.asarray(t, dtype=float)
+        r, dr, ddr = self.radiusDerivatives(t)
+        c = np.cos(t)
+        s = np.sin(t)
+        x = r*c
+        y = r*s
+        values = (r, dr, ddr, x, y,
+                  dr*c - y, dr*s + x,
+                  ddr*c - 2.0*dr*s - x, ddr*s + 2.0*dr*c - y)
+        if t.ndim == 0:
+            return PitchSample(*map(float, values))
+        return PitchSample(*values)
+
+    def radiusOfCurvature(self, t):
+        """Радиус кривизны (со знаком; inf там, где кривизна нулевая)."""
+        return curvatureRadius(self.evaluate(t))
+
+
+def curvatureRadius(p):
+    """Радиус кривизны по PitchSample: (x'^2+y'^2)^1.5 / (x'y'' - x''y')."""
+    denom = p.dx*p.dy2 - p.dx2*p.dy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rc = np.where(denom == 0, np.inf, (p.dx*p.dx + p.dy*p.dy)**1.5 / denom)
+    return float(rc) if np.ndim(rc) == 0 else rc
+
+
+class CircleCurve(PitchCurve):
+    def __init__(self, radius):
+        self.r0 = radius
+
+    def radiusDerivatives(self, t):
+        zero = np.zeros_like(t, dtype=float)
+        return zero + self.r0, zero, zero
+
+
+class OvalCurve(PitchCurve):
+    """
+    r = p / (1 - e*cos(nodes*t)) - овал с nodes "вершинами"
+    (nodes=1 - эллипс с фокусом в начале координат).
+    """
+
+    def __init__(self, p, e, nodes=1):
+        self.p = p
+        self.e = e
+        self.nodes = nodes
+
+    def radiusDerivatives(self, t):
+        n = self.nodes
+        cn = np.cos(n*t)
+        sn = np.sin(n*t)
+        inv = 1.0/(1.0 - self.e*cn)
+        d1 = self.e*n*sn            # D'
+        d2 = self.e*n*n*cn          # D''
+        r = self.p*inv
+        dr = -r*d1*inv
+        ddr = r*inv*inv*(2.0*d1*d1 - d2*(1.0 - self.e*cn))
+        return r, dr, ddr
+
+
+class FocalEllipseCurve(OvalCurve):
+    """r = p / (1 + e*cos(t)) - эллипс, вращающийся вокруг фокуса."""
+
+    def __init__(self, p, e):
+        super().__init__(p, -e, 1)
@@ -5,38 +5,61 @@
 Основной класс SLFMaker отвечает за вычисление точек шестерни и экспорт их в файл."""
 
 from math import sin, cos, pi, sqrt, atan
+from bisect import bisect_left, bisect_right
+import numpy as np
+from pitch_placement import pitchPoints
+from pitch_curves import curvatureRadius
+from tooth_locations import ToothLocations
+from dxf_stream import DXFStreamWriter
+import instrument
+
+DXF_COMMENT = "DXF created from gearsgen.py phill baker"
 
 def involute(a, t):
     """Вычисляет точку инволюты окружности радиуса a при параметре t. Инволюта - вид зубчатого зацепления"""
     return [a * (sin(t) - t * cos(t)), a * (cos(t) + t * sin(t)) - a]
 
-def minIndex(l):
-    m = l[0]
-    mi = 0
-    for n in range(1, len(l)):
-        if l[n] < m:
-            m = l[n]
-            mi = n
-    return mi
-
-def findClosest(l, v):
-    """Поиск ближайшего значения в списке."""
-    d = [abs(x[0] - v) for x in l]
-    return l[minIndex(d)][1]
-
-def findClosestDown(l, v):
-    """Поиск ближайшего значения в списке, где x[0] <= v."""
-    filtered = [x for x in l if v - x[0] >= 0.0]
-    if not filtered:
+# Таблица единичной инволюты: involute(rc, t) = rc * involute(1, t), поэтому
+# одна таблица (шаг 0.01 по t на [0, pi/2)) годится для любого радиуса кривизны.
+# Координаты монотонно растут по t - поиск делением пополам.
+INVOLUTE_STEP = 0.01
+
+def _unitInvoluteTable():
+    ts, xs, ys = [], [], []
+    t = 0.0
+    while t < pi / 2.0:
+        i = involute(1.0, t)
+        ts.append(t)
+        xs.append(i[0])
+        ys.append(i[1])
+        t += INVOLUTE_STEP
+    return ts, xs, ys
+
+UNIT_INVOLUTE_T, UNIT_INVOLUTE_X, UNIT_INVOLUTE_Y = _unitInvoluteTable()
+
+def involuteClosestY(rc, v):
+    """Параметр t, при котором y инволюты радиуса rc ближе всего к v (при равенстве расстояний - меньший t)."""
+    if rc == 0:
+        return UNIT_INVOLUTE_T[0]
+    u = v / rc
+    i = bisect_left(UNIT_INVOLUTE_Y, u)
+    if i == 0:
+        return UNIT_INVOLUTE_T[0]
+    if i == len(UNIT_INVOLUTE_Y):
+        return UNIT_INVOLUTE_T[-1]
+    if u - UNIT_INVOLUTE_Y[i - 1] <= UNIT_INVOLUTE_Y[i] - u:
+        return UNIT_INVOLUTE_T[i - 1]
+    return UNIT_INVOLUTE_T[i]
+
+def involuteBelowX(rc, v):
+    """Наибольший t, при котором x инволюты радиуса rc не больше v."""
+    if rc == 0:
+        i = 0 if v >= 0.0 else -1
+    else:
+        i = bisect_right(UNIT_INVOLUTE_X, v / rc) - 1
+    if i < 0:
         raise ValueError("No elements in list l satisfy v - x[0] >= 0.0")
-    best = filtered[0]
-    bestIndex = 0
-    for x in range(len(l)):
-        i = v - l[x][0]
-        if (i >= 0.0 and i <= best[0]):
-            bestIndex = x
-            best = i
-    return l[bestIndex][1]
+    return UNIT_INVOLUTE_T[i]
 
 def normalize(x, y):
     """Нормализация вектора."""
@@ -48,11 +71,29 @@ def toCartesian(r, t):
     """Преобразование полярных координат в декартовы."""
     return (r * cos(t), r * sin(t))
 
+def writeLine(f, seg, layer='gear'):
+    """Запись одного отрезка LINE в формате исходных писателей (по %f на координату)."""
+    (x1, y1), (x2, y2) = seg
+    f.write("  0\nLINE\n  8\n %s \n 10\n%f\n 20\n%f\n 11\n%f\n 21\n%f\n"
+            % (layer, x1, y1, x2, y2))
+
+def streamWrite(filename, segments, polylines=False, precision=6):
+    """
+    Запись отрезков через DXFStreamWriter: R12 LINE или, при polylines=True,
+    смежные отрезки сцепляются в замкнутые контуры и пишутся LWPOLYLINE (R2010).
+    """
+    dxfversion = "R2010" if polylines else "R12"
+    with DXFStreamWriter(filename, dxfversion=dxfversion, precision=precision, comment=DXF_COMMENT) as w:
+        if polylines:
+            w.write_outlines(segments)
+        else:
+            w.write_segments(segments)
+
 class SLFMaker:
     def __init__(self, teethCount, ts=5, depth=0.1, tolerance=0.001, is_circular=False):
         """Базовый класс для создания шестерён. Определяет методы для вычисления периметра, ширины, радиуса кривизны и точек шестерни."""
         self.depth = depth
-        self.teethLoc = []
+        self.teethLoc = ToothLocations()
         self.teethCount = teethCount
         self.is_circular = is_circular
         self.cpitch = self.perimeter() / teethCount  # Циркулярный шаг
@@ -61,57 +102,55 @@ class SLFMaker:
 
         self.tolerance = tolerance
 
-    def write(self, filename):
-        """Запись данных зубчатого колеса в файл."""
+    @instrument.stage("write")
+    def write(self, filename, streaming=False, polylines=False, precision=6):
+        """
+        Запись данных зубчатого колеса в файл.
+        streaming=True - отрезки форматируются пачками через DXFStreamWriter.
+        polylines=True - каждый контур одной LWPOLYLINE, precision - знаков в координатах.
+        """
         if not self.teethLoc:
             self.calcPoints()
-        with open(filename, 'w') as f:
-            self.preamble(f)
-            self.amble(f)
-            self.postamble(f)
+        # Отрезки генерируются по ходу записи: профиль и экспорт - один интервал
+        with instrument.span("profile+export"):
+            if streaming or polylines:
+                streamWrite(filename, self.segments(), polylines, precision)
+                return
+            with open(filename, 'w') as f:
+                self.preamble(f)
+                self.amble(f)
+                self.postamble(f)
 
     def amble(self, f):
         """Создание геометрии зубчатого колеса в файле."""
-        import string
+        for seg in self.segments():
+            writeLine(f, seg)
 
+    def segments(self):
+        """Генератор отрезков ((x1,y1),(x2,y2)) зубчатого колеса в порядке записи."""
         n = 0
-        inc = 0.01
 
         print("teeth completed: ", end=' ')
 
         teeth_ends = []
         inner_pts = []
         # Проход по каждому зубу
-        for d in self.teethLoc:
-            rc = abs(d['rc'])
-            inverseInvoluteTableY = []
-            inverseInvoluteTableX = []
-            t = 0.0
-            while t < pi / 2.0:
-                i = involute(rc, t)
-                inverseInvoluteTableX.append((i[0], t))
-                inverseInvoluteTableY.append((i[1], t))
-                t += inc
+        for r, theta, rc, dx, dy in self.teethLoc.rows('r', 't', 'rc', 'dx', 'dy'):
+            rc = abs(rc)
 
             # Параметр t на окружности деления
-            td = findClosest(inverseInvoluteTableY, self.dedendumd)
+            td = involuteClosestY(rc, self.dedendumd)
 
             # Параметр t на вершине зуба
-            tt = findClosest(inverseInvoluteTableY, self.dedendumd + self.adendumd)
+            tt = involuteClosestY(rc, self.dedendumd + self.adendumd)
 
             # Обрезка сторон инволюты для устранения наложений
 
             # Новые координаты
-            r = d['r']
-            x = r * cos(d['t'])
-            y = r * sin(d['t'])
-
-            dx = self.dx(d['t'])
-            dy = self.dy(d['t'])
-
-            dx2 = self.dx2(d['t'])
-            dy2 = self.dy2(d['t'])
+            x = r * cos(theta)
+            y = r * sin(theta)
 
+            # Касательная к делительной кривой (сохранена в calcPoints)
             dx, dy = normalize(dx, dy)
 
             # Ширина зуба = циркулярный шаг / 2 - люфт
@@ -119,7 +158,7 @@ class SLFMaker:
             offset = (toothWidth / 2.0) + involute(rc, td)[0]
 
             # Убедиться, что инволюта не пересекает симметричного партнера
-            tx = findClosestDown(inverseInvoluteTableX, offset)
+            tx = involuteBelowX(rc, offset)
 
             if (tt > tx):
                 print("clipping tooth " + repr(n) + ": " + repr(tt) + " " + repr(tx))
@@ -160,43 +199,28 @@ class SLFMaker:
             # Рисование линий зуба
             for i in range(0, len(pts)):
                 # Линия левой стороны
-                f.write("  0\nLINE\n")
-                f.write("  8\n %s \n" % ('gear'))  # Имя слоя
                 if(i == 0):
-                    f.write(" 10\n%f\n" % pts[i][0][0])
-                    f.write(" 20\n%f\n" % pts[i][0][1])
+                    start = pts[i][0]
                 else:
-                    f.write(" 10\n%f\n" % pts[i-1][0][0])
-                    f.write(" 20\n%f\n" % pts[i-1][0][1])
-                f.write(" 11\n%f\n" % pts[i][0][0])
-                f.write(" 21\n%f\n" % pts[i][0][1])
+                    start = pts[i-1][0]
+                yield (start, pts[i][0])
 
                 # Линия правой стороны
-                f.write("  0\nLINE\n")
-                f.write("  8\n %s \n" % ('gear'))
                 if(i == 0):
-                    f.write(" 10\n%f\n" % pts[i][1][0])
-                    f.write(" 20\n%f\n" % pts[i][1][1])
+                    start = pts[i][1]
                 else:
-                    f.write(" 10\n%f\n" % pts[i-1][1][0])
-                    f.write(" 20\n%f\n" % pts[i-1][1][1])
-                f.write(" 11\n%f\n" % pts[i][1][0])
-                f.write(" 21\n%f\n" % pts[i][1][1])
+                    start = pts[i-1][1]
+                yield (start, pts[i][1])
 
             # Сохранение начальных точек для соединения зубов
             teeth_ends.append((pts[0][0][0], pts[0][0][1], pts[0][1][0], pts[0][1][1],))
 
             # Соединение последних точек зуба
-            f.write("  0\nLINE\n")
-            f.write("  8\n %s \n" % ('gear'))
-            f.write(" 10\n%f\n" % pts[-1][0][0])
-            f.write(" 20\n%f\n" % pts[-1][0][1])
-            f.write(" 11\n%f\n" % pts[-1][1][0])
-            f.write(" 21\n%f\n" % pts[-1][1][1])
+            yield (pts[-1][0], pts[-1][1])
 
             # Внутренние точки для внутреннего отверстия
-            ri = self.innerradius(d['t'])
-            xi, yi = toCartesian(ri, d['t'])
+            ri = self.innerradius(theta)
+            xi, yi = toCartesian(ri, theta)
 
             inner_pts.append((xi, yi,))
 
@@ -205,33 +229,27 @@ class SLFMaker:
 
         # Соединение внутреннего радиуса
         for i in range(0, len(inner_pts)):
-            f.write("  0\nLINE\n")
-            f.write("  8\n %s \n" % ('gear'))  # Имя слоя
             if(i == 0):
-                f.write(" 10\n%f\n" % inner_pts[-1][0])
-                f.write(" 20\n%f\n" % inner_pts[-1][1])
+                start = inner_pts[-1]
             else:
-                f.write(" 10\n%f\n" % inner_pts[i-1][0])
-                f.write(" 20\n%f\n" % inner_pts[i-1][1])
-            f.write(" 11\n%f\n" % inner_pts[i][0])
-            f.write(" 21\n%f\n" % inner_pts[i][1])
+                start = inner_pts[i-1]
+            yield (start, inner_pts[i])
 
         # Соединение концов зубов
         for i in range(0, len(teeth_ends)):
-            f.write("  0\nLINE\n")
-            f.write("  8\n %s \n" % ('gear'))  # Имя слоя
             if(i == 0):
-                f.write(" 10\n%f\n" % teeth_ends[-1][0])
-                f.write(" 20\n%f\n" % teeth_ends[-1][1])
+                start = teeth_ends[-1][:2]
             else:
-                f.write(" 10\n%f\n" % teeth_ends[i-1][0])
-                f.write(" 20\n%f\n" % teeth_ends[i-1][1])
-            f.write(" 11\n%f\n" % teeth_ends[i][2])
-            f.write(" 21\n%f\n" % teeth_ends[i][3])
+                start = teeth_ends[i-1][:2]
+            yield (start, (teeth_ends[i][2], teeth_ends[i][3]))
+
+        # Счётчики - одним вызовом на шестерню, не на отрезок
+        instrument.count("theta steps", n * self.toothSlices)
+        instrument.count("segments emitted", n * (2 * self.toothSlices + 1) + len(inner_pts) + len(teeth_ends))
 
     def preamble(self, f):
         """Запись заголовка DXF файла."""
-        f.write("  999\nDXF created from gearsgen.py phill baker\n")
+        f.write("  999\n%s\n" % DXF_COMMENT)
         f.write("  0\nSECTION\n")
         f.write("  2\nENTITIES\n")
 
@@ -240,61 +258,42 @@ class SLFMaker:
         f.write("  0\nENDSEC\n")
         f.write("  0\nEOF\n")
 
+    # Делительная кривая задаётся потомком как self.curve (pitch_curves.py):
+    # r, r', r'' и производные x', y', x'', y'' считаются за один вызов
+
+    def outerradius(self, theta):
+        """Радиус делительной кривой (число или массив углов)."""
+        return self.curve.radius(theta)
+
+    def dx(self, t):
+        return self.curve.evaluate(t).dx
+
+    def dy(self, t):
+        return self.curve.evaluate(t).dy
+
+    def dx2(self, t):
+        return self.curve.evaluate(t).dx2
+
+    def dy2(self, t):
+        return self.curve.evaluate(t).dy2
+
     def radiusOfCurvature(self, t):
         """Вычисление радиуса кривизны в точке t."""
-        dx = self.dx(t)
-        dy = self.dy(t)
-        dx2 = self.dx2(t)
-        dy2 = self.dy2(t)
-
-        return ((dx * dx + dy * dy) ** 1.5) / (dx * dy2 - dx2 * dy)
+        return self.curve.radiusOfCurvature(t)
 
+    @instrument.stage("placement")
     def calcPoints(self):
         """Вычисление точек для зубчатого колеса."""
-        refinement = 1
+        # Шаг и позиции зубьев ищутся по таблице длины дуги кривой дедендума,
+        # tolerance - допустимая ошибка длины дуги (см. pitch_placement.py).
         if self.is_circular:
             halfteethCount = self.teethCount
         else:
             halfteethCount = self.teethCount * 2
-        halfpitch = self.cpitch / 2.0
-
-        while True:
-            module = halfpitch * 2.0 / pi
-
-            self.dedendumd = module * 1.25
-            self.adendumd = module
-
-            ccd = 0.0
-
-            theta = 0.0
-            ro = self.outerradius(0) - self.dedendumd
-
-            fx = lx = ro * cos(0)
-            fy = ly = ro * sin(0)
-
-            actualTeeth = 1
-
-            while theta < 2.0 * pi:
-                theta += self.tolerance
-                ro = self.outerradius(theta) - self.dedendumd
-                x = ro * cos(theta)
-                y = ro * sin(theta)
-                # Добавление расстояния от последней точки
-                ccd += sqrt((x - lx) ** 2 + (y - ly) ** 2)
-                if (ccd >= halfpitch and actualTeeth < halfteethCount):
-                    # Добавление новой точки
-                    actualTeeth += 1
-                    ccd = 0.0
-
-                lx = x
-                ly = y
-
-            print(f"refinement {refinement}, half-teeth = {actualTeeth}, extra = {ccd}, c pitch = {halfpitch * 2.0}")
-            if halfteethCount == actualTeeth and abs(ccd - halfpitch) < self.tolerance * 5:
-                break
-
-            refinement += 1
-            halfpitch = (halfpitch * actualTeeth + ccd) / (halfteethCount + 1)
+        halfpitch, thetas, refinement = pitchPoints(self.outerradius, halfteethCount,
+                                                    self.tolerance, self.cpitch / 2.0)
+        instrument.count("refinement passes", refinement)
+        print(f"refinements {refinement}, half-teeth = {halfteethCount}, c pitch = {halfpitch * 2.0}")
 
         self.cpitch = halfpitch * 2.0
 
@@ -310,40 +309,11 @@ class SLFMaker:
         print("adendum distance =", self.adendumd)
         print("tooth height =", self.dedendumd + self.adendumd)
 
-        # Вычисление окончательных точек и сохранение данных
-        ccd = 0.0
-        theta = 0.0
-        ro = self.outerradius(theta) - self.dedendumd
-
-        lx = ro * cos(theta)
-        ly = ro * sin(theta)
-
-        rc = self.radiusOfCurvature(theta)
-
-        self.teethLoc = [{'x': lx, 'y': ly, 'r': ro, 't': 0.0, 'rc': rc}]
-        self.gapLoc = []
-        gapFlag = True
-
-        print("computing points for final refinement")
-
-        actualTeeth = 1
-
-        while actualTeeth < halfteethCount:
-            theta += self.tolerance
-            ro = self.outerradius(theta) - self.dedendumd
-            x = ro * cos(theta)
-            y = ro * sin(theta)
-            # Добавление расстояния от последней точки
-            ccd = sqrt((x - lx) ** 2 + (y - ly) ** 2)
-            if (ccd >= halfpitch):
-                # Добавление новой точки
-                rc = self.radiusOfCurvature(theta)
-                if gapFlag:
-                    self.gapLoc.append({'x': x, 'y': y, 'r': ro, 't': theta, 'rc': rc})
-                else:
-                    self.teethLoc.append({'x': x, 'y': y, 'r': ro, 't': theta, 'rc': rc})
-
-                gapFlag = not gapFlag
-                lx = x
-                ly = y
-                actualTeeth += 1
+        # Зубья и впадины чередуются, первый - зуб в theta = 0.
+        # Кривая во всех позициях - одним вычислением на массиве
+        p = self.curve.evaluate(thetas)
+        ro = p.r - self.dedendumd
+        locs = ToothLocations.fromColumns(x=ro * np.cos(thetas), y=ro * np.sin(thetas), r=ro, t=thetas,
+                                          rc=curvatureRadius(p), dx=p.dx, dy=p.dy, dx2=p.dx2, dy2=p.dy2)
+        self.teethLoc = locs[0::2]
+        self.gapLoc = locs[1::2]
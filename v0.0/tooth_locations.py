@@ -0,0 +1,92 @@
+# tooth_locations.py
+
+"""
+Позиции зубьев и впадин шестерни.
+
+Раньше каждая позиция была словарём из девяти ключей
+('x','y','r','t','rc','dx','dy','dx2','dy2'). Теперь позиции хранятся в одной
+структурированной таблице numpy (по float64 на поле). Её дёшево строить из
+столбцов, она занимает ~72 байта на позицию вместо ~1 КБ, а столбцы можно
+обрабатывать целиком.
+
+    locs['r']            - столбец (view: запись меняет таблицу)
+    locs[i]['r']         - одна позиция, доступ как к словарю (ToothLoc)
+    locs[::2], locs[:-1] - срезы (ToothLocations, view)
+    locs.rows('r', 't')  - кортежи float по позициям для циклов на Python
+"""
+import numpy as np
+
+FIELDS = ('x', 'y', 'r', 't', 'rc', 'dx', 'dy', 'dx2', 'dy2')
+DTYPE = np.dtype([(name, np.float64) for name in FIELDS])
+
+
+class ToothLoc:
+    """Одна позиция: словарный доступ к строке таблицы (запись идёт в таблицу)."""
+    __slots__ = ('_data', '_index')
+
+    def __init__(self, data, index):
+        self._data = data
+        self._index = index
+
+    def __getitem__(self, key):
+        return float(self._data[key][self._index])
+
+    def __setitem__(self, key, value):
+        self._data[key][self._index] = value
+
+    def __contains__(self, key):
+        return key in FIELDS
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def keys(self):
+        return FIELDS
+
+    def get(self, key, default=None):
+        return self[key] if key in FIELDS else default
+
+    def __repr__(self):
+        return repr({key: self[key] for key in FIELDS})
+
+
+class ToothLocations:
+    __slots__ = ('data',)
+
+    def __init__(self, data=None):
+        self.data = np.zeros(0, DTYPE) if data is None else data
+
+    @classmethod
+    def fromColumns(cls, **columns):
+        """Таблица из столбцов FIELDS (массивы одной длины или числа)."""
+        data = np.empty(np.size(columns['t']), DTYPE)
+        for name in FIELDS:
+            data[name] = columns[name]
+        return cls(data)
+
+    def rows(self, *names):
+        """Итератор кортежей float выбранных полей (быстрее поштучного locs[i][k])."""
+        return zip(*(self.data[name].tolist() for name in names))
+
+    def copy(self):
+        return ToothLocations(self.data.copy())
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        data = self.data
+        return (ToothLoc(data, i) for i in range(len(data)))
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.data[key]
+        if isinstance(key, (int, np.integer)):
+            return ToothLoc(self.data, range(len(self.data))[key])
+        return ToothLocations(self.data[key])
+
+    def __setitem__(self, key, values):
+        self.data[key] = values
+
+    def __repr__(self):
+        return "ToothLocations(%d)" % len(self)
@@ -0,0 +1,145 @@
+"""
+Фоновые расчёты для Tk-приложений.
+
+Построение геометрии выполняется в рабочем потоке; прогресс и результат
+складываются в очередь, которую главный поток разбирает через root.after
+(Tk нельзя трогать из других потоков). Новое задание отменяет текущее,
+правка параметров (debounce) - только предпросмотр (preview=True), экспорт
+она не прерывает. Отмена кооперативная - задание проверяет флаг в
+job.progress()/job.check() и прерывается исключением JobCancelled, а всё,
+что успело прийти от отменённого задания, отбрасывается.
+"""
+import queue
+import threading
+
+
+class JobCancelled(Exception):
+    """Задание отменено (бросается в рабочем потоке из Job.check/Job.progress)."""
+
+
+class Job:
+    def __init__(self, scheduler, fn, args, kwargs, on_done, on_error, on_progress, preview=False):
+        self.scheduler = scheduler
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.preview = preview
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        """Вызывается из рабочего потока: прерывает отменённое задание."""
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def progress(self, fraction, text=""):
+        """Вызывается из рабочего потока: fraction в [0, 1], text - этап."""
+        self.check()
+        self.scheduler._post(self, "progress", (fraction, text))
+
+    def _run(self):
+        try:
+            result = self.fn(self, *self.args, **self.kwargs)
+        except JobCancelled:
+            return
+        except Exception as e:
+            self.scheduler._post(self, "error", e)
+            return
+        self.scheduler._post(self, "done", result)
+
+
+class JobScheduler:
+    """
+    Одно активное задание на планировщик.
+
+        scheduler = JobScheduler(root)
+        scheduler.submit(build, params, on_done=draw, on_progress=show)
+
+    fn вызывается в рабочем потоке как fn(job, *args, **kwargs),
+    on_done/on_error/on_progress - в главном потоке Tk. preview=True -
+    предпросмотр, его отменяет debounce().
+    """
+
+    def __init__(self, root, poll_ms=30):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.current = None
+        self._queue = queue.Queue()
+        self._poll_id = None
+        self._debounce_id = None
+
+    @property
+    def busy(self):
+        return self.current is not None
+
+    def submit(self, fn, *args, on_done=None, on_error=None, on_progress=None, preview=False, **kwargs):
+        """Отменяет текущее задание и запускает новое."""
+        self.cancel()
+        job = Job(self, fn, args, kwargs, on_done, on_error, on_progress, preview)
+        self.current = job
+        threading.Thread(target=job._run, daemon=True).start()
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+        return job
+
+    def cancel(self, previews_only=False):
+        """
+        Отменяет отложенный запуск и текущее задание (если есть;
+        previews_only=True - только если это предпросмотр).
+        """
+        if self._debounce_id is not None:
+            self.root.after_cancel(self._debounce_id)
+            self._debounce_id = None
+        if self.current is not None and (self.current.preview or not previews_only):
+            self.current.cancel()
+            self.current = None
+
+    def debounce(self, delay_ms, fn):
+        """
+        Вызывает fn через delay_ms, если за это время debounce не вызовут
+        снова (смена параметров). Текущий предпросмотр отменяется сразу;
+        другое задание (экспорт) доводится до конца, fn ждёт его.
+        """
+        self.cancel(previews_only=True)
+        self._debounce_id = self.root.after(delay_ms, self._fire, delay_ms, fn)
+
+    def _fire(self, delay_ms, fn):
+        if self.current is not None and not self.current.preview:
+            self._debounce_id = self.root.after(delay_ms, self._fire, delay_ms, fn)
+            return
+        self._debounce_id = None
+        fn()
+
+    def _post(self, job, kind, payload):
+        self._queue.put((job, kind, payload))
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                job, kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not self.current or job.cancelled:
+                continue
+            if kind == "progress":
+                if job.on_progress is not None:
+                    job.on_progress(*payload)
+                continue
+            self.current = None
+            if kind == "done":
+                if job.on_done is not None:
+                    job.on_done(payload)
+            elif job.on_error is not None:
+                job.on_error(payload)
+        if self.current is not None and self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
@@ -2,6 +2,8 @@ import math
 import tkinter as tk
 from tkinter import messagebox, filedialog
 
+from background import JobScheduler
+
 try:
     import ezdxf
 except ImportError:
@@ -22,6 +24,7 @@ def rotate_points(points, angle_deg):
     return result
 
 def save_dxf_file(gear1_points, gear2_points, filename):
+    # Каждое колесо - одна замкнутая LWPOLYLINE
     if not ezdxf:
         messagebox.showerror("Ошибка", "Библиотека ezdxf не установлена.")
         return
@@ -130,6 +133,86 @@ def generate_ellipse_gear_outline(a, b, teeth, segments_per_tooth=10, tooth_heig
 
     return outline_points
 
+def build_gear_pair(job, p):
+    """
+    Контуры пары, расставленные "в зацеплении" (рабочий поток JobScheduler,
+    без обращений к Tk). p - словарь параметров GearApp.read_params().
+    """
+    type1, type2 = p['type1'], p['type2']
+    z1_circle, m1_circle = p['z1_circle'], p['m1_circle']
+    z2_circle, m2_circle = p['z2_circle'], p['m2_circle']
+    a1_ellipse, b1_ellipse = p['a1_ellipse'], p['b1_ellipse']
+    a2_ellipse, b2_ellipse = p['a2_ellipse'], p['b2_ellipse']
+    z1_ellipse, z2_ellipse = p['z1_ellipse'], p['z2_ellipse']
+    involute_segments = p['involute_segments']
+    ellipse_segments = p['ellipse_segments']
+    tooth_factor = p['tooth_factor']
+
+    # Генерируем контуры
+    job.progress(0.0, "шестерня 1")
+    if type1 == "circle":
+        gear1_points = generate_involute_gear_outline(
+            z1_circle, m1_circle, alpha_deg=20.0, N_profile=involute_segments
+        )
+    else:
+        gear1_points = generate_ellipse_gear_outline(
+            a1_ellipse, b1_ellipse, z1_ellipse,
+            segments_per_tooth=ellipse_segments,
+            tooth_height_factor=tooth_factor
+        )
+
+    job.progress(0.5, "шестерня 2")
+    if type2 == "circle":
+        gear2_points = generate_involute_gear_outline(
+            z2_circle, m2_circle, alpha_deg=20.0, N_profile=involute_segments
+        )
+    else:
+        gear2_points = generate_ellipse_gear_outline(
+            a2_ellipse, b2_ellipse, z2_ellipse,
+            segments_per_tooth=ellipse_segments,
+            tooth_height_factor=tooth_factor
+        )
+
+    # -------- Расставляем колёса «в зацеплении» --------
+    job.check()
+
+    dx = 0.0
+    if type1 == "circle" and type2 == "circle":
+        d1 = m1_circle * z1_circle
+        d2 = m2_circle * z2_circle
+        dx = 0.5*(d1 + d2)
+        tooth_angle_deg = 360.0 / z2_circle
+        half_tooth_deg = tooth_angle_deg / 2.0
+
+        gear2_points = rotate_points(gear2_points, -half_tooth_deg)
+
+    else:
+
+        dist1 = 0
+        if type1 == "ellipse":
+            # Пусть "средний радиус" ~ (a1+b1)/2
+            dist1 = (a1_ellipse + b1_ellipse)/2
+        else:
+            # Круг
+            dist1 = (m1_circle * z1_circle)/2.0
+
+        dist2 = 0
+        if type2 == "ellipse":
+            dist2 = (a2_ellipse + b2_ellipse)/2
+        else:
+            dist2 = (m2_circle * z2_circle)/2.0
+
+
+        dx = (dist1 + dist2) - 10 
+
+        gear2_points = rotate_points(gear2_points, -10.0)
+
+
+    gear2_points = shift_points(gear2_points, dx, 0)
+
+    return gear1_points, gear2_points
+
+
 # =============== Главное окно ===============
 class GearApp(tk.Tk):
     def __init__(self):
@@ -246,6 +329,8 @@ class GearApp(tk.Tk):
         self.preview_button.pack(side=tk.LEFT, padx=10)
         self.generate_button = tk.Button(buttons_frame, text="Генерация DXF", command=self.generate_dxf)
         self.generate_button.pack(side=tk.LEFT, padx=10)
+        self.status_var = tk.StringVar(value="")
+        tk.Label(buttons_frame, textvariable=self.status_var).pack(side=tk.LEFT, padx=10)
 
         # Canvas
         self.canvas = tk.Canvas(canvas_frame, width=700, height=300, bg="white")
@@ -255,89 +340,70 @@ class GearApp(tk.Tk):
         self.gear1_points = []
         self.gear2_points = []
 
-    def preview_gears(self):
-        type1 = self.gear_type1.get()
-        type2 = self.gear_type2.get()
-
+        # Построение - в фоновом потоке; правка любого параметра обновляет просмотр
+        self.jobs = JobScheduler(self)
+        self.gear_type1.trace_add('write', self.schedule_preview)
+        self.gear_type2.trace_add('write', self.schedule_preview)
+        for frame in (self.frame_gear1, self.frame_gear2):
+            for widget in frame.winfo_children():
+                if isinstance(widget, tk.Entry):
+                    widget.bind('<KeyRelease>', self.schedule_preview)
+
+    def read_params(self):
+        """Параметры из полей ввода (виджеты Tk - только в главном потоке)."""
+        return {
+            'type1': self.gear_type1.get(),
+            'type2': self.gear_type2.get(),
+            'z1_circle': int(self.entry_z1.get()),
+            'm1_circle': float(self.entry_m1.get()),
+            'z2_circle': int(self.entry_z2.get()),
+            'm2_circle': float(self.entry_m2.get()),
+            'involute_segments': int(self.entry_involute_segments.get()),
+            'a1_ellipse': float(self.entry_a1.get()),
+            'b1_ellipse': float(self.entry_b1.get()),
+            'z1_ellipse': int(self.entry_ellipse_z1.get()),
+            'a2_ellipse': float(self.entry_a2.get()),
+            'b2_ellipse': float(self.entry_b2.get()),
+            'z2_ellipse': int(self.entry_ellipse_z2.get()),
+            'tooth_factor': float(self.entry_tooth_factor.get()),
+            'ellipse_segments': int(self.entry_ellipse_segments.get()),
+        }
+
+    def schedule_preview(self, *args):
+        # Пересчёт после паузы в наборе, а не на каждую клавишу
+        self.jobs.debounce(400, lambda: self.preview_gears(quiet=True))
+
+    def preview_gears(self, quiet=False):
+        """Предпросмотр; quiet - запуск правкой параметров, ошибка только в строке состояния."""
         try:
-            z1_circle = int(self.entry_z1.get())
-            m1_circle = float(self.entry_m1.get())
-            z2_circle = int(self.entry_z2.get())
-            m2_circle = float(self.entry_m2.get())
-            involute_segments = int(self.entry_involute_segments.get())
-
-            a1_ellipse = float(self.entry_a1.get())
-            b1_ellipse = float(self.entry_b1.get())
-            z1_ellipse = int(self.entry_ellipse_z1.get())
-
-            a2_ellipse = float(self.entry_a2.get())
-            b2_ellipse = float(self.entry_b2.get())
-            z2_ellipse = int(self.entry_ellipse_z2.get())
-
-            tooth_factor = float(self.entry_tooth_factor.get())
-            ellipse_segments = int(self.entry_ellipse_segments.get())
+            params = self.read_params()
         except ValueError:
-            messagebox.showerror("Ошибка", "Некорректные числовые параметры.")
-            return
-
-        # Генерируем контуры
-        if type1 == "circle":
-            self.gear1_points = generate_involute_gear_outline(
-                z1_circle, m1_circle, alpha_deg=20.0, N_profile=involute_segments
-            )
-        else:
-            self.gear1_points = generate_ellipse_gear_outline(
-                a1_ellipse, b1_ellipse, z1_ellipse,
-                segments_per_tooth=ellipse_segments,
-                tooth_height_factor=tooth_factor
-            )
-
-        if type2 == "circle":
-            self.gear2_points = generate_involute_gear_outline(
-                z2_circle, m2_circle, alpha_deg=20.0, N_profile=involute_segments
-            )
-        else:
-            self.gear2_points = generate_ellipse_gear_outline(
-                a2_ellipse, b2_ellipse, z2_ellipse,
-                segments_per_tooth=ellipse_segments,
-                tooth_height_factor=tooth_factor
-            )
-
-        # -------- Расставляем колёса «в зацеплении» --------
-
-        dx = 0.0
-        if type1 == "circle" and type2 == "circle":
-            d1 = m1_circle * z1_circle
-            d2 = m2_circle * z2_circle
-            dx = 0.5*(d1 + d2)
-            tooth_angle_deg = 360.0 / z2_circle
-            half_tooth_deg = tooth_angle_deg / 2.0
-
-            self.gear2_points = rotate_points(self.gear2_points, -half_tooth_deg)
-
-        else:
-
-            dist1 = 0
-            if type1 == "ellipse":
-                # Пусть "средний радиус" ~ (a1+b1)/2
-                dist1 = (a1_ellipse + b1_ellipse)/2
-            else:
-                # Круг
-                dist1 = (m1_circle * z1_circle)/2.0
-
-            dist2 = 0
-            if type2 == "ellipse":
-                dist2 = (a2_ellipse + b2_ellipse)/2
+            # При наборе поле бывает недописано - ошибку показываем только по кнопке
+            if quiet:
+                self.status_var.set("Некорректные параметры")
             else:
-                dist2 = (m2_circle * z2_circle)/2.0
+                messagebox.showerror("Ошибка", "Некорректные числовые параметры.")
+            return
 
+        self.status_var.set("Построение...")
+        self.jobs.submit(build_gear_pair, params, on_done=self.draw_gears,
+                         on_error=self.preview_failed if quiet else self.job_failed,
+                         on_progress=self.preview_progress, preview=True)
 
-            dx = (dist1 + dist2) - 10 
+    def preview_progress(self, fraction, text):
+        self.status_var.set(f"Построение: {text} ({fraction:.0%})")
 
-            self.gear2_points = rotate_points(self.gear2_points, -10.0)
+    def job_failed(self, e):
+        self.status_var.set("Ошибка")
+        messagebox.showerror("Ошибка", str(e))
 
+    def preview_failed(self, e):
+        # Автоматический предпросмотр: без модального окна на каждую правку
+        self.status_var.set(f"Ошибка: {e}")
 
-        self.gear2_points = shift_points(self.gear2_points, dx, 0)
+    def draw_gears(self, result):
+        self.gear1_points, self.gear2_points = result
+        self.status_var.set("")
 
         # -------------- Рисуем --------------
         self.canvas.delete("all")
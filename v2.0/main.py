@@ -6,6 +6,44 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 import numpy as np
 
+# Допуск хорды контура относительно большей полуоси (например, 1e-3);
+# None - 400 точек с постоянным шагом, как раньше
+CHORD_TOLERANCE = None
+
+def chord_deviation(pm, p0, p1):
+    """Расстояние от точек pm до хорд p0->p1 (массивы (N,2))."""
+    d = p1 - p0
+    v = pm - p0
+    length = np.hypot(d[:, 0], d[:, 1])
+    cross = np.abs(d[:, 0]*v[:, 1] - d[:, 1]*v[:, 0])
+    dist = np.hypot(v[:, 0], v[:, 1])
+    np.divide(cross, length, out=dist, where=length > 0)
+    return dist
+
+def refine_parameters(curve, t, tol, max_passes=20):
+    """
+    Делит интервалы параметров t пополам, пока точки кривой curve(t) -> (N,2)
+    в четвертях интервала отстоят от хорды больше чем на tol
+    (то же, что v4.0/geometry_utils.refine_parameters).
+    """
+    t = np.asarray(t, dtype=float)
+    pts = curve(t)
+    for _ in range(max_passes):
+        tm = 0.5*(t[:-1] + t[1:])
+        pm = curve(tm)
+        dev = chord_deviation(pm, pts[:-1], pts[1:])
+        # Середина может случайно лечь на хорду - проверяем и четверти
+        for q in (0.25, 0.75):
+            tq = t[:-1] + q*(t[1:] - t[:-1])
+            dev = np.maximum(dev, chord_deviation(curve(tq), pts[:-1], pts[1:]))
+        bad = dev > tol
+        if not bad.any():
+            break
+        idx = np.nonzero(bad)[0] + 1
+        t = np.insert(t, idx, tm[bad])
+        pts = np.insert(pts, idx, pm[bad], axis=0)
+    return t
+
 class NonRoundWheelApp:
     def __init__(self, master):
         self.master = master
@@ -81,17 +119,25 @@ class NonRoundWheelApp:
         teeth_count = int(self.teeth_entry.get())
         module = float(self.module_entry.get())
         
-        t = np.linspace(0, 2*np.pi, 400)
-        # Базовый суперэллипс: (|x/a|)^n + (|y/b|)^n = 1
-        x_base = a * np.sign(np.cos(t)) * (np.abs(np.cos(t)))**(2/n)
-        y_base = b * np.sign(np.sin(t)) * (np.abs(np.sin(t)))**(2/n)
-        
-        # Радиальная модуляция (зубцы)
-        modulation = 1 + module*np.sin(teeth_count * t)
-        
-        # Применяем модуляцию к координатам
-        x = x_base * modulation
-        y = y_base * modulation
+        def curve(t):
+            # Базовый суперэллипс: (|x/a|)^n + (|y/b|)^n = 1
+            x_base = a * np.sign(np.cos(t)) * (np.abs(np.cos(t)))**(2/n)
+            y_base = b * np.sign(np.sin(t)) * (np.abs(np.sin(t)))**(2/n)
+
+            # Радиальная модуляция (зубцы)
+            modulation = 1 + module*np.sin(teeth_count * t)
+
+            # Применяем модуляцию к координатам
+            return np.column_stack((x_base * modulation, y_base * modulation))
+
+        if CHORD_TOLERANCE is None:
+            t = np.linspace(0, 2*np.pi, 400)
+        else:
+            # Точки гуще там, где контур изгибается (вершины зубцов), реже на пологих участках:
+            # начальная сетка - 4 точки на зубец, дальше по допуску хорды
+            seed = np.linspace(0, 2*np.pi, 4*max(teeth_count, 1) + 1)
+            t = refine_parameters(curve, seed, CHORD_TOLERANCE*max(abs(a), abs(b)))
+        x, y = curve(t).T
         
         self.ax.clear()
         self.ax.plot(x, y, 'b-', linewidth=2)
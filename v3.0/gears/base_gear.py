@@ -1,5 +1,7 @@
 import math
 
+from .tooth_locations import ToothLocations
+
 def involute(a, t):
     return [a * (math.sin(t) - t * math.cos(t)), a * (math.cos(t) + t * math.sin(t)) - a]
 
@@ -12,71 +14,52 @@ def normalize(x, y):
 def to_cartesian(r, theta):
     return (r * math.cos(theta), r * math.sin(theta))
 
-def findClosest(l, v):
-    d = [abs(x[0] - v) for x in l]
-    m = min(d)
-    return l[d.index(m)][1]
-
-def findClosestDown(l, v):
-    filtered = [x for x in l if v - x[0] >= 0.0]
-    if not filtered:
-        # Если нет подходящих значений, вернем ближайшее меньшее или равное
-        # Но в оригинале был raise ValueError. Сохраним логику:
-        raise ValueError("No elements in list satisfy v - x[0] >= 0.0")
-    d = [v - x[0] for x in filtered]
-    m = min(d)
-    return filtered[d.index(m)][1]
 
 
 class BaseGear:
-    def __init__(self, teeth_count, ts=10, depth=0.2, tolerance=0.001, is_circular=False):
+    def __init__(self, teeth_count, ts=10, depth=0.2, tolerance=0.001, is_circular=False,
+                 chord_tolerance=None):
         self.teeth_count = teeth_count
         self.tooth_slices = ts
+        # Допуск хорды боков зубьев; None - tooth_slices точек на бок (sampling.py)
+        self.chord_tolerance = chord_tolerance
         self.depth = depth
         self.tolerance = tolerance
         self.is_circular = is_circular
-        self.teethLoc = []
+        self.teethLoc = ToothLocations()
+        # Делительная кривая (PitchCurve), задаётся потомком
+        self.curve = None
 
     def perimeter(self):
         raise NotImplementedError
 
     def outerradius(self, theta):
-        raise NotImplementedError
+        return self.curve.radius(theta)
 
     def innerradius(self, theta):
         raise NotImplementedError
 
+    # Производные делительной кривой - через self.curve (pitch_curves.py);
+    # для нескольких величин сразу выгоднее один self.curve.evaluate(t)
     def dx(self, t):
-        raise NotImplementedError
+        return self.curve.evaluate(t).dx
 
     def dy(self, t):
-        raise NotImplementedError
+        return self.curve.evaluate(t).dy
 
     def dx2(self, t):
-        raise NotImplementedError
+        return self.curve.evaluate(t).dx2
 
     def dy2(self, t):
-        raise NotImplementedError
+        return self.curve.evaluate(t).dy2
 
     def radius_of_curvature(self, t):
-        dx = self.dx(t)
-        dy = self.dy(t)
-        dx2 = self.dx2(t)
-        dy2 = self.dy2(t)
-        denom = (dx * dy2 - dx2 * dy)
-        if denom == 0:
-            return float('inf')
-        return ((dx*dx + dy*dy)**1.5)/abs(denom)
+        return abs(self.curve.radius_of_curvature(t))
 
     def calc_points(self):
         # Должен быть переопределен в потомках, где вычисляется геометрия.
         pass
 
     def get_lines(self):
-        points = self.teethLoc
-        lines = []
-        for i in range(len(points)):
-            j = (i+1)%len(points)
-            lines.append(((points[i]['x'], points[i]['y']),
-                          (points[j]['x'], points[j]['y'])))
-        return lines
+        points = list(self.teethLoc.rows('x', 'y'))
+        return [(points[i], points[(i+1) % len(points)]) for i in range(len(points))]
@@ -1,4 +1,5 @@
 from .base_gear import BaseGear, to_cartesian, normalize, involute
+from .pitch_curves import CircleCurve
 import math
 
 class CircularGear(BaseGear):
@@ -16,31 +17,13 @@ class CircularGear(BaseGear):
         super().__init__(teeth_count=teeth, ts=ts, depth=depth, tolerance=tolerance, is_circular=True)
         self.oradius = oradius
         self.iradius = iradius
+        # r, x', y', x'', y'' окружности радиуса oradius
+        self.curve = CircleCurve(oradius)
 
     def perimeter(self):
         """Периметр окружности равен 2*pi*R."""
         return 2 * math.pi * self.oradius
 
-    def outerradius(self, theta):
-        """Для круга радиус постоянен и равен oradius."""
-        return self.oradius
-
     def innerradius(self, theta):
         """Внутренний радиус."""
         return self.iradius
-
-    def dx(self, t):
-        """x'(t) для параметризации окружности: -R*sin(t)."""
-        return -self.oradius * math.sin(t)
-
-    def dy(self, t):
-        """y'(t) для параметризации окружности: R*cos(t)."""
-        return self.oradius * math.cos(t)
-
-    def dx2(self, t):
-        """Вторая производная x(t): -R*cos(t)."""
-        return -self.oradius * math.cos(t)
-
-    def dy2(self, t):
-        """Вторая производная y(t): -R*sin(t)."""
-        return -self.oradius * math.sin(t)
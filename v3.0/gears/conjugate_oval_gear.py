@@ -1,6 +1,15 @@
 import math
+import numpy as np
 from math import sin, cos, pi, sqrt, atan
 
+from .pitch_placement import pitch_points
+from .involute_table import t_closest_y, t_below_x
+from .sampling import flank_parameters
+from .pitch_curves import OvalCurve, curvature_radius
+from .tooth_locations import ToothLocations
+from .transmission import TransmissionTable
+from . import instrument
+
 ############################
 # Код из v0.0/slfmaker.py
 ############################
@@ -17,31 +26,45 @@ def normalize(x, y):
 def toCartesian(r, t):
     return (r*cos(t), r*sin(t))
 
-def minIndex(l):
-    m = l[0]
-    mi = 0
-    for n in range(1, len(l)):
-        if l[n] < m:
-            m = l[n]
-            mi = n
-    return mi
-
-def findClosest(l, v):
-    d = [abs(x[0] - v) for x in l]
-    return l[minIndex(d)][1]
-
-def findClosestDown(l, v):
-    filtered = [x for x in l if v - x[0]>=0.0]
-    if not filtered:
-        raise ValueError("No elements in list satisfy v - x[0]>=0.0")
-    best = filtered[0]
-    bestVal = v - best[0]
-    for cand in filtered:
-        val = v - cand[0]
-        if (val>=0 and val<=bestVal):
-            best = cand
-            bestVal = val
-    return best[1]
+def writeLine(f, seg):
+    (x1, y1), (x2, y2) = seg
+    f.write("  0\nLINE\n  8\n gear\n 10\n%f\n 20\n%f\n 11\n%f\n 21\n%f\n" % (x1, y1, x2, y2))
+
+def solveBracketed(f, x0, lower, ftol, maxIterations=100):
+    # Корень монотонно убывающей f на (lower, inf): поиск интервала со сменой
+    # знака от x0, затем метод Иллинойса. Возвращает (x, вычислений f, |f(x)|).
+    iterations = 1
+    a, fa = x0, f(x0)
+    if fa == 0.0:
+        return a, iterations, 0.0
+    step = max(abs(x0 - lower), 1e-6)
+    while True:
+        if fa > 0:
+            b = a + step
+            step *= 2.0
+        else:
+            b = lower + (a - lower)/2.0
+        fb = f(b)
+        iterations += 1
+        if fa*fb <= 0.0:
+            break
+        a, fa = b, fb
+        if iterations >= maxIterations:
+            raise ValueError("Не удалось найти интервал со сменой знака")
+
+    x, fx = b, fb
+    while abs(fx) > ftol and iterations < maxIterations:
+        x = (a*fb - b*fa)/(fb - fa)
+        fx = f(x)
+        iterations += 1
+        if fx*fb < 0.0:
+            a, fa = b, fb
+        else:
+            fa /= 2.0
+        b, fb = x, fx
+        if abs(b - a) <= 1e-15*abs(b):
+            break
+    return x, iterations, abs(fx)
 
 ############################
 # Код из v0.0/conj_slfmaker.py
@@ -55,34 +78,32 @@ class ConjugateSLFMaker:
         self.holedistance = holedistance
         self.depth = depth
         self.tolerance = tolerance
-        self.teethLoc = []
-        self.gapLoc = []
-        self.conjugateTeethLoc = []
+        self.teethLoc = ToothLocations()
+        self.gapLoc = ToothLocations()
+        self.conjugateTeethLoc = ToothLocations()
+        # Закон движения пары (TransmissionTable), после calcConjugatePoints
+        self.transmission = None
         self.generated_lines = []
+        # Допуск хорды боков зубьев; None - toothSlices точек (sampling.py)
+        self.chordTolerance = None
 
-    def dx(self, t):
-        raise NotImplementedError
-    def dy(self, t):
-        raise NotImplementedError
-    def dx2(self, t):
-        raise NotImplementedError
-    def dy2(self, t):
-        raise NotImplementedError
     def outerradius(self, theta):
-        raise NotImplementedError
+        return self.curve.radius(theta)
     def innerradius(self, theta):
         raise NotImplementedError
     def perimeter(self):
         raise NotImplementedError
+    # Производные делительной кривой - через self.curve (pitch_curves.py)
+    def dx(self, t):
+        return self.curve.evaluate(t).dx
+    def dy(self, t):
+        return self.curve.evaluate(t).dy
+    def dx2(self, t):
+        return self.curve.evaluate(t).dx2
+    def dy2(self, t):
+        return self.curve.evaluate(t).dy2
     def radiusOfCurvature(self, t):
-        dx = self.dx(t)
-        dy = self.dy(t)
-        dx2 = self.dx2(t)
-        dy2 = self.dy2(t)
-        denom = (dx*dy2 - dx2*dy)
-        if denom == 0:
-            return float('inf')
-        return ((dx*dx+dy*dy)**1.5)/abs(denom)
+        return abs(self.curve.radius_of_curvature(t))
 
     def calcPoints(self):
         pass
@@ -90,6 +111,15 @@ class ConjugateSLFMaker:
     def calcConjugatePoints(self):
         pass
 
+    def transmissionTable(self, samplesPerTooth=64):
+        # Зубья ведомой стоят по равным хордам кривых впадин, обкатывающихся на
+        # расстоянии holedistance - 2*dedendumd; таблица - непрерывная обкатка,
+        # нормированная на оборот ведомой за period оборотов ведущей
+        return TransmissionTable.from_pitch(lambda t: self.outerradius(t) - self.dedendumd,
+                                            self.holedistance - 2.0*self.dedendumd,
+                                            2.0*pi*self.period,
+                                            self.teethCount*self.period*samplesPerTooth)
+
     def preamble(self, f):
         f.write("  999\nDXF created from gearsgen.py phill baker\n")
         f.write("  0\nSECTION\n")
@@ -114,38 +144,29 @@ class ConjugateSLFMaker:
         self.doShape(f, self.conjugateTeethLoc, "b", "sRed")
 
     def doShape(self, f, teethLoc, gearLetter, color):
-        inc = 0.01
-        teethCount = len(teethLoc)
-        n=0
+        for seg in self.shapeSegments(teethLoc):
+            writeLine(f, seg)
+            self.generated_lines.append(seg)
+
+    def shapeSegments(self, teethLoc):
+        # Отрезки ((x1,y1),(x2,y2)) одной шестерни в порядке записи в DXF
         teeth_ends = []
         inner_pts = []
-        points_for_line = lambda p: (p[0], p[1])
-
-        for d in teethLoc:
-            rc = abs(d['rc'])
-            inverseInvoluteTableY = []
-            inverseInvoluteTableX = []
-            t = 0.0
-            while t < pi/2.0:
-                i = involute(rc, t)
-                inverseInvoluteTableX.append((i[0], t))
-                inverseInvoluteTableY.append((i[1], t))
-                t += inc
-
-            td = findClosest(inverseInvoluteTableY, self.dedendumd)
-            tt = findClosest(inverseInvoluteTableY, self.dedendumd + self.adendumd)
-
-            r = d['r']
-            x = r*cos(d['t'])
-            y = r*sin(d['t'])
-
-            dx = d['dx']
-            dy = d['dy']
+        steps = 0
+
+        for r, t, rc, dx, dy in teethLoc.rows('r', 't', 'rc', 'dx', 'dy'):
+            rc = abs(rc)
+            td = t_closest_y(rc, self.dedendumd)
+            tt = t_closest_y(rc, self.dedendumd + self.adendumd)
+
+            x = r*cos(t)
+            y = r*sin(t)
+
             dx, dy = normalize(dx, dy)
 
             toothWidth = self.cpitch / 2.0
             offset = (toothWidth / 2.0) + involute(rc, td)[0]
-            tx = findClosestDown(inverseInvoluteTableX, offset)
+            tx = t_below_x(rc, offset)
             if tt > tx:
                 tt = tx
 
@@ -154,10 +175,8 @@ class ConjugateSLFMaker:
             else:
                 rot = pi/2.0 + atan(dx/dy)
 
-            tval = 0.0
-            m=0
             pts=[]
-            while m < self.toothSlices:
+            for tval in flank_parameters(tt, rc, self.toothSlices, self.chordTolerance):
                 ix, iy = involute(rc, tval)
                 px = -offset + ix
                 py = iy
@@ -171,99 +190,42 @@ class ConjugateSLFMaker:
                 npy = px*(-sin(rot)) + py*cos(rot)
                 arr.append((x+npx,y+npy,))
                 pts.append(arr)
-
-                tval += tt/(self.toothSlices-1.0)
-                m+=1
+            steps += len(pts)
 
             for i in range(len(pts)):
-                f.write("  0\nLINE\n")
-                f.write("  8\n gear\n")
                 if i==0:
-                    f.write(" 10\n%f\n" % pts[i][0][0])
-                    f.write(" 20\n%f\n" % pts[i][0][1])
+                    yield (pts[i][0], pts[i][0])
                 else:
-                    f.write(" 10\n%f\n" % pts[i-1][0][0])
-                    f.write(" 20\n%f\n" % pts[i-1][0][1])
-                f.write(" 11\n%f\n" % pts[i][0][0])
-                f.write(" 21\n%f\n" % pts[i][0][1])
+                    yield (pts[i-1][0], pts[i][0])
                 if i==0:
-                    start_left = (pts[i][0][0], pts[i][0][1])
-                    end_left = (pts[i][0][0], pts[i][0][1])
+                    yield (pts[i][1], pts[i][1])
                 else:
-                    start_left = (pts[i-1][0][0], pts[i-1][0][1])
-                    end_left = (pts[i][0][0], pts[i][0][1])
-                self.generated_lines.append((start_left, end_left))
+                    yield (pts[i-1][1], pts[i][1])
 
-                f.write("  0\nLINE\n")
-                f.write("  8\n gear\n")
-                if i==0:
-                    f.write(" 10\n%f\n" % pts[i][1][0])
-                    f.write(" 20\n%f\n" % pts[i][1][1])
-                else:
-                    f.write(" 10\n%f\n" % pts[i-1][1][0])
-                    f.write(" 20\n%f\n" % pts[i-1][1][1])
-                f.write(" 11\n%f\n" % pts[i][1][0])
-                f.write(" 21\n%f\n" % pts[i][1][1])
-                if i==0:
-                    start_right = (pts[i][1][0], pts[i][1][1])
-                    end_right = (pts[i][1][0], pts[i][1][1])
-                else:
-                    start_right = (pts[i-1][1][0], pts[i-1][1][1])
-                    end_right = (pts[i][1][0], pts[i][1][1])
-                self.generated_lines.append((start_right, end_right))
-
-            f.write("  0\nLINE\n")
-            f.write("  8\n gear\n")
-            f.write(" 10\n%f\n" % pts[-1][0][0])
-            f.write(" 20\n%f\n" % pts[-1][0][1])
-            f.write(" 11\n%f\n" % pts[-1][1][0])
-            f.write(" 21\n%f\n" % pts[-1][1][1])
-            self.generated_lines.append(((pts[-1][0][0], pts[-1][0][1]),(pts[-1][1][0], pts[-1][1][1])))
-
-            ri = self.innerradius(d['t'])
-            xi, yi = toCartesian(ri, d['t'])
+            yield (pts[-1][0], pts[-1][1])
+
+            ri = self.innerradius(t)
+            xi, yi = toCartesian(ri, t)
             inner_pts.append((xi, yi,))
 
             teeth_ends.append((pts[0][0][0], pts[0][0][1], pts[0][1][0], pts[0][1][1],))
-            n+=1
 
         for i in range(len(inner_pts)):
-            f.write("  0\nLINE\n")
-            f.write("  8\n gear\n")
-            if i==0:
-                f.write(" 10\n%f\n" % inner_pts[-1][0])
-                f.write(" 20\n%f\n" % inner_pts[-1][1])
-            else:
-                f.write(" 10\n%f\n" % inner_pts[i-1][0])
-                f.write(" 20\n%f\n" % inner_pts[i-1][1])
-            f.write(" 11\n%f\n" % inner_pts[i][0])
-            f.write(" 21\n%f\n" % inner_pts[i][1])
             if i==0:
-                start_inner = (inner_pts[-1][0], inner_pts[-1][1])
-                end_inner = (inner_pts[i][0], inner_pts[i][1])
+                yield (inner_pts[-1], inner_pts[i])
             else:
-                start_inner = (inner_pts[i-1][0], inner_pts[i-1][1])
-                end_inner = (inner_pts[i][0], inner_pts[i][1])
-            self.generated_lines.append((start_inner, end_inner))
+                yield (inner_pts[i-1], inner_pts[i])
 
         for i in range(len(teeth_ends)):
-            f.write("  0\nLINE\n")
-            f.write("  8\n gear\n")
-            if i==0:
-                f.write(" 10\n%f\n" % teeth_ends[-1][0])
-                f.write(" 20\n%f\n" % teeth_ends[-1][1])
-            else:
-                f.write(" 10\n%f\n" % teeth_ends[i-1][0])
-                f.write(" 20\n%f\n" % teeth_ends[i-1][1])
-            f.write(" 11\n%f\n" % teeth_ends[i][2])
-            f.write(" 21\n%f\n" % teeth_ends[i][3])
             if i==0:
                 start_ends = (teeth_ends[-1][0], teeth_ends[-1][1])
-                end_ends = (teeth_ends[i][2], teeth_ends[i][3])
             else:
                 start_ends = (teeth_ends[i-1][0], teeth_ends[i-1][1])
-                end_ends = (teeth_ends[i][2], teeth_ends[i][3])
-            self.generated_lines.append((start_ends, end_ends))
+            yield (start_ends, (teeth_ends[i][2], teeth_ends[i][3]))
+
+        # Счётчики - одним вызовом на шестерню, не на отрезок
+        instrument.count("theta steps", steps)
+        instrument.count("segments emitted", 2*steps + len(inner_pts) + 2*len(teeth_ends))
 
 ############################
 # Код из v0.0/conj_oval_gear.py
@@ -278,188 +240,190 @@ class oval(ConjugateSLFMaker):
         self.p = a*(1.0 - self.e*self.e)
         self.b = math.sqrt(a*a - self.c*self.c)
         self.iradius = iradius
-        print("Oval Gear Pair")
-        print("a =", self.a, "c =", self.c, "e =", self.e)
-        print("teeth =", teeth, "thickness =", depth, "inner radius =", iradius)
+        # r = p / (1 - e*cos(nodes*t)) вместе с производными (pitch_curves.py)
+        self.curve = OvalCurve(self.p, self.e, self.nodes)
         super().__init__(teethCount=teeth, ts=ts, period=period, holedistance=holedistance, depth=depth, tolerance=tolerance)
 
     def width(self):
         return 2.0*(self.a+self.adendumd+self.dedendumd)
 
-    def outerradius(self,theta):
-        return self.p / (1.0 - self.e * cos(self.nodes*theta))
-
     def innerradius(self, theta):
         return self.iradius
 
-    def dx(self, t):
-        return (-self.e*self.nodes*self.p*cos(t)*sin(self.nodes*t)) / (1.0 - self.e*cos(self.nodes*t))**2 - (self.p*sin(t))/(1.0 - self.e*cos(self.nodes*t))
-
-    def dy(self, t):
-        return self.p*cos(t)/(1.0 - self.e*cos(self.nodes*t)) - (self.e*self.nodes*self.p*sin(t)*sin(self.nodes*t)) / (1.0 - self.e*cos(self.nodes*t))**2
-
-    def dx2(self, t):
-        return (2.0*self.e*self.e*self.nodes*self.nodes*self.p*cos(t)*sin(self.nodes*t)**2)/(1.0 - self.e*cos(self.nodes*t))**3 + \
-               (2.0*self.e*self.nodes*self.p*sin(t)*sin(self.nodes*t)) / (1.0 - self.e*cos(self.nodes*t))**2 - \
-               (self.p*cos(t))/(1.0 - self.e*cos(self.nodes*t)) - \
-               (self.e*self.nodes*self.nodes*self.p*cos(t)*cos(self.nodes*t)) / (1.0 - self.e*cos(self.nodes*t))**2
-
-    def dy2(self, t):
-        return (2.0*self.e*self.e*self.nodes*self.nodes*self.p*sin(t)*sin(self.nodes*t)**2)/(1.0 - self.e*cos(self.nodes*t))**3 - \
-               (2.0*self.e*self.nodes*self.p*cos(t)*sin(self.nodes*t)) / (1.0 - self.e*cos(self.nodes*t))**2 - \
-               (self.p*sin(t))/(1.0 - self.e*cos(self.nodes*t)) - \
-               (self.e*self.nodes*self.nodes*self.p*sin(t)*cos(self.nodes*t)) / (1.0 - self.e*cos(self.nodes*t))**2
-
     def perimeter(self):
         h = ((self.a-self.b)/(self.a+self.b))**2.0
         return pi * (self.a+self.b) * (1.0+(3.0 * h)/(10.0+sqrt(4.0-3.0*h)))
 
+    @instrument.stage("placement")
     def calcPoints(self):
-        refinement = 1
+        # Позиции зубьев/впадин - по таблице длины дуги (см. pitch_placement.py)
         halfteethCount = self.teethCount * 2
-        halfpitch = self.perimeter() / self.teethCount / 2.0
-
-        while True:
-            module = halfpitch * 2.0 / pi
-            self.dedendumd = module * 1.25
-            self.adendumd = module
-
-            ccd = 0.0
-            theta = 0.0
-            ro = self.outerradius(theta) - self.dedendumd
-            lx = ro*cos(0)
-            ly = ro*sin(0)
-            actualTeeth = 1
-
-            while theta < 2.0 * pi:
-                theta += self.tolerance
-                ro = self.outerradius(theta) - self.dedendumd
-                x = ro*cos(theta)
-                y = ro*sin(theta)
-                ccd += sqrt((x - lx)**2+(y - ly)**2)
-                if (ccd >= halfpitch and actualTeeth < halfteethCount):
-                    actualTeeth += 1
-                    ccd = 0.0
-                lx = x
-                ly = y
-
-            if halfteethCount == actualTeeth and abs(ccd - halfpitch)< self.tolerance * 5:
-                break
-            refinement += 1
-            halfpitch = (halfpitch * actualTeeth + ccd)/(halfteethCount + 1)
+        halfpitch, thetas, refinement = pitch_points(
+            self.outerradius, halfteethCount, self.tolerance, self.perimeter() / self.teethCount / 2.0)
+        instrument.count("refinement passes", refinement)
 
         self.cpitch = halfpitch * 2.0
         module = self.cpitch / pi
         self.dedendumd = module * 1.25
         self.adendumd = module
 
-        ccd = 0.0
-        theta = 0.0
-        ro = self.outerradius(theta) - self.dedendumd
-        lx = ro*cos(theta)
-        ly = ro*sin(theta)
-        rc = self.radiusOfCurvature(theta)
-
-        self.teethLoc = [{'x': lx,'y': ly,'r': ro,'t':0.0,'rc':rc,'dx':self.dx(0.0),'dy':self.dy(0.0),'dx2':self.dx2(0.0),'dy2':self.dy2(0.0)}]
-        self.gapLoc = []
-        gapFlag = True
-        actualTeeth = 1
-
-        while actualTeeth < halfteethCount:
-            theta += self.tolerance
-            ro = self.outerradius(theta) - self.dedendumd
-            x = ro*cos(theta)
-            y = ro*sin(theta)
-            ccd = sqrt((x - lx)**2+(y - ly)**2)
-            if (ccd >= halfpitch):
-                rc = self.radiusOfCurvature(theta)
-                dat = {'x': x,'y': y,'r': ro,'t':theta,'rc':rc,'dx':self.dx(theta),'dy':self.dy(theta),'dx2':self.dx2(theta),'dy2':self.dy2(theta)}
-                if gapFlag:
-                    self.gapLoc.append(dat)
-                else:
-                    self.teethLoc.append(dat)
-                gapFlag = not gapFlag
-                lx = x
-                ly = y
-                actualTeeth += 1
-
+        # Кривая и производные во всех позициях - одним вычислением на массиве;
+        # зубья и впадины чередуются, первый - зуб в theta = 0
+        p = self.curve.evaluate(thetas)
+        ro = p.r - self.dedendumd
+        locs = ToothLocations.from_columns(x=ro*np.cos(thetas), y=ro*np.sin(thetas), r=ro, t=thetas,
+                                           rc=np.abs(curvature_radius(p)),
+                                           dx=p.dx, dy=p.dy, dx2=p.dx2, dy2=p.dy2)
+        self.teethLoc = locs[0::2]
+        self.gapLoc = locs[1::2]
+
+    def conjugateLocations(self, holedistance):
+        # Сопряжённые точки для заданного holedistance и полный угол поворота.
+        # При замыкании угол равен 2*pi, последняя точка совпадает с первой.
+        # При фиксированном holedistance приращения угла dtp (теорема косинусов)
+        # зависят только от соседних впадин, углы - их префиксная сумма
+        index = np.arange(len(self.gapLoc)*self.period + 1) % self.teethCount
+        src = self.gapLoc[index]
+        r = src['r']
+        rp = holedistance - (r + 2.0*self.dedendumd)
+
+        r1, r2 = r[1:], r[:-1]
+        rp1, rp2 = rp[1:], rp[:-1]
+        dt = np.diff(src['t'])
+        dt[dt<0] += 2.0*pi
+
+        numerator = (r1**2 + r2**2 - 2.0*r1*r2*np.cos(dt) - rp1**2 - rp2**2)
+        denominator = (-2.0*rp1*rp2)
+        if np.any(denominator==0):
+            raise ValueError("Деление на ноль при вычислении acos")
+        dtp = np.arccos(np.clip(numerator/denominator, -1.0, 1.0))
+        steps = np.cumsum(dtp)
+        total = float(steps[-1]) if len(steps) else 0.0
+
+        t0 = pi - float(src['t'][0])
+        ts = np.mod(np.concatenate(([t0], t0 + steps)), 2.0*pi)
+
+        # rc, dx2, dy2 - от впадины-прообраза; касательная - перпендикуляр к радиусу
+        locs = ToothLocations.from_columns(x=rp*np.cos(ts), y=rp*np.sin(ts), r=rp, t=ts, rc=src['rc'],
+                                           dx=-np.sin(ts), dy=np.cos(ts), dx2=src['dx2'], dy2=src['dy2'])
+        return locs, total
+
+    def closureGap(self, holedistance):
+        # Невязка замыкания, монотонно убывает с ростом holedistance
+        return self.conjugateLocations(holedistance)[1] - 2.0*pi
+
+    @instrument.stage("conjugate")
     def calcConjugatePoints(self):
         self.secondOffset = 1.2*self.holedistance/2.0
 
-        while True:
-            p = self.gapLoc[0]
-            r = self.holedistance - (p['r'] + 2.0*self.dedendumd)
-            t = pi - p['t']
-            x,y = toCartesian(r,t)
-            dx = -sin(t)
-            dy = cos(t)
-            self.conjugateTeethLoc = [{
-                'x': x, 'y': y, 'r': r, 't': t,'rc': p['rc'],'dx': dx,'dy': dy,'dx2': p['dx2'],'dy2': p['dy2']
-            }]
-
-            n=1
-            while n < len(self.gapLoc)*self.period + 1:
-                p = self.gapLoc[n%self.teethCount]
-                rp1 = self.holedistance - (p['r']+2.0*self.dedendumd)
-                rp2 = self.conjugateTeethLoc[n-1]['r']
-
-                r1 = self.gapLoc[n%self.teethCount]['r']
-                r2 = self.gapLoc[(n-1)%self.teethCount]['r']
-
-                dt = self.gapLoc[n%self.teethCount]['t'] - self.gapLoc[(n-1)%self.teethCount]['t']
-                if dt<0:
-                    dt+=2.0*pi
-
-                numerator = (r1**2 + r2**2 - 2.0*r1*r2*cos(dt) - rp1**2 - rp2**2)
-                denominator = (-2.0*rp1*rp2)
-                if denominator==0:
-                    raise ValueError("Деление на ноль при вычислении acos")
-                arg = numerator/denominator
-                arg = max(min(arg,1.0), -1.0)
-                dtp = math.acos(arg)
-                t = self.conjugateTeethLoc[n-1]['t'] + dtp
-                if t<0:
-                    t+=2.0*pi
-                if t>2.0*pi:
-                    t-=2.0*pi
-
-                x=rp1*cos(t)
-                y=rp1*sin(t)
-                dx=-sin(t)
-                dy=cos(t)
-                self.conjugateTeethLoc.append({'x':x,'y':y,'r':rp1,'t':t,'rc':p['rc'],'dx':dx,'dy':dy,'dx2':p['dx2'],'dy2':p['dy2']})
-                n+=1
-
-            if n<self.teethCount*self.period+1:
-                self.holedistance+=self.tolerance
-            elif n>self.teethCount*self.period+1:
-                self.holedistance-=self.tolerance
-            else:
-                gap = sqrt((self.conjugateTeethLoc[-1]['x'] - self.conjugateTeethLoc[0]['x'])**2+(self.conjugateTeethLoc[-1]['y'] - self.conjugateTeethLoc[0]['y'])**2)
-                if gap>=self.tolerance*10:
-                    if t>=2.0*pi:
-                        self.holedistance+=self.tolerance
-                    else:
-                        self.holedistance-=self.tolerance
-                else:
-                    self.conjugateTeethLoc = self.conjugateTeethLoc[:-1]
-                    break
-
-        for n in range(len(self.conjugateTeethLoc)):
-            before = n-1
-            after = n+1
-            if before<0:
-                before+=len(self.conjugateTeethLoc)
-            if after>=len(self.conjugateTeethLoc):
-                after-=len(self.conjugateTeethLoc)
-            dx = self.conjugateTeethLoc[after]['x'] - self.conjugateTeethLoc[before]['x']
-            dy = self.conjugateTeethLoc[after]['y'] - self.conjugateTeethLoc[before]['y']
-            self.conjugateTeethLoc[n]['dx']=dx
-            self.conjugateTeethLoc[n]['dy']=dy
+        # holedistance - корень closureGap; ниже lower радиусы сопряжённой шестерни отрицательны
+        lower = float(self.gapLoc['r'].max()) + 2.0*self.dedendumd
+        self.holedistance, self.conjugateIterations, self.conjugateResidual = solveBracketed(
+            self.closureGap, max(self.holedistance, lower*1.01), lower, self.tolerance*1e-3)
+        instrument.count("holedistance adjustments", self.conjugateIterations)
+
+        # Последняя точка совпадает с первой; касательная - разность соседей по кругу
+        locs = self.conjugateLocations(self.holedistance)[0][:-1].copy()
+        locs['dx'] = np.roll(locs['x'], -1) - np.roll(locs['x'], 1)
+        locs['dy'] = np.roll(locs['y'], -1) - np.roll(locs['y'], 1)
+        self.conjugateTeethLoc = locs
+        self.transmission = self.transmissionTable()
 
     def get_lines(self):
         return self.generated_lines
 
+
+class ConjugateOvalGearFull(oval):
+    """
+    Пара сопряжённых овальных шестерён целиком: позиции зубьев, подбор
+    holedistance и отрезки обеих шестерён. С cache (GeometryCache) расчёт
+    при тех же параметрах берётся с диска. progress(fraction, text) вызывается
+    по ходу расчёта (фоновые задания main.py) и может прервать его исключением.
+    """
+    def __init__(self, teeth, ts, a, e, nodes, period, holedistance, iradius, depth, tolerance, cache=None,
+                 progress=None, chord_tolerance=None):
+        self.params = dict(teeth=teeth, ts=ts, a=a, e=e, nodes=nodes, period=period,
+                           holedistance=holedistance, iradius=iradius, depth=depth, tolerance=tolerance,
+                           chord_tolerance=chord_tolerance)
+        self.cache = cache
+        self.cache_hit = False
+        self.segments = None
+        self.progress = progress
+        self._gapCalls = 0
+        super().__init__(teeth, ts, a, e, nodes, period, holedistance, iradius, depth, tolerance)
+        self.chordTolerance = chord_tolerance
+
+    def compute(self):
+        """Заполняет teethLoc/gapLoc/conjugateTeethLoc, holedistance и segments (M,2,2)."""
+        if self.segments is not None:
+            return
+        with instrument.span("build"):
+            if self.cache is None:
+                self._restore(self._solve())
+                return
+            arrays, self.cache_hit = self.cache.get_or_compute(type(self), self.params, self._solve)
+            instrument.count("cache hits" if self.cache_hit else "cache misses")
+            self._restore(arrays)
+
+    def _report(self, fraction, text):
+        if self.progress is not None:
+            self.progress(fraction, text)
+
+    def closureGap(self, holedistance):
+        # Подбор holedistance - самый долгий этап: шаг прогресса на каждую итерацию
+        self._gapCalls += 1
+        self._report(0.1 + 0.5*(1.0 - 1.0/self._gapCalls), "подбор межосевого расстояния")
+        return oval.closureGap(self, holedistance)
+
+    def _solve(self):
+        self._report(0.0, "позиции зубьев")
+        oval.calcPoints(self)
+        self._report(0.1, "подбор межосевого расстояния")
+        self.calcConjugatePoints()
+        self._report(0.6, "профили зубьев")
+        with instrument.span("profile"):
+            segments = list(self.shapeSegments(self.teethLoc))
+            self._report(0.8, "профили зубьев")
+            segments += self.shapeSegments(self.conjugateTeethLoc)
+        arrays = {
+            'holedistance': np.array(self.holedistance),
+            'cpitch': np.array(self.cpitch),
+            'dedendumd': np.array(self.dedendumd),
+            'adendumd': np.array(self.adendumd),
+            'segments': np.array(segments, dtype=float).reshape(-1, 2, 2),
+        }
+        arrays.update(self.teethLoc.to_arrays('teethLoc'))
+        arrays.update(self.gapLoc.to_arrays('gapLoc'))
+        arrays.update(self.conjugateTeethLoc.to_arrays('conjugateTeethLoc'))
+        return arrays
+
+    def _restore(self, arrays):
+        self.holedistance = float(arrays['holedistance'])
+        self.cpitch = float(arrays['cpitch'])
+        self.dedendumd = float(arrays['dedendumd'])
+        self.adendumd = float(arrays['adendumd'])
+        self.teethLoc = ToothLocations.from_arrays('teethLoc', arrays)
+        self.gapLoc = ToothLocations.from_arrays('gapLoc', arrays)
+        self.conjugateTeethLoc = ToothLocations.from_arrays('conjugateTeethLoc', arrays)
+        self.transmission = self.transmissionTable()
+        self.segments = arrays['segments']
+
+    def calcPoints(self):
+        # main.py вызывает calcPoints() перед get_lines(): полный расчёт пары (или кэш)
+        self.compute()
+
+    def write(self, filename):
+        self.compute()
+        with instrument.span("export"), open(filename, 'w') as f:
+            self.preamble(f)
+            for seg in self.segments.tolist():
+                writeLine(f, seg)
+            self.postamble(f)
+
+    def get_lines(self):
+        self.compute()
+        return [(tuple(p1), tuple(p2)) for p1, p2 in self.segments.tolist()]
+
 # В v0.0 вы вызывали:
 # e = oval(40,10,1.0,0.15,2,2,3.0,0.0625,0.25,0.001)
 # e.write('ncgear1.dxf')
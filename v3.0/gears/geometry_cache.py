@@ -0,0 +1,186 @@
+"""
+Дисковый кэш рассчитанной геометрии шестерён.
+
+Ключ - sha256 от имени класса-генератора, его параметров и тега версии кода
+(CACHE_VERSION + хэш исходников всех модулей каталога версии, от которых
+зависит класс), поэтому правка расчёта автоматически делает старые записи
+недействительными. Значение - набор numpy-массивов в одном .npz (позиции
+зубьев - ToothLocations.to_arrays, межосевое расстояние, отрезки).
+
+Размер каталога ограничен max_bytes: при переполнении удаляются записи,
+к которым дольше всего не обращались (LRU по mtime, обновляется при чтении).
+"""
+import hashlib
+import inspect
+import json
+import os
+import sys
+import tempfile
+import types
+import zipfile
+
+import numpy as np
+
+# Увеличивать при изменении формата записей
+CACHE_VERSION = 2
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "gearsgeneration")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_source_tags = {}
+
+
+def _source_file(module):
+    try:
+        filename = inspect.getsourcefile(module)
+    except TypeError:
+        return None
+    return os.path.abspath(filename) if filename else None
+
+
+def local_sources(cls):
+    """
+    Исходники модулей класса, его предков и всего, что они импортируют
+    (модулями или именами) из того же каталога - транзитивно, по глобальным
+    именам модулей. Сторонние библиотеки и стандартная не учитываются.
+    """
+    roots = [sys.modules[base.__module__] for base in cls.__mro__ if base.__module__ in sys.modules]
+    directory = os.path.dirname(_source_file(roots[0]) or "")
+    seen = {}
+    stack = roots
+    while stack:
+        module = stack.pop()
+        filename = _source_file(module)
+        if filename is None or filename in seen or not filename.startswith(directory + os.sep):
+            continue
+        seen[filename] = module
+        for value in vars(module).values():
+            if isinstance(value, types.ModuleType):
+                stack.append(value)
+            else:
+                owner = sys.modules.get(getattr(value, "__module__", None) or "")
+                if owner is not None:
+                    stack.append(owner)
+    return sorted(seen)
+
+
+def code_tag(cls):
+    """Хэш исходников local_sources(cls) (кэшируется на процесс)."""
+    tag = _source_tags.get(cls)
+    if tag is None:
+        h = hashlib.sha256()
+        for filename in local_sources(cls):
+            h.update(os.path.basename(filename).encode("utf-8"))
+            with open(filename, "rb") as f:
+                h.update(f.read())
+        tag = _source_tags[cls] = h.hexdigest()[:16]
+    return tag
+
+
+def cache_key(cls, params):
+    """Стабильный ключ записи: класс, параметры (repr чисел) и версия кода."""
+    payload = json.dumps({
+        "class": "%s.%s" % (cls.__module__, cls.__qualname__),
+        "params": {k: repr(v) for k, v in params.items()},
+        "version": CACHE_VERSION,
+        "code": code_tag(cls),
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GeometryCache:
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get("GEARS_CACHE_DIR", DEFAULT_DIR)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def load(self, key):
+        """Словарь массивов или None. Повреждённая запись удаляется."""
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {k: data[k] for k in data.files}
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            self._remove(path)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return arrays
+
+    def store(self, key, arrays):
+        """Атомарная запись (временный файл + os.replace), затем вытеснение."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix=".npz.tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            self._remove(tmp)
+            raise
+        self.evict()
+
+    def get_or_compute(self, cls, params, compute):
+        """
+        Массивы из кэша или compute() -> словарь массивов (сохраняется).
+        Возвращает (arrays, hit).
+        """
+        key = cache_key(cls, params)
+        arrays = self.load(key)
+        if arrays is not None:
+            return arrays, True
+        arrays = compute()
+        self.store(key, arrays)
+        return arrays, False
+
+    def evict(self):
+        """Удаляет самые давние записи, пока суммарный размер больше max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if e.name.endswith(".npz") and e.is_file():
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+                    total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".npz"):
+                    self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_default = None
+
+
+def default_cache():
+    """Общий кэш процесса (каталог из GEARS_CACHE_DIR или ~/.cache/gearsgeneration)."""
+    global _default
+    if _default is None:
+        _default = GeometryCache()
+    return _default
@@ -0,0 +1,58 @@
+"""
+Общая таблица обратной инволюты.
+
+Инволюта радиуса rc линейна по rc: involute(rc, t) = rc * involute(1, t),
+поэтому одна таблица единичной инволюты (тот же шаг 0.01 по t на [0, pi/2),
+что и в inverseInvoluteTableX/Y) обслуживает все зубья. Обе координаты
+монотонно растут по t, поиск - bisect за O(log n) вместо линейного прохода
+по таблицам.
+"""
+import math
+from bisect import bisect_left, bisect_right
+
+INVOLUTE_STEP = 0.01
+
+
+def _build_unit_table():
+    ts, xs, ys = [], [], []
+    t = 0.0
+    while t < math.pi / 2.0:
+        ts.append(t)
+        xs.append(math.sin(t) - t * math.cos(t))
+        ys.append(math.cos(t) + t * math.sin(t) - 1.0)
+        t += INVOLUTE_STEP
+    return tuple(ts), tuple(xs), tuple(ys)
+
+
+UNIT_T, UNIT_X, UNIT_Y = _build_unit_table()
+
+
+def t_closest_y(rc, v):
+    """
+    Параметр t из таблицы, при котором y инволюты радиуса rc ближе всего к v.
+    """
+    if rc == 0:
+        return UNIT_T[0]
+    u = v / rc
+    i = bisect_left(UNIT_Y, u)
+    if i == 0:
+        return UNIT_T[0]
+    if i == len(UNIT_Y):
+        return UNIT_T[-1]
+    # При равенстве расстояний - меньший индекс
+    if u - UNIT_Y[i - 1] <= UNIT_Y[i] - u:
+        return UNIT_T[i - 1]
+    return UNIT_T[i]
+
+
+def t_below_x(rc, v):
+    """
+    Наибольший параметр t из таблицы, при котором x инволюты радиуса rc не больше v.
+    """
+    if rc == 0:
+        i = 0 if v >= 0.0 else -1
+    else:
+        i = bisect_right(UNIT_X, v / rc) - 1
+    if i < 0:
+        raise ValueError("No elements in list satisfy v - x[0] >= 0.0")
+    return UNIT_T[i]
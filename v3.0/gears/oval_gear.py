@@ -1,5 +1,12 @@
-from .base_gear import BaseGear, to_cartesian, involute, normalize, findClosest, findClosestDown
+from .base_gear import BaseGear, to_cartesian, involute, normalize
+from .pitch_placement import pitch_points
+from .involute_table import t_closest_y, t_below_x
+from .pitch_curves import OvalCurve, curvature_radius
+from .sampling import flank_parameters
+from .tooth_locations import ToothLocations
+from . import instrument
 import math
+import numpy as np
 
 class OvalGear(BaseGear):
     """
@@ -7,8 +14,10 @@ class OvalGear(BaseGear):
     Реально будет строить зубья, а не просто контур.
     """
 
-    def __init__(self, teeth, ts=10, a=1.0, e=0.15, nodes=2, iradius=0.0625, depth=0.25, tolerance=0.001):
-        super().__init__(teeth_count=teeth, ts=ts, depth=depth, tolerance=tolerance, is_circular=(e==0))
+    def __init__(self, teeth, ts=10, a=1.0, e=0.15, nodes=2, iradius=0.0625, depth=0.25, tolerance=0.001,
+                 chord_tolerance=None):
+        super().__init__(teeth_count=teeth, ts=ts, depth=depth, tolerance=tolerance, is_circular=(e==0),
+                         chord_tolerance=chord_tolerance)
         self.a = a
         self.e = e
         self.nodes = nodes
@@ -18,10 +27,12 @@ class OvalGear(BaseGear):
         assert 0.0 <= self.e <= 1.0
         self.p = a * (1.0 - self.e*self.e)
         self.b = math.sqrt(a*a - self.c*self.c) if e != 0 else a
+        # r = p / (1 - e*cos(nodes*t)) вместе с производными (pitch_curves.py)
+        self.curve = OvalCurve(self.p, self.e, self.nodes)
 
         # Параметры будут подсчитаны в calc_points()
-        self.teethLoc = []
-        self.gapLoc = []
+        self.teethLoc = ToothLocations()
+        self.gapLoc = ToothLocations()
 
         self.involuteLines = []  # Здесь будем хранить все линии зубьев
 
@@ -29,114 +40,36 @@ class OvalGear(BaseGear):
         h = ((self.a - self.b)/(self.a+self.b))**2.0
         return math.pi * (self.a+self.b) * (1.0+(3.0*h)/(10.0+math.sqrt(4.0-3.0*h)))
 
-    def outerradius(self,theta):
-        return self.p / (1.0 - self.e * math.cos(self.nodes * theta))
-
     def innerradius(self, theta):
         return self.iradius
 
-    def dx(self, t):
-        return (-self.e*self.nodes*self.p*math.cos(t)*math.sin(self.nodes*t)) / (1.0 - self.e*math.cos(self.nodes*t))**2 - \
-               (self.p*math.sin(t)) / (1.0 - self.e*math.cos(self.nodes*t))
-
-    def dy(self, t):
-        return self.p*math.cos(t)/(1.0 - self.e*math.cos(self.nodes*t)) - \
-               (self.e*self.nodes*self.p*math.sin(t)*math.sin(self.nodes*t)) / (1.0 - self.e*math.cos(self.nodes*t))**2
-
-    def dx2(self, t):
-        return (2.0*self.e*self.e*self.nodes*self.nodes*self.p*math.cos(t)*math.sin(self.nodes*t)**2) / \
-               (1.0 - self.e*math.cos(self.nodes*t))**3 + \
-               (2.0*self.e*self.nodes*self.p*math.sin(t)*math.sin(self.nodes*t)) / \
-               (1.0 - self.e*math.cos(self.nodes*t))**2 - \
-               (self.p*math.cos(t)) / (1.0 - self.e*math.cos(self.nodes*t)) - \
-               (self.e*self.nodes*self.nodes*self.p*math.cos(t)*math.cos(self.nodes*t)) / \
-               (1.0 - self.e*math.cos(self.nodes*t))**2
-
-    def dy2(self, t):
-        return (2.0*self.e*self.e*self.nodes*self.nodes*self.p*math.sin(t)*math.sin(self.nodes*t)**2) / \
-               (1.0 - self.e*math.cos(self.nodes*t))**3 - \
-               (2.0*self.e*self.nodes*self.p*math.cos(t)*math.sin(self.nodes*t)) / \
-               (1.0 - self.e*math.cos(self.nodes*t))**2 - \
-               (self.p*math.sin(t)) / (1.0 - self.e*math.cos(self.nodes*t)) - \
-               (self.e*self.nodes*self.nodes*self.p*math.sin(t)*math.cos(self.nodes*t)) / \
-               (1.0 - self.e*math.cos(self.nodes*t))**2
-
     def calc_points(self):
         # Логика аналогична SLFMaker из v0.0: найти шаг зуба (cpitch), dedendumd, adendumd и пр.
+        # Шаг и позиции зубьев/впадин ищутся по таблице длины дуги (pitch_placement),
+        # tolerance задаёт допустимую ошибку длины дуги.
         total_perim = self.perimeter()
         self.cpitch = total_perim / self.teeth_count
         halfteethCount = self.teeth_count * 2
-        halfpitch = self.cpitch / 2.0
-        refinement = 1
-
-        while True:
-            module = halfpitch * 2.0 / math.pi
-            self.dedendumd = module * 1.25
-            self.adendumd = module
-
-            ccd = 0.0
-            theta = 0.0
-            ro = self.outerradius(0) - self.dedendumd
-            lx = ro * math.cos(theta)
-            ly = ro * math.sin(theta)
-
-            actualTeeth = 1
-
-            while theta < 2.0 * math.pi:
-                theta += self.tolerance
-                ro = self.outerradius(theta) - self.dedendumd
-                x = ro * math.cos(theta)
-                y = ro * math.sin(theta)
-                ccd += math.sqrt((x - lx)**2 + (y - ly)**2)
-                if ccd >= halfpitch and actualTeeth < halfteethCount:
-                    actualTeeth += 1
-                    ccd = 0.0
-                lx = x
-                ly = y
-
-            if halfteethCount == actualTeeth and abs(ccd - halfpitch) < self.tolerance * 5:
-                break
-            refinement += 1
-            halfpitch = (halfpitch * actualTeeth + ccd) / (halfteethCount + 1)
+
+        with instrument.span("placement"):
+            halfpitch, thetas, self.refinements = pitch_points(
+                self.outerradius, halfteethCount, self.tolerance, self.cpitch / 2.0)
+        instrument.count("refinement passes", self.refinements)
 
         self.cpitch = halfpitch * 2.0
         module = self.cpitch / math.pi
         self.dedendumd = module * 1.25
         self.adendumd = module
 
-        # Финальный проход
-        ccd = 0.0
-        theta = 0.0
-        ro = self.outerradius(theta) - self.dedendumd
-        lx = ro * math.cos(theta)
-        ly = ro * math.sin(theta)
-        rc = self.radius_of_curvature(theta)
-
-        self.teethLoc = [{'x': lx, 'y': ly, 'r': ro, 't': 0.0, 'rc': rc,
-                          'dx': self.dx(0.0), 'dy': self.dy(0.0), 'dx2': self.dx2(0.0), 'dy2': self.dy2(0.0)}]
-        self.gapLoc = []
-        gapFlag = True
-        actualTeeth = 1
-
-        while actualTeeth < halfteethCount:
-            theta += self.tolerance
-            ro = self.outerradius(theta) - self.dedendumd
-            x = ro * math.cos(theta)
-            y = ro * math.sin(theta)
-            dist = math.sqrt((x - lx)**2 + (y - ly)**2)
-            if dist >= halfpitch:
-                rc = self.radius_of_curvature(theta)
-                dat = {'x': x, 'y': y, 'r': ro, 't': theta, 'rc': rc,
-                       'dx': self.dx(theta), 'dy': self.dy(theta),
-                       'dx2': self.dx2(theta), 'dy2': self.dy2(theta)}
-                if gapFlag:
-                    self.gapLoc.append(dat)
-                else:
-                    self.teethLoc.append(dat)
-                gapFlag = not gapFlag
-                lx = x
-                ly = y
-                actualTeeth += 1
+        # Финальный проход: зубья и впадины чередуются, первый - зуб в theta=0
+        # Кривая и производные во всех позициях - одним вычислением на массиве
+        p = self.curve.evaluate(thetas)
+        ro = p.r - self.dedendumd
+        locs = ToothLocations.from_columns(x=ro * np.cos(thetas), y=ro * np.sin(thetas), r=ro, t=thetas,
+                                           rc=np.abs(curvature_radius(p)),
+                                           dx=p.dx, dy=p.dy, dx2=p.dx2, dy2=p.dy2)
+        self.teethLoc = locs[0::2]
+        self.gapLoc = locs[1::2]
 
         # Теперь у нас есть points для зубьев. Но нужны инволютные линии зуба.
         # Мы повторим логику построения зубьев, как в v0.0/slfmaker.py -> amble()/doShape()
@@ -144,6 +77,7 @@ class OvalGear(BaseGear):
 
         self.build_teeth_geometry()
 
+    @instrument.stage("profile")
     def build_teeth_geometry(self):
         # Логика из v0.0: каждый зуб формируется из пары точек в teethLoc (для вершин зубьев)
         # и из инволют, рассчитываемых по радиусу кривизны.
@@ -153,7 +87,6 @@ class OvalGear(BaseGear):
         # В v0.0 между точками teethLoc делали инволютные боковые стороны.
         # Рассчёт очень сложный, скопируем основные шаги.
 
-        inc = 0.01
         # teethLoc - точки вершин зубьев
         # Рассчитаем зуб по каждой точке teethLoc (каждая точка - вершина зуба)
         # В v0.0 зуб формировался между точками teethLoc и gapLoc чередуясь.
@@ -168,40 +101,26 @@ class OvalGear(BaseGear):
         # Предположим, teethLoc - вершины зубьев, gapLoc - впадины между зубьями.
         # Значит, один зуб - это между teethLoc[i] и gapLoc[i], формируя левую и правую сторону зуба с помощью инволюты.
 
-        for i in range(self.teeth_count):
-            # Найдём соответствующую пару точек: вершина зуба - teethLoc[i], впадина - gapLoc[i].
-            pt_tooth = self.teethLoc[i]
-            pt_gap = self.gapLoc[i]
-
+        # Поля вершин зубьев читаются из таблицы сразу кортежами float
+        for x, y, t, rc, dx, dy in self.teethLoc.rows('x', 'y', 't', 'rc', 'dx', 'dy'):
             # Центр и направление
             # В v0.0 рассчитывали offset, td, tt через инволютивные таблицы
             # Для упрощения возьмём код из v0.0/slfmaker.py doShape фрагментарно.
 
-            rc = abs(pt_tooth['rc'])
-            inverseInvoluteTableY = []
-            inverseInvoluteTableX = []
-            t = 0.0
-            while t < math.pi/2.0:
-                iv = involute(rc, t)
-                inverseInvoluteTableX.append((iv[0], t))
-                inverseInvoluteTableY.append((iv[1], t))
-                t += inc
+            rc = abs(rc)
 
             # Находим td и tt (параметры инволюты для dedendum и addendum)
-            td = findClosest(inverseInvoluteTableY, self.dedendumd)
-            tt = findClosest(inverseInvoluteTableY, self.dedendumd + self.adendumd)
-
-            # Координаты точки зуба
-            x = pt_tooth['x']
-            y = pt_tooth['y']
-            dx = pt_tooth['dx']
-            dy = pt_tooth['dy']
+            # по общей таблице единичной инволюты
+            td = t_closest_y(rc, self.dedendumd)
+            tt = t_closest_y(rc, self.dedendumd + self.adendumd)
+
+            # Координаты точки зуба и касательная
             dx, dy = normalize(dx, dy)
 
             toothWidth = self.cpitch / 2.0
             offset = (toothWidth / 2.0) + involute(rc, td)[0]
 
-            tx = findClosestDown(inverseInvoluteTableX, offset)
+            tx = t_below_x(rc, offset)
             if tt > tx:
                 tt = tx
 
@@ -212,13 +131,9 @@ class OvalGear(BaseGear):
             else:
                 rot = math.pi/2.0 + math.atan(dx/dy)
 
-            # Строим линии зуба с ts сегментами
+            # Строим линии зуба с ts сегментами (или по допуску хорды)
             pts = []
-            segments = self.tooth_slices
-            t_step = tt/(segments-1)
-
-            t_val = 0.0
-            for m in range(segments):
+            for m, t_val in enumerate(flank_parameters(tt, rc, self.tooth_slices, self.chord_tolerance)):
                 ix, iy = involute(rc, t_val)
                 px = -offset + ix
                 py = iy
@@ -243,14 +158,13 @@ class OvalGear(BaseGear):
 
                 prev_left = left_point
                 prev_right = right_point
-                t_val += t_step
 
             # Соединяем вершину зуба (последние точки слева и справа)
             self.involuteLines.append((prev_left, prev_right))
 
             # Добавим линию внутреннего радиуса
-            ri = self.innerradius(pt_tooth['t'])
-            xi, yi = to_cartesian(ri, pt_tooth['t'])
+            ri = self.innerradius(t)
+            xi, yi = to_cartesian(ri, t)
             # Можно соединить внутренние точки зубьев по окружности.
 
         # Таким образом у нас в self.involuteLines все линии зубьев.
@@ -0,0 +1,136 @@
+"""
+Расстановка зубьев и впадин по длине дуги кривой дедендума.
+
+Вместо прохода по theta с шагом tolerance и суммирования хорд строится
+таблица накопленной длины дуги (векторно, с удвоением сетки до заданной
+погрешности), затем все 2*teeth позиций находятся одним searchsorted и
+уточняются несколькими шагами Ньютона.
+"""
+import math
+import numpy as np
+
+# Допуск длины дуги не меньше этой доли длины кривой: точнее сумму хорд в
+# double не посчитать, а сетка удваивалась бы до max_nodes на каждой итерации
+MIN_RELATIVE_TOLERANCE = 1e-9
+
+
+def dedendum_of(halfpitch):
+    """Дедендум для заданного полушага: 1.25 * module, module = 2*halfpitch/pi."""
+    return 1.25 * (halfpitch * 2.0 / math.pi)
+
+
+def evaluate_radius(radius, theta):
+    """
+    radius(theta) на массиве углов.
+    Скалярные реализации (math.cos и т.п.) вызываются поэлементно.
+    """
+    theta = np.asarray(theta, dtype=float)
+    try:
+        r = np.asarray(radius(theta), dtype=float)
+        if r.shape == theta.shape:
+            return r
+        if r.ndim == 0:
+            return np.full(theta.shape, float(r))
+    except TypeError:
+        pass
+    return np.fromiter((radius(t) for t in theta.ravel()), dtype=float,
+                       count=theta.size).reshape(theta.shape)
+
+
+def _chord_table(radius, dedendum, nodes):
+    theta = np.linspace(0.0, 2.0*math.pi, nodes + 1)
+    ro = evaluate_radius(radius, theta) - dedendum
+    chords = np.hypot(np.diff(ro*np.cos(theta)), np.diff(ro*np.sin(theta)))
+    s = np.empty(nodes + 1)
+    s[0] = 0.0
+    np.cumsum(chords, out=s[1:])
+    return theta, s
+
+
+def arc_length_table(radius, dedendum, tolerance, nodes=256, max_nodes=1 << 22):
+    """
+    Таблица накопленной длины дуги кривой radius(theta) - dedendum на [0, 2pi].
+    Сетка удваивается, пока оценка ошибки длины (по Ричардсону) больше tolerance
+    (не меньше MIN_RELATIVE_TOLERANCE длины кривой). Возвращает (theta, s, error);
+    ValueError, если и при max_nodes узлах ошибка больше допуска.
+    """
+    theta, s = _chord_table(radius, dedendum, nodes)
+    tolerance = max(tolerance, MIN_RELATIVE_TOLERANCE*s[-1])
+    while True:
+        nodes *= 2
+        theta2, s2 = _chord_table(radius, dedendum, nodes)
+        # Ломаная из хорд сходится как h^2: разница уровней / 3 - оценка ошибки
+        error = abs(s2[-1] - s[-1]) / 3.0
+        theta, s = theta2, s2
+        if error <= tolerance:
+            return theta, s, error
+        if nodes >= max_nodes:
+            raise ValueError("Длина дуги не сошлась к допуску %g за %d узлов (ошибка %g)"
+                             % (tolerance, nodes, error))
+
+
+def locate_arc_lengths(radius, dedendum, theta, s, targets, tolerance, iterations=4):
+    """
+    Углы, на которых длина дуги равна targets.
+    Начальное приближение - линейная интерполяция в таблице (searchsorted),
+    затем шаги Ньютона по скорости |dP/dtheta| внутри найденного интервала.
+    """
+    targets = np.asarray(targets, dtype=float)
+    i = np.clip(np.searchsorted(s, targets, side='right') - 1, 0, len(s) - 2)
+    frac = (targets - s[i]) / (s[i+1] - s[i])
+    t = theta[i] + frac*(theta[i+1] - theta[i])
+
+    r0 = evaluate_radius(radius, theta[i]) - dedendum
+    x0 = r0*np.cos(theta[i])
+    y0 = r0*np.sin(theta[i])
+    h = 1e-6
+    for _ in range(iterations):
+        ro = evaluate_radius(radius, t) - dedendum
+        drdt = (evaluate_radius(radius, t + h) - evaluate_radius(radius, t - h)) / (2.0*h)
+        speed = np.hypot(ro, drdt)
+        # Внутри одного интервала таблицы хорда совпадает с дугой до O(h^3)
+        arc = s[i] + np.hypot(ro*np.cos(t) - x0, ro*np.sin(t) - y0)
+        residual = arc - targets
+        t = t - residual / speed
+        if np.all(np.abs(residual) <= tolerance * 1e-3):
+            break
+    return t
+
+
+def solve_half_pitch(radius, count, tolerance, halfpitch):
+    """
+    Полушаг, при котором count полушагов точно укладываются в длину
+    кривой дедендума (дедендум сам зависит от полушага).
+    Метод секущих по F(hp) = L(dedendum(hp)) - count*hp.
+    Возвращает (halfpitch, theta, s, iterations).
+    """
+    def residual(hp):
+        theta, s, _ = arc_length_table(radius, dedendum_of(hp), tolerance)
+        return s[-1] - count*hp, theta, s
+
+    hp0 = halfpitch
+    f0, theta, s = residual(hp0)
+    tolerance = max(tolerance, MIN_RELATIVE_TOLERANCE*s[-1])
+    hp1 = s[-1] / count
+    iterations = 1
+    while True:
+        f1, theta, s = residual(hp1)
+        iterations += 1
+        if abs(f1) <= tolerance or f1 == f0 or iterations > 50:
+            return hp1, theta, s, iterations
+        hp0, hp1, f0 = hp1, hp1 - f1*(hp1 - hp0)/(f1 - f0), f1
+
+
+def pitch_points(radius, count, tolerance, halfpitch):
+    """
+    Углы count точек (чередуются зуб/впадина, первая - зуб в theta=0),
+    равномерно расставленных по длине дуги кривой дедендума.
+    Возвращает (halfpitch, thetas, iterations).
+    """
+    halfpitch, theta, s, iterations = solve_half_pitch(radius, count, tolerance, halfpitch)
+    dedendum = dedendum_of(halfpitch)
+    thetas = np.zeros(count)
+    if count > 1:
+        targets = np.arange(1, count) * halfpitch
+        thetas[1:] = locate_arc_lengths(radius, dedendum, theta, s, targets, tolerance)
+    return float(halfpitch), thetas, iterations
@@ -0,0 +1,90 @@
+"""
+Таблица передаточного отношения сопряжённой пары.
+
+Закон движения ведомой theta2(theta1) табулируется один раз на равномерной
+сетке по углу ведущей. Запросы - массивами любой длины за O(1) на угол:
+индекс ячейки считается делением, затем линейная интерполяция. Обратный
+запрос theta1(theta2) - двоичный поиск (O(log n)). theta2 строго возрастает
+(отношение положительно), поэтому линейная интерполяция сохраняет
+монотонность.
+
+Углы вне одного цикла продолжаются периодически: пока ведущая проходит span,
+ведомая делает ровно один оборот, так что
+theta2(theta1 + k*span) = theta2(theta1) + 2*pi*k.
+"""
+import math
+
+import numpy as np
+
+
+class TransmissionTable:
+    """
+    span   - угол ведущей за один оборот ведомой (2*pi*t2/t1)
+    ratios - dtheta2/dtheta1 в samples+1 равноотстоящих точках [0, span]
+
+    theta2 - первообразная ratios (трапеции), нормированная так, чтобы
+    theta2[-1] = 2*pi. closure_error - поправка этой нормировки
+    (|интеграл - 2*pi|, рад): насколько дискретно решённая пара
+    не совпадает с непрерывной обкаткой.
+    """
+
+    def __init__(self, span, ratios):
+        ratios = np.asarray(ratios, dtype=float)
+        if len(ratios) < 2 or not np.all(ratios > 0):
+            raise ValueError("Передаточное отношение должно быть положительным")
+        self.span = float(span)
+        self.samples = len(ratios) - 1
+        self.step = self.span/self.samples
+        self.theta1 = np.linspace(0.0, self.span, self.samples + 1)
+        theta2 = np.concatenate(([0.0], np.cumsum(0.5*self.step*(ratios[1:] + ratios[:-1]))))
+        self.closure_error = abs(float(theta2[-1]) - 2.0*math.pi)
+        scale = 2.0*math.pi/theta2[-1]
+        self.theta2 = theta2*scale
+        self.ratios = ratios*scale
+
+    @classmethod
+    def from_pitch(cls, radius, center_distance, span, samples):
+        """Обкатка делительной кривой ведущей radius(thetas): ratio = r1/(a - r1)."""
+        r1 = np.asarray(radius(np.linspace(0.0, span, samples + 1)), dtype=float)
+        return cls(span, r1/(center_distance - r1))
+
+    def _cells(self, theta1):
+        # Номер цикла, ячейка сетки и доля внутри неё для каждого угла
+        theta1 = np.asarray(theta1, dtype=float)
+        # NaN/inf дали бы неверный номер ячейки (astype) - индекс вне таблицы
+        if not np.all(np.isfinite(theta1)):
+            raise ValueError("Угол ведущей должен быть конечным числом")
+        turns = np.floor(theta1/self.span)
+        u = (theta1 - turns*self.span)/self.step
+        i = np.minimum(u.astype(np.intp), self.samples - 1)
+        return turns, i, u - i
+
+    def follower_angle(self, theta1):
+        """theta2(theta1): поворот ведомой (число или массив, без свёртки в [0, 2*pi))."""
+        turns, i, frac = self._cells(theta1)
+        t = self.theta2
+        result = turns*(2.0*math.pi) + t[i] + frac*(t[i + 1] - t[i])
+        return result if result.ndim else float(result)
+
+    def ratio(self, theta1):
+        """Мгновенное передаточное отношение dtheta2/dtheta1."""
+        _, i, frac = self._cells(theta1)
+        g = self.ratios
+        result = g[i] + frac*(g[i + 1] - g[i])
+        return result if result.ndim else float(result)
+
+    def follower_velocity(self, theta1, omega1=1.0):
+        """Угловая скорость ведомой при скорости ведущей omega1 (число или массив)."""
+        return self.ratio(theta1)*omega1
+
+    def driver_angle(self, theta2):
+        """Обратный запрос theta1(theta2) двоичным поиском по таблице."""
+        theta2 = np.asarray(theta2, dtype=float)
+        if not np.all(np.isfinite(theta2)):
+            raise ValueError("Угол ведомой должен быть конечным числом")
+        turns = np.floor(theta2/(2.0*math.pi))
+        v = theta2 - turns*(2.0*math.pi)
+        t = self.theta2
+        i = np.clip(np.searchsorted(t, v, side='right') - 1, 0, self.samples - 1)
+        result = turns*self.span + self.theta1[i] + (v - t[i])/(t[i + 1] - t[i])*self.step
+        return result if result.ndim else float(result)
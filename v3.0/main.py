@@ -2,7 +2,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection
 from gears.conjugate_oval_gear import ConjugateOvalGearFull
+from gears.geometry_cache import default_cache
+from background import JobScheduler
 
 class NonRoundWheelApp:
     def __init__(self, master):
@@ -56,6 +59,21 @@ class NonRoundWheelApp:
         show_button = ttk.Button(params_frame, text="Показать в окне", command=self.show_in_window)
         show_button.grid(row=3, column=4, padx=10, pady=5, sticky=tk.E)
 
+        cancel_button = ttk.Button(params_frame, text="Отмена", command=self.cancel_job)
+        cancel_button.grid(row=3, column=3, padx=10, pady=5, sticky=tk.E)
+
+        # Расчёт идёт в фоновом потоке, окно не замирает
+        self.progress = ttk.Progressbar(params_frame, maximum=100)
+        self.progress.grid(row=3, column=0, columnspan=2, padx=5, pady=5, sticky=tk.EW)
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(params_frame, textvariable=self.status_var).grid(row=3, column=2, sticky=tk.W)
+        self.jobs = JobScheduler(master)
+
+        # Предпросмотр обновляется сам при правке любого параметра
+        for var in (self.teeth_var, self.a_var, self.e_var, self.nodes_var, self.period_var,
+                    self.holedistance_var, self.iradius_var, self.depth_var, self.tolerance_var):
+            var.trace_add('write', self.schedule_preview)
+
         self.fig = Figure(figsize=(5,5), dpi=100)
         self.ax = self.fig.add_subplot(111)
         self.ax.set_aspect('equal', 'box')
@@ -64,47 +82,92 @@ class NonRoundWheelApp:
         self.canvas = FigureCanvasTkAgg(self.fig, master=master)
         self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
+    def read_params(self):
+        # Tk-переменные читаются только в главном потоке
+        return (self.teeth_var.get(), 10, self.a_var.get(), self.e_var.get(),
+                self.nodes_var.get(), self.period_var.get(), self.holedistance_var.get(),
+                self.iradius_var.get(), self.depth_var.get(), self.tolerance_var.get())
+
+    def schedule_preview(self, *args):
+        # Пересчёт после паузы в наборе, а не на каждую клавишу
+        self.jobs.debounce(400, lambda: self.show_in_window(quiet=True))
+
+    def start_job(self, text, fn, *args, on_done, on_error=None, preview=False):
+        self.progress['value'] = 0
+        self.status_var.set(text)
+        self.jobs.submit(fn, *args, on_done=on_done, on_error=on_error or self.job_failed,
+                         on_progress=self.job_progress, preview=preview)
+
+    def job_progress(self, fraction, text):
+        self.progress['value'] = 100*fraction
+        self.status_var.set(text)
+
+    def job_failed(self, e):
+        self.progress['value'] = 0
+        self.status_var.set("Ошибка")
+        messagebox.showerror("Ошибка", f"Сбой расчёта шестерён:\n{e}")
+
+    def preview_failed(self, e):
+        # Автоматический предпросмотр: без модального окна на каждую правку
+        self.progress['value'] = 0
+        self.status_var.set(f"Ошибка: {e}")
+
+    def cancel_job(self):
+        self.jobs.cancel()
+        self.progress['value'] = 0
+        self.status_var.set("Отменено")
+
     def save_dxf(self):
-        gear = ConjugateOvalGearFull(
-            self.teeth_var.get(),
-            10,
-            self.a_var.get(),
-            self.e_var.get(),
-            self.nodes_var.get(),
-            self.period_var.get(),
-            self.holedistance_var.get(),
-            self.iradius_var.get(),
-            self.depth_var.get(),
-            self.tolerance_var.get()
-        )
-        gear.write('output.dxf')
-        messagebox.showinfo("DXF", "DXF успешно сгенерирован: output.dxf")
-
-    def show_in_window(self):
-        gear = ConjugateOvalGearFull(
-            self.teeth_var.get(),
-            10,
-            self.a_var.get(),
-            self.e_var.get(),
-            self.nodes_var.get(),
-            self.period_var.get(),
-            self.holedistance_var.get(),
-            self.iradius_var.get(),
-            self.depth_var.get(),
-            self.tolerance_var.get()
-        )
-        gear.calcPoints()
-        lines = gear.get_lines()
+        try:
+            params = self.read_params()
+        except tk.TclError:
+            messagebox.showerror("Ошибка", "Некорректные параметры")
+            return
+        self.start_job("Расчёт...", write_gear, params, 'output.dxf', on_done=self.dxf_saved)
+
+    def dxf_saved(self, filename):
+        self.progress['value'] = 100
+        self.status_var.set("Готово")
+        messagebox.showinfo("DXF", f"DXF успешно сгенерирован: {filename}")
+
+    def show_in_window(self, quiet=False):
+        """Предпросмотр; quiet - запуск правкой параметров, ошибка только в строке состояния."""
+        try:
+            params = self.read_params()
+        except tk.TclError:
+            # Поле ввода пустое или недописано - ждём следующей правки
+            self.status_var.set("Некорректные параметры")
+            return
+        self.start_job("Расчёт...", compute_segments, params, on_done=self.draw_segments,
+                       on_error=self.preview_failed if quiet else None, preview=True)
+
+    def draw_segments(self, segments):
+        self.progress['value'] = 100
+        self.status_var.set("Готово")
 
         self.ax.clear()
         self.ax.set_aspect('equal', 'box')
         self.ax.grid(True)
-        for line in lines:
-            (x1,y1),(x2,y2) = line
-            self.ax.plot([x1,x2],[y1,y2],color='gray')
+        # Все отрезки пары одной LineCollection прямо из массива (M,2,2)
+        self.ax.add_collection(LineCollection(segments, colors='gray'))
+        self.ax.autoscale_view()
 
         self.canvas.draw()
 
+# Выполняются в рабочем потоке JobScheduler: без обращений к Tk
+
+def compute_segments(job, params):
+    gear = ConjugateOvalGearFull(*params, cache=default_cache(), progress=job.progress)
+    gear.compute()
+    return gear.segments
+
+def write_gear(job, params, filename):
+    gear = ConjugateOvalGearFull(*params, cache=default_cache(), progress=job.progress)
+    gear.compute()
+    job.check()
+    gear.write(filename)
+    return filename
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = NonRoundWheelApp(root)
@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+
+from gears import conjugate_oval_gear, geometry_cache
+from gears.geometry_cache import GeometryCache, local_sources
+
+
+def test_local_sources_cover_builder_dependencies():
+    names = {os.path.basename(f) for f in local_sources(conjugate_oval_gear.ConjugateOvalGearFull)}
+    assert {"conjugate_oval_gear.py", "pitch_curves.py", "pitch_placement.py", "involute_table.py",
+            "sampling.py", "tooth_locations.py", "transmission.py"} <= names
+
+
+def build(cache):
+    gear = conjugate_oval_gear.ConjugateOvalGearFull(20, 10, 1.0, 0.15, 2, 2, 3.0, 0.0625, 0.25, 0.001,
+                                                     cache=cache)
+    gear.compute()
+    return gear
+
+
+def test_cached_pair_restores_tooth_locations(tmp_path):
+    # Формат записи v3.0 (CACHE_VERSION 2): позиции зубьев - ToothLocations.to_arrays
+    computed = build(GeometryCache(str(tmp_path)))
+    cached = build(GeometryCache(str(tmp_path)))
+    assert not computed.cache_hit and cached.cache_hit
+    assert cached.holedistance == computed.holedistance
+    assert np.array_equal(cached.segments, computed.segments)
+    for name in ("teethLoc", "gapLoc", "conjugateTeethLoc"):
+        a, b = getattr(computed, name).to_arrays(name), getattr(cached, name).to_arrays(name)
+        assert a.keys() == b.keys() and all(np.array_equal(a[k], b[k]) for k in a)
+    assert cached.transmission.follower_angle(1.0) == computed.transmission.follower_angle(1.0)
+
+
+def test_key_depends_on_cache_version(monkeypatch):
+    cls = conjugate_oval_gear.ConjugateOvalGearFull
+    key = geometry_cache.cache_key(cls, {"teeth": 20})
+    monkeypatch.setattr(geometry_cache, "CACHE_VERSION", geometry_cache.CACHE_VERSION + 1)
+    assert geometry_cache.cache_key(cls, {"teeth": 20}) != key
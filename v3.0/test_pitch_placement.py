@@ -0,0 +1,22 @@
+import math
+
+import pytest
+
+from gears.pitch_curves import OvalCurve
+from gears.pitch_placement import MIN_RELATIVE_TOLERANCE, arc_length_table, solve_half_pitch
+
+
+def test_tolerance_is_clamped_to_curve_length():
+    curve = OvalCurve(1.0*(1 - 0.15**2), 0.15, 2)
+    theta, s, error = arc_length_table(curve.radius, 0.05, 1e-300)
+    assert len(theta) < 1 << 20
+    assert error <= MIN_RELATIVE_TOLERANCE*s[-1]
+
+    halfpitch, theta, s, iterations = solve_half_pitch(curve.radius, 80, 1e-300, 2*math.pi/80)
+    assert iterations < 10
+
+
+def test_node_cap_without_convergence_raises():
+    curve = OvalCurve(1.0*(1 - 0.15**2), 0.15, 2)
+    with pytest.raises(ValueError, match="не сошлась"):
+        arc_length_table(curve.radius, 0.05, 1e-12, max_nodes=1024)
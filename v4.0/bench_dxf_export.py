@@ -0,0 +1,79 @@
+"""
+Сравнение режимов экспорта DXF: размер файла и время записи.
+
+    python bench_dxf_export.py [копий пары] [каталог для файлов]
+
+Лист - сетка копий одной эллиптической пары (EllipticalPairBuilder).
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from shapely import affinity
+
+from dxf_export import DXFExport
+from elliptical_gears import EllipticalPairBuilder
+from geometry_utils import unify_rings, unify_segments
+
+
+def build_sheet(copies):
+    builder = EllipticalPairBuilder(30, 50, 40, 30, 50, 40, 2.0, 20, 0.25)
+    poly1, poly2 = builder.build_pair_polygons()
+    polys = []
+    side = int(np.ceil(np.sqrt(copies)))
+    for k in range(copies):
+        dx, dy = 250.0 * (k % side), 150.0 * (k // side)
+        polys.append(affinity.translate(poly1, dx, dy))
+        polys.append(affinity.translate(poly2, dx, dy))
+    return polys
+
+
+def run(name, filename, make, write):
+    t0 = time.perf_counter()
+    dxf = make(filename)
+    write(dxf)
+    dxf.save()
+    dt = time.perf_counter() - t0
+    return name, dt, os.path.getsize(filename)
+
+
+def main():
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    outdir = sys.argv[2] if len(sys.argv) > 2 else tempfile.mkdtemp()
+
+    polys = build_sheet(copies)
+    lines = [seg for p in polys for seg in unify_segments(p)]
+    segs = np.asarray(lines)
+    rings = [r for p in polys for r in unify_rings(p)]
+    print("полигонов: %d, отрезков: %d" % (len(polys), len(lines)))
+
+    cases = [
+        ("ezdxf LINE", lambda f: DXFExport(f),
+         lambda d: d.add_lines(lines)),
+        ("поток LINE R12", lambda f: DXFExport(f, streaming=True, dxfversion="R12"),
+         lambda d: d.add_lines(segs)),
+        ("поток LINE R2010", lambda f: DXFExport(f, streaming=True),
+         lambda d: d.add_lines(segs)),
+        ("ezdxf LWPOLYLINE", lambda f: DXFExport(f),
+         lambda d: d.add_polylines(rings)),
+        ("поток LWPOLYLINE", lambda f: DXFExport(f, streaming=True),
+         lambda d: d.add_polylines(rings)),
+        ("поток LWPOLYLINE p=3", lambda f: DXFExport(f, streaming=True, precision=3),
+         lambda d: d.add_polylines(rings)),
+        ("сцепка отрезков -> LWPOLYLINE", lambda f: DXFExport(f, streaming=True, polylines=True),
+         lambda d: d.add_lines(segs)),
+    ]
+    results = []
+    for n, (name, make, write) in enumerate(cases):
+        results.append(run(name, os.path.join(outdir, "bench_%d.dxf" % n), make, write))
+
+    base_t, base_size = results[0][1], results[0][2]
+    print("%-32s %10s %12s %8s %8s" % ("режим", "время, с", "размер, Б", "x время", "x размер"))
+    for name, dt, size in results:
+        print("%-32s %10.3f %12d %8.1f %8.1f" % (name, dt, size, base_t / dt, base_size / size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Проверка зацепления (mesh_check.check_pair) для пар с разным числом зубьев:
+время на шаг обкатки и число отрезков-кандидатов из STRtree против полного
+числа отрезков контуров.
+
+    python bench_mesh.py [шаг, градусы]
+"""
+import sys
+
+from elliptical_gears import EllipticalPairBuilder
+from geometry_utils import segment_arrays
+from mesh_check import check_pair
+
+
+def main():
+    step_deg = float(sys.argv[1]) if len(sys.argv) > 1 else 0.1
+
+    for teeth in (50, 100, 200):
+        # Модуль подобран так, чтобы размер шестерён не менялся
+        builder = EllipticalPairBuilder(teeth, 50, 40, teeth, 50, 40, 40.0/teeth, 20, 0.25)
+        poly1, poly2 = builder.build_pair_polygons()
+        total = len(segment_arrays(poly1)) + len(segment_arrays(poly2))
+        report, undercut1, undercut2 = check_pair(builder, step_deg)
+        steps = len(report.theta1)
+        print("зубьев %3d: отрезков %6d, шагов %5d, кандидатов на шаг %5d (%.0f%%), "
+              "%.2f с (%.0f мкс/шаг)"
+              % (teeth, total, steps, report.candidates.mean(), 100.0*report.candidates.mean()/total,
+                 report.elapsed, 1e6*report.elapsed/steps))
+        print("           мин. зазор %.4f при theta1 = %.2f рад, шагов с прониканием %d, "
+              "подрезанных колец %d/%d"
+              % (report.min_clearance, report.worst_theta1, report.interfering_steps, undercut1, undercut2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Построение полигона шестерни: unary_union полигонов зубьев против
+прямой сборки контура (gear_outline / radial_outline).
+
+    python bench_outline.py [повторов]
+"""
+import sys
+import time
+
+from shapely.ops import unary_union
+
+from elliptical_gears import EllipticalGear, gear_outline
+from geometry_utils import tooth_polygon
+
+
+def union_outline(profiles):
+    return unary_union([tooth_polygon(*p) for p in profiles])
+
+
+def timed(build, profiles, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        poly = build(profiles)
+        best = min(best, time.perf_counter() - t0)
+    return best, poly
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print("%6s %8s %12s %12s %8s %12s" % ("зубьев", "точек", "union, мс", "контур, мс", "ускор.", "разница S"))
+    for teeth, points in ((20, 40), (50, 40), (100, 40), (100, 200), (300, 100)):
+        gear = EllipticalGear(teeth, 50, 40, 2.0, 20, 0.25)
+        gear.n_profile_points = points
+        # Профили считаются один раз: сравниваем только сборку полигона
+        profiles = [gear._tooth_profile(i*gear.dtheta) for i in range(teeth)]
+        t_union, p_union = timed(union_outline, profiles, repeats)
+        t_direct, p_direct = timed(gear_outline, profiles, repeats)
+        diff = p_union.symmetric_difference(p_direct).area
+        print("%6d %8d %12.2f %12.2f %8.1f %12.2e" % (teeth, points, 1e3*t_union, 1e3*t_direct,
+                                                     t_union / t_direct, diff))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Время перерисовки предпросмотра: ax.plot на каждый отрезок против одной
+LineCollection на шестерню (как в GearApp.show_gears).
+
+    python bench_preview.py [зубьев] [повторов]
+"""
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+
+from elliptical_gears import EllipticalPairBuilder
+from geometry_utils import segments_bounds
+
+
+def draw_per_segment(ax, lines1, lines2):
+    for seg in lines1:
+        (x1,y1),(x2,y2) = seg
+        ax.plot([x1,x2],[y1,y2], color='blue')
+    for seg in lines2:
+        (x1,y1),(x2,y2) = seg
+        ax.plot([x1,x2],[y1,y2], color='red')
+    allx = [p[0] for seg in (lines1+lines2) for p in seg]
+    ally = [p[1] for seg in (lines1+lines2) for p in seg]
+    ax.set_xlim(min(allx), max(allx))
+    ax.set_ylim(min(ally), max(ally))
+
+
+def draw_collection(ax, segs1, segs2):
+    ax.add_collection(LineCollection(segs1, colors='blue'))
+    ax.add_collection(LineCollection(segs2, colors='red'))
+    mnx, mny, mxx, mxy = segments_bounds(segs1, segs2)
+    ax.set_xlim(mnx, mxx)
+    ax.set_ylim(mny, mxy)
+
+
+def timed(draw, args, repeats):
+    fig = Figure(figsize=(5, 5), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot(111)
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        ax.clear()
+        ax.grid(True)
+        draw(ax, *args)
+        canvas.draw()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    teeth = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    builder = EllipticalPairBuilder(teeth, 50, 40, teeth, 50, 40, 0.9, 20, 0.25)
+    lines1, lines2 = builder.build_pair()
+    segs1, segs2 = builder.build_pair_arrays()
+    print("зубьев: %d, отрезков: %d" % (teeth, len(lines1) + len(lines2)))
+
+    t_plot = timed(draw_per_segment, (lines1, lines2), repeats)
+    t_coll = timed(draw_collection, (segs1, segs2), repeats)
+    print("ax.plot на отрезок:   %.3f с" % t_plot)
+    print("LineCollection:       %.3f с" % t_coll)
+    print("ускорение:            %.1fx" % (t_plot / t_coll))
+
+
+if __name__ == "__main__":
+    main()
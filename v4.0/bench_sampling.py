@@ -0,0 +1,63 @@
+"""
+Фиксированная дискретизация против адаптивной (допуск хорды):
+число вершин и фактическое отклонение от плотного эталона (Хаусдорф).
+
+    python bench_sampling.py [допуск, мм]
+"""
+import sys
+
+import numpy as np
+from shapely.geometry import LineString
+
+from elliptical_gears import EllipticalGear
+from gear import Gear
+from geometry_utils import ring_arrays
+
+
+def deviation(points, reference):
+    return LineString(points).hausdorff_distance(LineString(reference))
+
+
+class DenseGear(Gear):
+    # Эталон: 2000 точек на инволюту и на каждую дугу
+    def _arc_points(self, radius, angle):
+        return 2000
+
+
+def gear_case(tol):
+    fixed = Gear(30, 2.0).generate_tooth_profile_array()
+    adaptive = Gear(30, 2.0, tolerance=tol).generate_tooth_profile_array()
+    dense = DenseGear(30, 2.0)
+    dense.num_involute_points = 2000
+    reference = dense.generate_tooth_profile_array()
+    return fixed, adaptive, reference
+
+
+def elliptical_case(tol, a, b):
+    def outline(gear):
+        return np.concatenate(ring_arrays(gear.build_gear_polygon()))
+
+    dense = EllipticalGear(20, a, b, 2.0, 20, 0.25)
+    dense.n_profile_points = 2000
+    return (outline(EllipticalGear(20, a, b, 2.0, 20, 0.25)),
+            outline(EllipticalGear(20, a, b, 2.0, 20, 0.25, tolerance=tol)),
+            outline(dense))
+
+
+def main():
+    tol = float(sys.argv[1]) if len(sys.argv) > 1 else 0.01
+    cases = [
+        ("Gear, зуб z=30", gear_case(tol)),
+        ("EllipticalGear 30x20", elliptical_case(tol, 30, 20)),
+        ("EllipticalGear 60x15", elliptical_case(tol, 60, 15)),
+    ]
+    print("допуск хорды: %g" % tol)
+    print("%-22s %10s %12s %10s %12s" % ("", "вершин", "отклонение", "вершин", "отклонение"))
+    print("%-22s %23s %23s" % ("", "фиксированно", "адаптивно"))
+    for name, (fixed, adaptive, reference) in cases:
+        print("%-22s %10d %12.2e %10d %12.2e" % (name, len(fixed), deviation(fixed, reference),
+                                                 len(adaptive), deviation(adaptive, reference)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Холодный запуск приложения: от старта интерпретатора до показа окна
+(первый Expose) и до готовности графика и расчётных модулей - каждый
+замер в новом процессе. Для сравнения - те же замеры с прежней загрузкой
+всего при импорте (matplotlib TkAgg, numpy, shapely, ezdxf до окна).
+
+    python bench_startup.py [повторов]
+
+Без дисплея (нет $DISPLAY) окно не создать - тогда замеряется только
+импорт main.py.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Прежний main.py импортировал всё это до создания окна
+EAGER = """
+import matplotlib
+matplotlib.use("TkAgg")
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import pair_jobs
+"""
+
+# Выполняется в отдельном процессе; t0 - time.time() родителя перед запуском
+PROBE = """
+import json, sys, time
+t0 = float(sys.argv[1])
+if sys.argv[2] == "eager":
+%s
+import tkinter as tk
+import main
+t_import = time.time()
+result = {"import": t_import - t0,
+          "heavy": sorted({"numpy", "shapely", "ezdxf", "matplotlib"} & set(sys.modules))}
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print(json.dumps(result))
+    sys.exit()
+shown = []
+root.bind("<Expose>", lambda e: shown or shown.append(time.time()), add="+")
+app = main.GearApp(root)
+while not shown or app.canvas is None or main._pair_jobs is None:
+    root.update()
+    time.sleep(0.001)
+result.update(window=shown[0] - t0, ready=time.time() - t0)
+root.destroy()
+print(json.dumps(result))
+"""
+
+
+def probe(mode):
+    script = PROBE % "\n".join("    " + line for line in EAGER.strip().splitlines())
+    t0 = time.time()
+    proc = subprocess.run([sys.executable, "-c", script, repr(t0), mode],
+                          cwd=HERE, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip())
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for mode, title in (("lazy", "ленивая загрузка"), ("eager", "всё при импорте")):
+        results = [probe(mode) for _ in range(repeats)]
+        line = "%-17s импорт main %7.1f мс" % (title, 1e3*min(r["import"] for r in results))
+        if "window" in results[0]:
+            line += ", окно %7.1f мс, график и расчёт готовы %7.1f мс" % (
+                1e3*min(r["window"] for r in results), 1e3*min(r["ready"] for r in results))
+        else:
+            line += " (нет дисплея - окно не замерялось)"
+        print(line)
+        print("%-17s загружены до окна: %s" % ("", ", ".join(results[0]["heavy"]) or "-"))
+
+
+if __name__ == "__main__":
+    main()
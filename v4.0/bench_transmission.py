@@ -0,0 +1,61 @@
+"""
+Запросы к таблице передаточного отношения пары (EllipticalPairBuilder.transmission):
+theta2(theta1), отношение и обратный запрос для большого массива углов
+против прямого интегрирования dtheta2/dtheta1 = r1/(a - r1) на каждый угол.
+
+    python bench_transmission.py [углов]
+"""
+import math
+import sys
+import time
+
+import numpy as np
+
+from elliptical_gears import EllipticalPairBuilder
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+
+    builder = EllipticalPairBuilder(20, 50, 40, 30, 50, 40, 2.0, 20, 0.25)
+    table, t_build = timed(builder.transmission)
+    a = builder.center_distance
+    print("a = %.6f, узлов таблицы: %d, построение: %.2f мс, невязка: %.1e рад"
+          % (a, table.samples, 1e3*t_build, table.closure_error))
+
+    theta1 = np.random.default_rng(0).uniform(-4*math.pi, 4*math.pi, count)
+    theta2, t_fwd = timed(table.follower_angle, theta1)
+    _, t_ratio = timed(table.ratio, theta1)
+    back, t_inv = timed(table.driver_angle, theta2)
+    print("углов: %d" % count)
+    print("theta2(theta1):  %.3f с (%.0f нс/угол)" % (t_fwd, 1e9*t_fwd/count))
+    print("ratio(theta1):   %.3f с (%.0f нс/угол)" % (t_ratio, 1e9*t_ratio/count))
+    print("theta1(theta2):  %.3f с (%.0f нс/угол), ошибка обращения %.1e"
+          % (t_inv, 1e9*t_inv/count, np.abs(back - theta1).max()))
+
+    # Прямое интегрирование (трапеции, 256 узлов на угол) - на небольшой выборке
+    gear1 = builder.gear1
+    sample = theta1[:2000]
+
+    def integrate(thetas):
+        out = []
+        for t in thetas:
+            grid = np.linspace(0.0, t, 257)
+            r1 = gear1.pitch_radius(grid)
+            g = r1/(a - r1)
+            out.append((grid[1] - grid[0])*(g.sum() - 0.5*(g[0] + g[-1])))
+        return np.array(out)
+
+    direct, t_direct = timed(integrate, sample)
+    print("интегрирование:  %.0f нс/угол, расхождение с таблицей %.1e рад"
+          % (1e9*t_direct/len(sample), np.abs(direct - table.follower_angle(sample)).max()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,66 @@
 import ezdxf
+from dxf_stream import DXFStreamWriter, chain_segments
+import instrument
 
 class DXFExport:
-    def __init__(self, filename="gear.dxf"):
+    def __init__(self, filename="gear.dxf", streaming=False, dxfversion="R2010",
+                 polylines=False, precision=6):
+        """
+        streaming=True - отрезки сразу форматируются в файл через DXFStreamWriter,
+        без объектов ezdxf на каждую сущность (dxfversion: "R2010" или "R12").
+        polylines=True - add_lines сцепляет смежные отрезки в контуры и пишет
+        каждый одной LWPOLYLINE (в R12 её нет - POLYLINE, как у DXFStreamWriter).
+        precision - знаков после запятой в координатах (и допуск сцепки).
+        """
         self.filename = filename
-        self.doc = ezdxf.new(dxfversion="R2010")
+        self.streaming = streaming
+        self.polylines = polylines
+        self.precision = precision
+        if streaming:
+            self.writer = DXFStreamWriter(filename, dxfversion=dxfversion, layer="GEAR",
+                                          precision=precision)
+            return
+        self.doc = ezdxf.new(dxfversion=dxfversion)
         self.doc.layers.add(name="GEAR", color=7)  # белый
         self.msp = self.doc.modelspace()
 
     def add_lines(self, lines):
         """
-        lines: список отрезков [((x1,y1),(x2,y2)), ...]
+        lines: список отрезков [((x1,y1),(x2,y2)), ...] или массив (M,2,2)
         """
+        instrument.count("segments emitted", len(lines))
+        if self.polylines:
+            for points, closed in chain_segments(lines, self.precision):
+                self.add_polyline(points, closed)
+            return
+        if self.streaming:
+            self.writer.write_segments(lines)
+            return
         for (x1,y1),(x2,y2) in lines:
             self.msp.add_line((x1, y1), (x2, y2), dxfattribs={"layer":"GEAR"})
 
+    def add_polylines(self, rings):
+        """
+        rings: замкнутые контуры [(N,2), ...] (например, unify_rings(poly))
+        """
+        if instrument.enabled():
+            instrument.count("segments emitted", sum(len(points) - 1 for points in rings))
+        for points in rings:
+            self.add_polyline(points)
+
+    def add_polyline(self, points, closed=True):
+        if self.streaming:
+            self.writer.write_polyline(points, closed)
+            return
+        points = [(round(x, self.precision), round(y, self.precision)) for x, y in points]
+        if self.doc.dxfversion == ezdxf.const.DXF12:
+            self.msp.add_polyline2d(points, close=closed, dxfattribs={"layer":"GEAR"})
+            return
+        self.msp.add_lwpolyline(points, close=closed, dxfattribs={"layer":"GEAR"})
+
     def save(self):
-        self.doc.saveas(self.filename)
+        with instrument.span("save"):
+            if self.streaming:
+                self.writer.close()
+                return
+            self.doc.saveas(self.filename)
@@ -0,0 +1,227 @@
+"""
+Потоковая запись DXF.
+
+Сущности не создаются как объекты: координаты форматируются пачками
+(chunk сущностей за одну операцию %) и сразу уходят в буферизованный файл.
+Принимаются массивы отрезков (M,2,2) и любые итерируемые/генераторы
+((x1,y1),(x2,y2)).
+
+Контуры (write_polyline/write_outlines) пишутся одной сущностью:
+LWPOLYLINE в R2010, POLYLINE/VERTEX/SEQEND в R12 (LWPOLYLINE в R12 нет).
+
+- R12: только секция ENTITIES, как в старом SLFMaker.write (ezdxf не нужен).
+- R2010: заголовок, таблицы и OBJECTS берутся из пустого документа ezdxf,
+  сущности с хэндлами пишутся во временный файл и вклеиваются в ENTITIES
+  при закрытии.
+"""
+import itertools
+import tempfile
+
+CHUNK = 4096
+
+
+def _flat_rows(segments, width):
+    """Итератор по пачкам плоских кортежей координат (до CHUNK сущностей в пачке)."""
+    if hasattr(segments, "reshape"):
+        rows = segments.reshape(-1, width)
+        for i in range(0, len(rows), CHUNK):
+            part = rows[i:i + CHUNK]
+            yield len(part), tuple(part.ravel().tolist())
+        return
+    it = iter(segments)
+    while True:
+        part = list(itertools.islice(it, CHUNK))
+        if not part:
+            return
+        yield len(part), tuple(c for seg in part for p in seg for c in p)
+
+
+def chain_segments(segments, precision=None):
+    """
+    Сцепляет смежные отрезки в ломаные.
+    Концы совпадают, если равны после round(.., precision) (None - точное равенство).
+    Направление отрезков не важно, вырожденные отрезки отбрасываются.
+    Возвращает список (points, closed).
+    """
+    if hasattr(segments, "tolist"):
+        segments = segments.tolist()
+    key = (lambda p: (p[0], p[1])) if precision is None else \
+        (lambda p: (round(p[0], precision), round(p[1], precision)))
+
+    ends = []
+    neighbours = {}
+    for p1, p2 in segments:
+        k1, k2 = key(p1), key(p2)
+        if k1 == k2:
+            continue
+        ends.append((k1, k2, p1, p2))
+        neighbours.setdefault(k1, []).append(len(ends) - 1)
+        neighbours.setdefault(k2, []).append(len(ends) - 1)
+
+    used = [False] * len(ends)
+
+    def walk(k, points):
+        # Идём от точки k, пока есть неиспользованный сосед
+        while True:
+            nxt = [j for j in neighbours[k] if not used[j]]
+            if not nxt:
+                return k
+            j = nxt[0]
+            used[j] = True
+            k1, k2, p1, p2 = ends[j]
+            if k1 == k:
+                points.append(p2)
+                k = k2
+            else:
+                points.append(p1)
+                k = k1
+
+    chains = []
+    for i, (k1, k2, p1, p2) in enumerate(ends):
+        if used[i]:
+            continue
+        used[i] = True
+        forward = [p1, p2]
+        tail = walk(k2, forward)
+        if tail == k1:
+            # Последняя точка совпадает с первой - контур замкнут
+            forward.pop()
+            chains.append((forward, True))
+            continue
+        backward = []
+        walk(k1, backward)
+        chains.append((backward[::-1] + forward, False))
+    return chains
+
+
+class DXFStreamWriter:
+    """
+    Потоковый писатель DXF.
+
+        with DXFStreamWriter("gear.dxf") as w:
+            w.write_segments(segments)
+    """
+
+    def __init__(self, filename, dxfversion="R12", layer="gear", precision=6,
+                 comment=None, buffering=1 << 20):
+        self.filename = filename
+        self.dxfversion = dxfversion.upper()
+        self.layer = layer
+        self.precision = precision
+        self.count = 0
+        self._layers = {layer}
+        self._num = "%%.%df" % precision
+        self._file = open(filename, "w", buffering=buffering)
+
+        if self.dxfversion == "R12":
+            self._out = self._file
+            if comment:
+                self._file.write("999\n%s\n" % comment)
+            self._file.write("  0\nSECTION\n  2\nENTITIES\n")
+        elif self.dxfversion == "R2010":
+            import ezdxf
+            self._doc = ezdxf.new(dxfversion="R2010")
+            self._owner = self._doc.modelspace().layout_key
+            self._handle = int(str(self._doc.entitydb.handles), 16)
+            self._first_handle = self._handle
+            self._out = tempfile.TemporaryFile("w+", buffering=buffering)
+        else:
+            raise ValueError("Неподдерживаемая версия DXF: %s" % dxfversion)
+
+    def _line_template(self, layer):
+        n = self._num
+        if self.dxfversion == "R12":
+            return ("  0\nLINE\n  8\n%s\n 10\n%s\n 20\n%s\n 11\n%s\n 21\n%s\n"
+                    % (layer, n, n, n, n))
+        return ("  0\nLINE\n  5\n%%X\n330\n%s\n100\nAcDbEntity\n  8\n%s\n100\nAcDbLine\n"
+                " 10\n%s\n 20\n%s\n 30\n0.0\n 11\n%s\n 21\n%s\n 31\n0.0\n"
+                % (self._owner, layer, n, n, n, n))
+
+    def _with_handles(self, k, values, width):
+        """Вставляет хэндл перед координатами каждой сущности (R2010)."""
+        handles = range(self._handle, self._handle + k)
+        self._handle += k
+        cols = [handles] + [values[i::width] for i in range(width)]
+        return tuple(itertools.chain.from_iterable(zip(*cols)))
+
+    def write_segments(self, segments, layer=None):
+        """Записывает отрезки как LINE. segments: (M,2,2) или итерируемое ((x1,y1),(x2,y2))."""
+        layer = layer or self.layer
+        self._layers.add(layer)
+        template = self._line_template(layer)
+        write = self._out.write
+        for k, values in _flat_rows(segments, 4):
+            if self.dxfversion != "R12":
+                values = self._with_handles(k, values, 4)
+            write((template * k) % values)
+            self.count += k
+
+    def write_polyline(self, points, closed=True, layer=None):
+        """Записывает ломаную одной сущностью. points: (N,2) или список (x,y)."""
+        layer = layer or self.layer
+        self._layers.add(layer)
+        if hasattr(points, "tolist"):
+            points = points.tolist()
+        values = tuple(c for p in points for c in p[:2])
+        n = self._num
+        if self.dxfversion == "R12":
+            head = ("  0\nPOLYLINE\n  8\n%s\n 66\n1\n 10\n0.0\n 20\n0.0\n 30\n0.0\n 70\n%d\n"
+                    % (layer, 1 if closed else 0))
+            vertex = "  0\nVERTEX\n  8\n%s\n 10\n%s\n 20\n%s\n" % (layer, n, n)
+            tail = "  0\nSEQEND\n  8\n%s\n" % layer
+        else:
+            head = ("  0\nLWPOLYLINE\n  5\n%X\n330\n%s\n100\nAcDbEntity\n  8\n%s\n"
+                    "100\nAcDbPolyline\n 90\n%d\n 70\n%d\n"
+                    % (self._handle, self._owner, layer, len(points), 1 if closed else 0))
+            self._handle += 1
+            vertex = " 10\n%s\n 20\n%s\n" % (n, n)
+            tail = ""
+        write = self._out.write
+        write(head)
+        for i in range(0, len(values), 2 * CHUNK):
+            part = values[i:i + 2 * CHUNK]
+            write((vertex * (len(part) // 2)) % part)
+        write(tail)
+        self.count += 1
+
+    def write_outlines(self, segments, layer=None):
+        """Сцепляет отрезки в контуры (chain_segments) и пишет каждый одной ломаной."""
+        for points, closed in chain_segments(segments, self.precision):
+            self.write_polyline(points, closed, layer)
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.dxfversion == "R12":
+            self._file.write("  0\nENDSEC\n  0\nEOF\n")
+        else:
+            self._finish_r2010()
+        self._file.close()
+
+    def _finish_r2010(self):
+        import io
+        import shutil
+
+        # Хэндлы [first_handle, handle) заняты потоковыми сущностями,
+        # всё, что ezdxf создаст дальше (слои и т.п.), получит следующие
+        self._doc.entitydb.handles.reset("%X" % self._handle)
+        for name in sorted(self._layers):
+            if name not in self._doc.layers:
+                self._doc.layers.add(name=name, color=7)
+        skeleton = io.StringIO()
+        self._doc.write(skeleton)
+        text = skeleton.getvalue()
+        marker = "  2\nENTITIES\n"
+        start = text.index(marker) + len(marker)
+        self._file.write(text[:start])
+        self._out.seek(0)
+        shutil.copyfileobj(self._out, self._file, 1 << 20)
+        self._out.close()
+        self._file.write(text[start:])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
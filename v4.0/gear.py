@@ -1,4 +1,7 @@
 import math
+import numpy as np
+
+from geometry_utils import arc_divisions, involute_parameters
 
 def involute_point(base_radius, t):
     """Вычисляет координаты точки на инволюте окружности радиуса base_radius по параметру t."""
@@ -7,9 +10,11 @@ def involute_point(base_radius, t):
     return x, y
 
 class Gear:
-    def __init__(self, teeth, module, pressure_angle=20, clearance=0.25):
+    def __init__(self, teeth, module, pressure_angle=20, clearance=0.25, tolerance=None):
         """
         Инициализация круговой (обычной) шестерни.
+        tolerance - допуск хорды: если задан, число точек инволюты и дуг
+        подбирается по кривизне, иначе num_involute_points / 10 на дугу.
         """
         self.teeth = teeth
         self.module = module
@@ -27,6 +32,7 @@ class Gear:
         self.root_radius    = self.pitch_radius - self.dedendum
 
         self.num_involute_points = 30
+        self.tolerance = tolerance
 
     def linspace(self, start, stop, num):
         if num <= 1:
@@ -47,6 +53,13 @@ class Gear:
          2) Инволюты (от max(root_radius, base_radius) до outer_radius)
          3) Дуги верха (outer_radius)
          4) Зеркальной инволюты
+        Список кортежей (x, y) поверх generate_tooth_profile_array().
+        """
+        return [tuple(p) for p in self.generate_tooth_profile_array().tolist()]
+
+    def generate_tooth_profile_array(self):
+        """
+        То же, что generate_tooth_profile(), но одним массивом (N,2).
         """
         start_radius = max(self.root_radius, self.base_radius)
         if start_radius < 0:
@@ -60,9 +73,15 @@ class Gear:
         t_start = param_from_r(start_radius)
         t_end   = param_from_r(self.outer_radius)
 
-        t_values = self.linspace(t_start, t_end, self.num_involute_points)
-        involute_curve = [involute_point(self.base_radius, t) for t in t_values]
-        involute_mirror = [(-x, y) for x, y in involute_curve[::-1]]
+        if self.tolerance is None:
+            t = np.linspace(t_start, t_end, self.num_involute_points)
+        else:
+            t = involute_parameters(t_end, self.base_radius, self.tolerance, t_start)
+        involute_curve = np.column_stack((
+            self.base_radius * (np.cos(t) + t*np.sin(t)),
+            self.base_radius * (np.sin(t) - t*np.cos(t)),
+        ))
+        involute_mirror = involute_curve[::-1] * (-1.0, 1.0)
 
         def angle_of_point(p):
             return math.atan2(p[1], p[0])
@@ -72,51 +91,48 @@ class Gear:
         if angle2 < angle1:
             angle2 += 2*math.pi
 
-        arc_top = []
-        arc_div = 10
-        for a in self.linspace(angle1, angle2, arc_div):
-            x = self.outer_radius * math.cos(a)
-            y = self.outer_radius * math.sin(a)
-            arc_top.append((x, y))
+        arc_div = self._arc_points(self.outer_radius, angle2 - angle1)
+        a = np.linspace(angle1, angle2, arc_div)
+        arc_top = self.outer_radius * np.column_stack((np.cos(a), np.sin(a)))
 
         # Дуга корня (если root_radius > 0 && root_radius >= base_radius, и т.д.)
-        root_arc = []
+        root_arc = np.empty((0, 2))
         # Упрощённо
         if self.root_radius > 0 and self.root_radius >= self.base_radius:
-            left_pt = involute_mirror[-1]
-            right_pt = involute_curve[0]
-            la = angle_of_point(left_pt)
-            ra = angle_of_point(right_pt)
+            la = angle_of_point(involute_mirror[-1])
+            ra = angle_of_point(involute_curve[0])
             if ra < la:
                 ra += 2*math.pi
-            arc_div2 = 10
-            for a in self.linspace(la, ra, arc_div2):
-                x = self.root_radius * math.cos(a)
-                y = self.root_radius * math.sin(a)
-                root_arc.append((x,y))
+            arc_div2 = self._arc_points(self.root_radius, ra - la)
+            a = np.linspace(la, ra, arc_div2)
+            root_arc = self.root_radius * np.column_stack((np.cos(a), np.sin(a)))
 
-        # Формируем итоговый список
-        profile = []
-        profile += root_arc
-        profile += involute_curve
-        profile += arc_top
-        profile += involute_mirror
+        # Формируем итоговый массив
+        return np.concatenate((root_arc, involute_curve, arc_top, involute_mirror))
 
-        return profile
+    def _arc_points(self, radius, angle):
+        if self.tolerance is None:
+            return 10
+        return arc_divisions(radius, angle, self.tolerance) + 1
+
+    def generate_gear_segments(self, offset=(0,0)):
+        """
+        Все отрезки шестерни массивом (M,2,2): [i] = ((x1,y1),(x2,y2)).
+        Профиль зуба строится один раз, все зубья получаются одним
+        поворотом через стек матриц вращения.
+        """
+        tooth_profile = self.generate_tooth_profile_array()
+        angles = np.arange(self.teeth) * (2*math.pi / self.teeth)
+        ca = np.cos(angles)
+        sa = np.sin(angles)
+        # rot[k] = [[cos, -sin], [sin, cos]] для k-го зуба
+        rot = np.stack((np.stack((ca, -sa), axis=-1),
+                        np.stack((sa,  ca), axis=-1)), axis=1)
+        teeth = np.einsum('kij,nj->kni', rot, tooth_profile) + np.asarray(offset, dtype=float)
+        # Каждый зуб замыкается сам на себя: последняя точка -> первая
+        segments = np.stack((teeth, np.roll(teeth, -1, axis=1)), axis=2)
+        return segments.reshape(-1, 2, 2)
 
     def generate_gear_geometry(self, offset=(0,0)):
-        tooth_profile = self.generate_tooth_profile()
-        angle_per_tooth = 2*math.pi / self.teeth
-
-        lines = []
-        ox, oy = offset
-
-        for i in range(self.teeth):
-            angle = i*angle_per_tooth
-            rot = [self.rotate_point(pt, angle) for pt in tooth_profile]
-            shift = [(x+ox, y+oy) for (x,y) in rot]
-            # В отрезки
-            for j in range(len(shift)-1):
-                lines.append((shift[j], shift[j+1]))
-            lines.append((shift[-1], shift[0]))
-        return lines
+        """Список отрезков [((x1,y1),(x2,y2)), ...] поверх generate_gear_segments()."""
+        return [(tuple(p1), tuple(p2)) for p1, p2 in self.generate_gear_segments(offset).tolist()]
@@ -1,12 +1,21 @@
+import importlib
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import matplotlib
-matplotlib.use("TkAgg")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
 
-from elliptical_gears import EllipticalPairBuilder
-from dxf_export import DXFExport
+from background import JobScheduler
+
+# Окно показывается до загрузки тяжёлых модулей: matplotlib (TkAgg) - в
+# create_plot() сразу после показа, расчёт пары (numpy, shapely, ezdxf) -
+# pair_jobs.py, импортируется фоновым потоком (pair_jobs())
+_pair_jobs = None
+
+def pair_jobs():
+    """Модуль pair_jobs; первый вызов (из любого потока) импортирует его."""
+    global _pair_jobs
+    if _pair_jobs is None:
+        _pair_jobs = importlib.import_module("pair_jobs")
+    return _pair_jobs
 
 class GearApp:
     def __init__(self, root):
@@ -28,9 +37,29 @@ class GearApp:
         self.pressure_var = tk.DoubleVar(value=20.0)
         self.clearance_var = tk.DoubleVar(value=0.25)
 
-        # Создадим UI
+        # Построение идёт в фоновом потоке, окно не замирает
+        self.jobs = JobScheduler(self.root)
+
+        # Создадим UI; график - после показа окна
+        self.canvas = None
         self.create_widgets()
 
+        # Предпросмотр обновляется сам при правке любого параметра
+        for var in (self.teeth1_var, self.a1_var, self.b1_var,
+                    self.teeth2_var, self.a2_var, self.b2_var,
+                    self.module_var, self.pressure_var, self.clearance_var):
+            var.trace_add('write', self.schedule_preview)
+
+        # Окно показывается сразу, тяжёлое грузится потом: расчётные модули -
+        # фоновым потоком, matplotlib - когда место под график уже на экране
+        threading.Thread(target=pair_jobs, daemon=True).start()
+        self.plot_frame.bind("<Expose>", self.plot_exposed)
+
+    def plot_exposed(self, event):
+        self.plot_frame.unbind("<Expose>")
+        # После отрисовки остальных виджетов (она тоже в idle-задачах)
+        self.root.after_idle(self.create_plot)
+
     def create_widgets(self):
         frame_params = ttk.LabelFrame(self.root, text="Параметры Эллиптических Шестерён")
         frame_params.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
@@ -73,50 +102,109 @@ class GearApp:
         btns.grid(row=row, column=0, columnspan=4, pady=5)
         ttk.Button(btns, text="Показать", command=self.show_gears).pack(side=tk.LEFT, padx=5)
         ttk.Button(btns, text="Экспорт в DXF", command=self.export_dxf).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btns, text="Отмена", command=self.cancel_job).pack(side=tk.LEFT, padx=5)
+        row+=1
+
+        self.progress = ttk.Progressbar(frame_params, maximum=100, length=200)
+        self.progress.grid(row=row, column=0, columnspan=2, pady=2)
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(frame_params, textvariable=self.status_var).grid(row=row, column=2, columnspan=2, sticky=tk.W)
+
+        # Место под график (create_plot) того же размера, что и фигура
+        self.plot_frame = ttk.Frame(self.root, width=700, height=600)
+        self.plot_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+    def create_plot(self):
+        """Фигура matplotlib; вызывается один раз, после показа окна."""
+        if self.canvas is not None:
+            return
+        import matplotlib
+        matplotlib.use("TkAgg")
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from matplotlib.collections import LineCollection
 
         self.fig = Figure(figsize=(7,6), dpi=100)
         self.ax = self.fig.add_subplot(111)
         self.ax.set_aspect('equal')
         self.ax.grid(True)
 
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.root)
-        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-
-    def show_gears(self):
-        # Считываем
-        t1 = self.teeth1_var.get()
-        a1,b1 = self.a1_var.get(), self.b1_var.get()
-        t2 = self.teeth2_var.get()
-        a2,b2 = self.a2_var.get(), self.b2_var.get()
-        m  = self.module_var.get()
-        pa = self.pressure_var.get()
-        cl = self.clearance_var.get()
-
-        builder = EllipticalPairBuilder(t1, a1, b1, t2, a2, b2, m, pa, cl)
+        # Одна LineCollection на шестерню; draw_gears только заменяет отрезки
+        self.lines1 = LineCollection([], colors='blue')
+        self.lines2 = LineCollection([], colors='red')
+        self.ax.add_collection(self.lines1)
+        self.ax.add_collection(self.lines2)
 
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_frame)
+        self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+        self.canvas.draw_idle()
+
+    def read_params(self):
+        """Параметры из полей ввода (только в главном потоке: Tk-переменные)."""
+        return dict(t1=self.teeth1_var.get(),
+                    a1=self.a1_var.get(), b1=self.b1_var.get(),
+                    t2=self.teeth2_var.get(),
+                    a2=self.a2_var.get(), b2=self.b2_var.get(),
+                    module=self.module_var.get(),
+                    pressure_angle_deg=self.pressure_var.get(),
+                    clearance=self.clearance_var.get())
+
+    def cancel_job(self):
+        self.jobs.cancel()
+        self.progress['value'] = 0
+        self.status_var.set("Отменено")
+
+    def schedule_preview(self, *args):
+        # Параметр меняется при каждом нажатии клавиши - пересчёт после паузы
+        self.jobs.debounce(400, lambda: self.show_gears(quiet=True))
+
+    def start_job(self, text, fn, *args, on_done, on_error=None, preview=False):
+        self.progress['value'] = 0
+        self.status_var.set(text)
+        self.jobs.submit(fn, *args, on_done=on_done, on_error=on_error or self.job_failed,
+                         on_progress=self.job_progress, preview=preview)
+
+    def job_progress(self, fraction, text):
+        self.progress['value'] = 100*fraction
+        if text:
+            self.status_var.set(f"Построение: {text}")
+
+    def job_failed(self, e):
+        self.progress['value'] = 0
+        self.status_var.set("Ошибка")
+        messagebox.showerror("Ошибка", f"Сбой построения шестерён:\n{e}")
+
+    def preview_failed(self, e):
+        # Автоматический предпросмотр: без модального окна на каждую правку
+        self.progress['value'] = 0
+        self.status_var.set(f"Ошибка: {e}")
+
+    def job_finished(self, text):
+        self.progress['value'] = 100
+        self.status_var.set(text)
+
+    def show_gears(self, quiet=False):
+        """Предпросмотр; quiet - запуск правкой параметров, ошибка только в строке состояния."""
         try:
-            lines1, lines2 = builder.build_pair()
-        except Exception as e:
-            messagebox.showerror("Ошибка", f"Сбой построения шестерён:\n{e}")
+            params = self.read_params()
+        except tk.TclError:
+            # Поле ввода пустое или недописано - ждём следующей правки
+            self.status_var.set("Некорректные параметры")
             return
+        self.start_job("Построение...", build_preview, params, on_done=self.draw_gears,
+                       on_error=self.preview_failed if quiet else None, preview=True)
 
-        self.ax.clear()
-        self.ax.grid(True)
+    def draw_gears(self, result):
+        segs1, segs2, bounds, report = result
+        self.job_finished("Готово: " + report)
+        self.create_plot()
+
+        self.lines1.set_segments(segs1)
+        self.lines2.set_segments(segs2)
 
-        # рисуем
-        for seg in lines1:
-            (x1,y1),(x2,y2) = seg
-            self.ax.plot([x1,x2],[y1,y2], color='blue')
-        for seg in lines2:
-            (x1,y1),(x2,y2) = seg
-            self.ax.plot([x1,x2],[y1,y2], color='red')
-
-        # определим границы
-        allx = [p[0] for seg in (lines1+lines2) for p in seg]
-        ally = [p[1] for seg in (lines1+lines2) for p in seg]
-        if allx and ally:
-            mnx, mxx = min(allx), max(allx)
-            mny, mxy = min(ally), max(ally)
+        # границы посчитаны в рабочем потоке (pair_jobs.build_preview)
+        if bounds is not None:
+            mnx, mny, mxx, mxy = bounds
             dx = mxx - mnx
             dy = mxy - mny
             pad = 0.05*(dx+dy)
@@ -126,27 +214,31 @@ class GearApp:
         self.canvas.draw()
 
     def export_dxf(self):
-        # Считываем
-        t1 = self.teeth1_var.get()
-        a1,b1 = self.a1_var.get(), self.b1_var.get()
-        t2 = self.teeth2_var.get()
-        a2,b2 = self.a2_var.get(), self.b2_var.get()
-        m  = self.module_var.get()
-        pa = self.pressure_var.get()
-        cl = self.clearance_var.get()
-
-        builder = EllipticalPairBuilder(t1, a1, b1, t2, a2, b2, m, pa, cl)
-        lines1, lines2 = builder.build_pair()
+        try:
+            params = self.read_params()
+        except tk.TclError:
+            messagebox.showerror("Ошибка", "Некорректные параметры")
+            return
 
         fn = filedialog.asksaveasfilename(defaultextension=".dxf",
                                           filetypes=[("DXF files","*.dxf")],
                                           title="Сохранить DXF")
         if fn:
-            dxf = DXFExport(fn)
-            dxf.add_lines(lines1)
-            dxf.add_lines(lines2)
-            dxf.save()
-            messagebox.showinfo("Успех", f"DXF сохранён:\n{fn}")
+            self.start_job("Экспорт...", export_pair, params, fn, on_done=self.export_finished)
+
+    def export_finished(self, fn):
+        self.job_finished("DXF сохранён")
+        messagebox.showinfo("Успех", f"DXF сохранён:\n{fn}")
+
+
+# Выполняются в рабочем потоке JobScheduler: никаких обращений к Tk.
+# Первое задание при необходимости дожидается импорта pair_jobs
+
+def build_preview(job, params):
+    return pair_jobs().build_preview(job, params)
+
+def export_pair(job, params, fn):
+    return pair_jobs().export_pair(job, params, fn)
 
 if __name__=="__main__":
     root = tk.Tk()
@@ -0,0 +1,255 @@
+"""
+Проверка зацепления пары: обкатка контуров через полный цикл.
+
+Обе шестерни поворачиваются по закону движения (TransmissionTable).
+Ведущая вращается вокруг начала координат по часовой стрелке на theta1,
+ведомая вокруг (a, 0) навстречу на theta2(theta1), как в RollingContact.
+На каждом шаге ищутся пересечения контуров (проникание) и минимальный
+зазор между ними.
+
+Отрезки каждой шестерни индексируются один раз, в её собственной системе
+координат (shapely.STRtree по рамкам отрезков). Сблизиться шестерни могут
+только в линзе пересечения их описанных кругов. Поэтому линза переводится
+в систему каждой шестерни, и дерево отдаёт лишь отрезки внутри неё -
+O(log n + k) на шаг вместо перебора всех отрезков. Запросы всех шагов идут
+одним вызовом tree.query. Внутри шага пары отрезков ближе margin
+подбираются по равномерной сетке (near_pairs), а не перебором k x k, и
+поворачиваются целиком только отрезки из этих пар.
+"""
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+import shapely
+
+from geometry_utils import iter_polygons, segment_arrays
+import instrument
+
+MeshReport = namedtuple("MeshReport", [
+    "theta1",        # углы ведущей на шагах, рад
+    "clearance",     # минимальный зазор на шаге (0 - контуры пересекаются, inf - дальше margin)
+    "crossings",     # пересекающихся пар отрезков на шаге
+    "candidates",    # отрезков-кандидатов из индекса на шаге (обеих шестерён)
+    "min_clearance",
+    "worst_theta1",  # угол ведущей с минимальным зазором
+    "interfering_steps",
+    "elapsed",       # время проверки, с
+])
+
+
+def _point_segment_distance(px, py, ax, ay, bx, by):
+    # Расстояние от точек p до отрезков ab (покомпонентно, массивы одной длины)
+    ux, uy = bx - ax, by - ay
+    wx, wy = px - ax, py - ay
+    denom = ux*ux + uy*uy
+    t = np.clip((wx*ux + wy*uy)/np.where(denom > 0, denom, 1.0), 0.0, 1.0)
+    return np.hypot(wx - t*ux, wy - t*uy)
+
+
+def _segment_distances(ax, ay, bx, by, cx, cy, dx, dy):
+    # Отрезки ab и cd покомпонентно -> (расстояния, маска пересечений)
+    ux, uy, vx, vy = bx - ax, by - ay, dx - cx, dy - cy
+    crossing = (((ux*(cy - ay) - uy*(cx - ax))*(ux*(dy - ay) - uy*(dx - ax)) < 0) &
+                ((vx*(ay - cy) - vy*(ax - cx))*(vx*(by - cy) - vy*(bx - cx)) < 0))
+    dist = np.minimum(np.minimum(_point_segment_distance(ax, ay, cx, cy, dx, dy),
+                                 _point_segment_distance(bx, by, cx, cy, dx, dy)),
+                      np.minimum(_point_segment_distance(cx, cy, ax, ay, bx, by),
+                                 _point_segment_distance(dx, dy, ax, ay, bx, by)))
+    return np.where(crossing, 0.0, dist), crossing
+
+
+def segment_distances(A, B):
+    """
+    Расстояния между отрезками A[i] и B[i] (оба (k,2,2)) и маска
+    собственных пересечений (концы строго по разные стороны).
+    """
+    return _segment_distances(A[:, 0, 0], A[:, 0, 1], A[:, 1, 0], A[:, 1, 1],
+                              B[:, 0, 0], B[:, 0, 1], B[:, 1, 0], B[:, 1, 1])
+
+
+def near_pairs(ax, ay, bx, by, reach):
+    """
+    Пары (ia, ib) точек (ax, ay) и (bx, by) не дальше reach друг от друга.
+    Для середин отрезков это значит, что пары отрезков ближе
+    reach - (длина отрезков) не теряются. Точки b раскладываются по
+    равномерной сетке с ячейкой не меньше reach (и не больше ~4 ячеек на
+    точку), точки a ищут пары в девяти соседних ячейках - O(1) на точку.
+    """
+    xlow, ylow = float(bx.min()), float(by.min())
+    width, height = float(bx.max()) - xlow, float(by.max()) - ylow
+    size = max(reach, math.sqrt(width*height/(4*len(bx))))
+    # Два пустых ряда ячеек по краям: соседи точек a не выходят за сетку
+    xlow -= 2*size
+    ylow -= 2*size
+    nx, ny = int(width/size) + 5, int(height/size) + 5
+    # Точки a вне сетки отбрасываются до вычисления ячеек
+    inside = np.flatnonzero((ax >= xlow + size) & (ax < xlow + (nx - 1)*size) &
+                            (ay >= ylow + size) & (ay < ylow + (ny - 1)*size))
+    keys_a = ((ax[inside] - xlow)/size).astype(np.intp)*ny + ((ay[inside] - ylow)/size).astype(np.intp)
+    keys_b = ((bx - xlow)/size).astype(np.intp)*ny + ((by - ylow)/size).astype(np.intp)
+    order = np.argsort(keys_b, kind='stable')
+    counts = np.bincount(keys_b, minlength=nx*ny)
+    starts = np.cumsum(counts) - counts
+
+    ia, ib = [], []
+    for dx in (-1, 0, 1):
+        # Ячейки (x+dx, y-1..y+1) идут в order подряд: один диапазон на столбец
+        k = keys_a + dx*ny
+        start = starts[k - 1]
+        count = starts[k + 1] + counts[k + 1] - start
+        total = int(count.sum())
+        if total == 0:
+            continue
+        # Раскрытие диапазонов [start, start+count) в плоский список индексов
+        first = np.cumsum(count) - count
+        ia.append(np.repeat(inside, count))
+        ib.append(order[np.repeat(start - first, count) + np.arange(total)])
+    if not ia:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    ia, ib = np.concatenate(ia), np.concatenate(ib)
+    ex, ey = ax[ia] - bx[ib], ay[ia] - by[ib]
+    keep = ex*ex + ey*ey <= reach*reach
+    return ia[keep], ib[keep]
+
+
+def _lens(r1, r2, a, margin, points=32):
+    # Контур (в мировой системе) области, где контуры могут сблизиться на margin:
+    # пересечение кругов радиусов r1 + margin вокруг (0,0) и r2 + margin вокруг (a,0).
+    # Дуги - описанными ломаными, чтобы многоугольник накрывал линзу. None - не пересекаются
+    R1, R2 = r1 + margin, r2 + margin
+    if a >= R1 + R2:
+        return None
+    x = (a*a + R1*R1 - R2*R2)/(2.0*a)
+    if abs(x) >= R1 or abs(a - x) >= R2:
+        # Один круг внутри другого - берём меньший целиком
+        R, cx = (R1, 0.0) if R1 < R2 else (R2, a)
+        phi = np.linspace(-math.pi, math.pi, 2*points + 1)
+        return np.column_stack((cx + R/math.cos(math.pi/(2*points))*np.cos(phi),
+                                R/math.cos(math.pi/(2*points))*np.sin(phi)))
+    h = math.sqrt(R1*R1 - x*x)
+    phi1 = math.atan2(h, x)
+    phi2 = math.atan2(h, x - a)
+    # Дуга круга 1 справа (от -phi1 до phi1), дуга круга 2 слева (от phi2 до 2*pi - phi2)
+    t1 = np.linspace(-phi1, phi1, points + 1)
+    t2 = np.linspace(phi2, 2.0*math.pi - phi2, points + 1)
+    k1 = R1/math.cos(phi1/points)
+    k2 = R2/math.cos((math.pi - phi2)/points)
+    arc1 = np.column_stack((k1*np.cos(t1), k1*np.sin(t1)))
+    arc2 = np.column_stack((a + k2*np.cos(t2), k2*np.sin(t2)))
+    return np.concatenate((arc1, arc2))
+
+
+def _query_lens(tree, lens, angles, shift):
+    # Линза, переведённая в систему шестерни (поворот на -angle после сдвига),
+    # -> пары (шаг, отрезок) одним запросом к дереву
+    c, s = np.cos(angles)[:, None], np.sin(angles)[:, None]
+    x, y = lens[:, 0] - shift, lens[:, 1]
+    polygons = shapely.polygons(np.stack((c*x + s*y, -s*x + c*y), axis=-1))
+    steps, segs = tree.query(polygons, predicate='intersects')
+    order = np.argsort(steps, kind='stable')
+    steps, segs = steps[order], segs[order]
+    bounds = np.searchsorted(steps, np.arange(len(angles) + 1))
+    return segs, bounds
+
+
+def check_mesh(segs1, segs2, center_distance, transmission, step_deg=0.1, margin=None):
+    """
+    Обкатка пары через цикл transmission.span с шагом step_deg градусов.
+
+    segs1 - отрезки ведущей (M,2,2) с центром в (0,0), segs2 - ведомой с центром
+    в (center_distance, 0), обе в нулевом положении (как build_pair_arrays).
+    margin - до какого зазора искать сближения (по умолчанию 1% межосевого
+    расстояния); на шагах, где ближе margin ничего нет, clearance = inf.
+    """
+    t0 = time.perf_counter()
+    a = float(center_distance)
+    segs1 = np.asarray(segs1, dtype=float)
+    segs2 = np.asarray(segs2, dtype=float) - (a, 0.0)
+    if margin is None:
+        margin = 0.01*a
+
+    theta1 = np.arange(0.0, transmission.span, math.radians(step_deg))
+    theta2 = transmission.follower_angle(theta1)
+    steps = len(theta1)
+    clearance = np.full(steps, np.inf)
+    crossings = np.zeros(steps, dtype=np.intp)
+    candidates = np.zeros(steps, dtype=np.intp)
+
+    r1 = float(np.sqrt((segs1**2).sum(axis=-1)).max())
+    r2 = float(np.sqrt((segs2**2).sum(axis=-1)).max())
+    lens = _lens(r1, r2, a, margin)
+    if lens is not None:
+        # Сетка для пар внутри шага: ячейка не меньше margin + длина отрезка
+        lengths = np.concatenate((np.hypot(*(segs1[:, 1] - segs1[:, 0]).T),
+                                  np.hypot(*(segs2[:, 1] - segs2[:, 0]).T)))
+        reach = margin + float(lengths.max())
+        # Столбцы концов и середин отрезков в собственных системах шестерён
+        ends1 = segs1.reshape(-1, 4).T.copy()
+        ends2 = segs2.reshape(-1, 4).T.copy()
+        mid1 = 0.5*(ends1[:2] + ends1[2:])
+        mid2 = 0.5*(ends2[:2] + ends2[2:])
+        tree1 = shapely.STRtree(shapely.linestrings(segs1))
+        tree2 = shapely.STRtree(shapely.linestrings(segs2))
+        near1, bounds1 = _query_lens(tree1, lens, -theta1, 0.0)
+        near2, bounds2 = _query_lens(tree2, lens, theta2, a)
+
+        for k in range(steps):
+            i1 = near1[bounds1[k]:bounds1[k + 1]]
+            i2 = near2[bounds2[k]:bounds2[k + 1]]
+            candidates[k] = len(i1) + len(i2)
+            if len(i1) == 0 or len(i2) == 0:
+                continue
+            # Ведущая повёрнута на -theta1, ведомая - на theta2 вокруг (a, 0)
+            c1, s1 = math.cos(theta1[k]), -math.sin(theta1[k])
+            c2, s2 = math.cos(theta2[k]), math.sin(theta2[k])
+            x1, y1 = mid1[0, i1], mid1[1, i1]
+            x2, y2 = mid2[0, i2], mid2[1, i2]
+            ia, ib = near_pairs(c1*x1 - s1*y1, s1*x1 + c1*y1, a + c2*x2 - s2*y2, s2*x2 + c2*y2, reach)
+            if len(ia) == 0:
+                continue
+            # Целиком поворачиваются только отрезки из найденных пар
+            p = ends1[:, i1[ia]]
+            q = ends2[:, i2[ib]]
+            dist, crossing = _segment_distances(c1*p[0] - s1*p[1], s1*p[0] + c1*p[1],
+                                                c1*p[2] - s1*p[3], s1*p[2] + c1*p[3],
+                                                a + c2*q[0] - s2*q[1], s2*q[0] + c2*q[1],
+                                                a + c2*q[2] - s2*q[3], s2*q[2] + c2*q[3])
+            crossings[k] = np.count_nonzero(crossing)
+            nearest = dist.min()
+            if nearest <= margin:
+                clearance[k] = nearest
+
+    instrument.count("mesh steps", steps)
+    instrument.count("mesh candidates", int(candidates.sum()))
+    worst = int(np.argmin(clearance)) if steps else 0
+    return MeshReport(theta1, clearance, crossings, candidates,
+                      float(clearance[worst]) if steps else math.inf,
+                      float(theta1[worst]) if steps else 0.0,
+                      int(np.count_nonzero(crossings)),
+                      time.perf_counter() - t0)
+
+
+def undercut_rings(geometry):
+    """
+    Число самопересекающихся колец контура (подрез: профиль зуба
+    или кривая впадин заходят сами на себя).
+    """
+    polys = list(iter_polygons(geometry))
+    if not polys:
+        return 0
+    return int(np.count_nonzero(~shapely.is_simple(shapely.get_rings(polys))))
+
+
+def check_pair(builder, step_deg=0.1, margin=None):
+    """
+    Проверка пары EllipticalPairBuilder: (MeshReport, подрезов шестерни 1, шестерни 2).
+    margin по умолчанию - половина модуля (больше радиального зазора впадин).
+    """
+    if margin is None:
+        margin = 0.5*builder.module
+    poly1, poly2 = builder.build_pair_polygons()
+    with instrument.span("mesh check"):
+        report = check_mesh(segment_arrays(poly1), segment_arrays(poly2), builder.center_distance,
+                            builder.transmission(), step_deg, margin)
+    return report, undercut_rings(poly1), undercut_rings(poly2)
@@ -0,0 +1,41 @@
+"""
+Задания построения пары для GearApp (main.py) - выполняются в рабочем
+потоке JobScheduler, никаких обращений к Tk.
+
+Модуль тянет numpy, shapely и ezdxf, поэтому main.py импортирует его не
+при запуске, а в фоне после появления окна (main.pair_jobs()).
+"""
+from elliptical_gears import EllipticalPairBuilder
+from dxf_export import DXFExport
+from geometry_utils import unify_rings, segments_bounds
+from geometry_cache import default_cache
+import instrument
+
+
+def build_preview(job, params):
+    """(segs1, segs2, bounds, текст состояния) для предпросмотра."""
+    builder = EllipticalPairBuilder(**params, cache=default_cache(), progress=job.progress)
+    with instrument.span("pair"):
+        segs1, segs2 = builder.build_pair_arrays()
+    return segs1, segs2, segments_bounds(segs1, segs2), contact_report(builder)
+
+def contact_report(builder):
+    """Итоги обкатки для строки состояния."""
+    text = "a = %.4g, замыкание %.1e рад, %.1f мс" % (
+        builder.center_distance, builder.closure_error, 1e3*builder.solve_time)
+    if builder.radius_gap > 1e-9*builder.center_distance:
+        text += ", кривая не замыкается (%.3g)" % builder.radius_gap
+    return text
+
+def export_pair(job, params, fn):
+    builder = EllipticalPairBuilder(**params, cache=default_cache(), progress=job.progress)
+    with instrument.span("pair"):
+        poly1, poly2 = builder.build_pair_polygons()
+    job.check()
+    # Каждый контур - одна LWPOLYLINE вместо сотен LINE
+    with instrument.span("export"):
+        dxf = DXFExport(fn, streaming=True)
+        dxf.add_polylines(unify_rings(poly1))
+        dxf.add_polylines(unify_rings(poly2))
+        dxf.save()
+    return fn
@@ -0,0 +1,119 @@
+"""
+Обкатка без проскальзывания для пары некруглых шестерён.
+
+Ведущая шестерня задана делительной кривой r1(theta1), ведомая получается
+из условий качения на межосевом расстоянии a:
+
+    r1(theta1) + r2(theta2) = a,       dtheta2/dtheta1 = r1 / (a - r1).
+
+Пока ведомая делает полный оборот, ведущая поворачивается на
+turns = t2/t1 оборотов. Поэтому a - корень
+
+    F(a) = integral[0, 2*pi*turns] r1/(a - r1) dtheta1 - 2*pi,
+
+монотонно убывающей на (max r1, inf). Интеграл берётся трапециями на
+равномерной сетке одним вызовом numpy. Корень ищется методом Ньютона с
+вилкой; F'(a) - такой же интеграл от -r1/(a - r1)^2. Затем theta2(theta1)
+табулируется кумулятивной суммой на той же сетке, и кривая ведомой
+получается из таблицы интерполяцией.
+
+Невязка на рабочей сетке - не более tolerance по построению, поэтому
+точность таблицы (closure_error) проверяется независимо: F(a) при
+найденном a считается ещё раз на вдвое более частой сетке.
+"""
+import math
+import time
+
+import numpy as np
+
+from transmission import TransmissionTable
+
+
+class RollingContact:
+    """
+    Таблица обкатки ведомой шестерни вокруг ведущей.
+
+    radius(thetas) - делительная кривая ведущей (векторная), turns = t2/t1,
+    samples - число интервалов сетки по theta1, guess - начальное
+    приближение межосевого расстояния.
+
+    После построения:
+      theta1, theta2   - таблица углов поворота (theta2[-1] ~ 2*pi)
+      ratios           - dtheta2/dtheta1 = r1/(a - r1) в узлах таблицы
+      r2               - радиус ведомой в точке контакта, a - r1(theta1)
+      beta             - угол той же точки в собственной системе ведомой
+                         (pi - theta2: в нулевом положении контакт на оси x
+                         между центрами, ведомая справа, вращается навстречу)
+      center_distance  - межосевое расстояние a
+      iterations       - вычислений F
+      residual         - |theta2[-1] - 2*pi| на рабочей сетке (невязка решателя), рад
+      closure_error    - |F(a)| на сетке из 2*samples интервалов: насколько
+                         ведомая недокручивается или перекручивается за оборот
+                         из-за дискретизации, рад
+      radius_gap       - |r2 в конце оборота - r2 в начале|; не ноль, если
+                         при этом передаточном отношении кривая не замыкается
+      solve_time       - время построения, с
+    """
+
+    def __init__(self, radius, turns, samples, guess=None, tolerance=1e-12, max_iterations=100):
+        t0 = time.perf_counter()
+        self.turns = turns
+        self.theta1 = np.linspace(0.0, 2.0*math.pi*turns, samples + 1)
+        r1 = np.asarray(radius(self.theta1), dtype=float)
+        self.h = self.theta1[1] - self.theta1[0]
+        self.lower = float(r1.max())
+
+        self.center_distance, self.iterations = self._solve(r1, guess, tolerance, max_iterations)
+
+        g = self.ratios = r1/(self.center_distance - r1)
+        self.theta2 = np.concatenate(([0.0], np.cumsum(0.5*self.h*(g[1:] + g[:-1]))))
+        self.r2 = self.center_distance - r1
+        self.beta = math.pi - self.theta2
+        self.residual = abs(float(self.theta2[-1]) - 2.0*math.pi)
+        fine = np.linspace(0.0, self.theta1[-1], 2*samples + 1)
+        r_fine = np.asarray(radius(fine), dtype=float)
+        g_fine = r_fine/(self.center_distance - r_fine)
+        self.closure_error = abs(float(0.5*self.h*(g_fine.sum() - 0.5*(g_fine[0] + g_fine[-1]))) - 2.0*math.pi)
+        self.radius_gap = abs(float(self.r2[-1] - self.r2[0]))
+        self.solve_time = time.perf_counter() - t0
+
+    def _integral(self, values):
+        # Формула трапеций на равномерной сетке theta1
+        return self.h*(values.sum() - 0.5*(values[0] + values[-1]))
+
+    def _solve(self, r1, guess, tolerance, max_iterations):
+        target = 2.0*math.pi
+        lo, hi = self.lower, math.inf
+        a = guess if guess is not None and guess > lo else 2.0*lo
+        for iterations in range(1, max_iterations + 1):
+            d = 1.0/(a - r1)
+            f = self._integral(r1*d) - target
+            if abs(f) <= tolerance:
+                break
+            if f > 0:
+                lo = a
+            else:
+                hi = a
+            # Шаг Ньютона; вне вилки (lo, hi) - деление пополам
+            step = a + f/self._integral(r1*d*d)
+            if lo < step < hi:
+                a = step
+            elif hi < math.inf:
+                a = 0.5*(lo + hi)
+            else:
+                a = lo + 2.0*(a - lo)
+        else:
+            raise ValueError("Межосевое расстояние не найдено за %d итераций" % max_iterations)
+        return float(a), iterations
+
+    def transmission(self):
+        """Таблица передаточного отношения (TransmissionTable) на той же сетке."""
+        return TransmissionTable(self.theta1[-1], self.ratios)
+
+    def theta2_at(self, theta1):
+        """Угол поворота ведомой при повороте ведущей на theta1 (из таблицы)."""
+        return np.interp(theta1, self.theta1, self.theta2)
+
+    def follower_radius(self, beta):
+        """Делительная кривая ведомой r2(beta) в её собственных углах (из таблицы)."""
+        return np.interp(beta, self.beta[:-1], self.r2[:-1], period=2.0*math.pi)
@@ -0,0 +1,53 @@
+import threading
+
+from background import JobScheduler
+
+
+class FakeRoot:
+    """root.after/after_cancel без Tk: отложенные вызовы запускает run()."""
+
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def after(self, ms, fn, *args):
+        self.next_id += 1
+        self.pending[self.next_id] = (fn, args)
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run(self):
+        calls, self.pending = self.pending, {}
+        for fn, args in calls.values():
+            fn(*args)
+
+
+def blocking(job, release):
+    release.wait(5)
+    job.check()
+    return "done"
+
+
+def test_debounce_keeps_export_and_replaces_preview():
+    root = FakeRoot()
+    jobs = JobScheduler(root)
+    release = threading.Event()
+    export = jobs.submit(blocking, release)
+    previews = []
+
+    jobs.debounce(400, lambda: previews.append(jobs.submit(blocking, release, preview=True)))
+    root.run()
+    assert not export.cancelled and jobs.current is export and not previews
+
+    release.set()
+    while jobs.current is export:
+        root.run()
+    while not previews:
+        root.run()
+    preview = previews[0]
+    assert preview.preview and jobs.current is preview
+
+    jobs.debounce(400, lambda: None)
+    assert preview.cancelled and jobs.current is None
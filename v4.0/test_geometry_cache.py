@@ -0,0 +1,25 @@
+import os
+
+import numpy as np
+import pytest
+
+import elliptical_gears
+from geometry_cache import GeometryCache, local_sources
+
+
+def test_local_sources_cover_builder_dependencies():
+    names = {os.path.basename(f) for f in local_sources(elliptical_gears.EllipticalPairBuilder)}
+    assert {"elliptical_gears.py", "geometry_utils.py", "rolling_contact.py", "transmission.py"} <= names
+
+
+@pytest.mark.parametrize("fraction", [0.0, 0.3, 0.6, 0.95])
+def test_truncated_entry_is_a_miss(tmp_path, fraction):
+    cache = GeometryCache(str(tmp_path))
+    cache.store("k", {"segments": np.random.default_rng(0).random((500, 4))})
+    path = cache.path("k")
+    with open(path, "r+b") as f:
+        f.truncate(int(fraction*os.path.getsize(path)))
+
+    assert cache.load("k") is None
+    assert cache.misses == 1
+    assert not os.path.exists(path)
@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+import pytest
+
+from rolling_contact import RollingContact
+
+
+def oval(thetas):
+    return 1.0/(1.0 - 0.6*np.cos(thetas))
+
+
+@pytest.mark.parametrize("max_iterations", [0, 1, 2])
+def test_non_converging_solver_raises(max_iterations):
+    with pytest.raises(ValueError, match="не найдено"):
+        RollingContact(oval, 1.0, 40, tolerance=0.0, max_iterations=max_iterations)
+
+
+def test_circle_center_distance():
+    contact = RollingContact(lambda t: np.ones_like(t), 1.5, 100)
+    assert contact.center_distance == pytest.approx(2.5)
+    assert contact.closure_error < 1e-12
+
+
+def test_closure_error_is_independent_of_solver_residual():
+    coarse = RollingContact(oval, 1.0, 40)
+    fine = RollingContact(oval, 1.0, 160)
+    # Решатель сходится на любой сетке, ошибка замыкания - от дискретизации
+    assert coarse.residual < 1e-12
+    assert coarse.closure_error > 1e3*coarse.residual
+    assert fine.closure_error < coarse.closure_error
+    assert abs(fine.theta2[-1] - 2.0*math.pi) < 1e-12
+
+
+@pytest.mark.parametrize("t1, t2", [(20, 30), (40, 20)])
+def test_pair_closes(t1, t2):
+    from elliptical_gears import EllipticalPairBuilder
+    builder = EllipticalPairBuilder(t1, 50, 40, t2, 50, 40, 2.0, 20, 0.25)
+    builder.solve_contact()
+    assert builder.radius_gap < 1e-9
+
+
+def test_pair_that_cannot_close_raises():
+    from elliptical_gears import EllipticalPairBuilder
+    builder = EllipticalPairBuilder(30, 50, 40, 20, 50, 40, 2.0, 20, 0.25)
+    with pytest.raises(ValueError, match="не замыкается"):
+        builder.build_pair_arrays()
@@ -0,0 +1,28 @@
+import math
+
+import numpy as np
+import pytest
+
+from transmission import TransmissionTable
+
+
+def table():
+    thetas = np.linspace(0.0, 2.0*math.pi, 65)
+    return TransmissionTable(2.0*math.pi, 1.0 + 0.5*np.cos(thetas))
+
+
+def test_periodic_queries_round_trip():
+    t = table()
+    theta1 = np.linspace(-10.0, 10.0, 101)
+    assert np.allclose(t.follower_angle(theta1 + t.span), t.follower_angle(theta1) + 2.0*math.pi)
+    assert np.allclose(t.driver_angle(t.follower_angle(theta1)), theta1)
+
+
+@pytest.mark.parametrize("bad", [math.nan, math.inf, -math.inf])
+def test_non_finite_angle_raises(bad):
+    t = table()
+    for query in (t.follower_angle, t.ratio, t.driver_angle):
+        with pytest.raises(ValueError, match="конечным"):
+            query(bad)
+        with pytest.raises(ValueError, match="конечным"):
+            query(np.array([0.0, bad]))